@@ -0,0 +1,63 @@
+"""Benchmark eager no-op tasks per second under each CELERY_TASK_APP_CONTEXT strategy.
+
+For worker strategy the app context is pushed once by worker_process_init, as in a prefork worker process.
+
+Usage:
+    python -m benchmarks.bench_app_context [iterations]
+"""
+
+import sys
+import time
+
+from celery import Task
+from celery.signals import worker_process_init
+from flask import Flask, has_app_context
+
+from flask_celery import APP_CONTEXT_STRATEGIES, Celery
+
+
+def noop() -> None:
+    """Do nothing."""
+
+
+def create_task(strategy: str) -> Task:
+    """Return eager no-op task of a new app using strategy."""
+    app = Flask(f"bench_{strategy}")
+    app.config.update(
+        CELERY_BROKER_URL="memory://",
+        CELERY_TASK_LOCK_BACKEND="memory://",
+        CELERY_TASK_ALWAYS_EAGER=True,
+        CELERY_TASK_APP_CONTEXT=strategy,
+    )
+    task: Task = Celery(app).task(noop)
+    return task
+
+
+def tasks_per_second(task: Task, iterations: int) -> tuple[float, float]:
+    """Return eager apply and direct call (what worker does after receiving the message) rates."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        task.apply()
+    applied = iterations / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        task()
+    called = iterations / (time.perf_counter() - start)
+    return applied, called
+
+
+def main() -> None:
+    """Run benchmark."""
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    for strategy in APP_CONTEXT_STRATEGIES:
+        task = create_task(strategy)
+        if strategy == "worker":
+            worker_process_init.send(sender=None)
+            assert has_app_context()
+        applied, called = tasks_per_second(task, iterations)
+        print(f"{strategy:<8} eager apply: {applied:>10.0f} tasks/s, task call: {called:>10.0f} tasks/s")
+
+
+if __name__ == "__main__":
+    main()
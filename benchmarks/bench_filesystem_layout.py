@@ -0,0 +1,82 @@
+"""Benchmark filesystem lock acquire latency with many existing lock files, flat vs sharded layout.
+
+Usage:
+    python -m benchmarks.bench_filesystem_layout [sizes] [iterations]
+
+sizes is comma separated count of existing lock files, 10000,100000,1000000 by default. Lock directories are created
+in BENCH_LOCK_DIR (system temp dir by default), populating a million files takes a few minutes and gigabytes of inodes.
+"""
+
+import hashlib
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from flask_celery.backends.filesystem import LockBackendFilesystem
+
+
+class FlatLockBackendFilesystem(LockBackendFilesystem):
+    """Lock backend keeping all lock files in one directory (layout before sharding)."""
+
+    def get_lock_path(self, task_identifier: str) -> Path:
+        """Return path to lock in lock directory."""
+        return self.path.joinpath(self.LOCK_NAME.format(task_identifier))
+
+    def migrate_flat_layout(self) -> None:
+        """Keep flat layout."""
+
+
+def populate(lock_backend: LockBackendFilesystem, size: int) -> None:
+    """Create size lock files of arguments never seen again."""
+    for i in range(size):
+        lock_path = lock_backend.get_lock_path(f"bench.task.args.{hashlib.blake2b(str(i).encode()).hexdigest()}")
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_WRONLY, 0o644)
+        except FileNotFoundError:
+            lock_path.parent.mkdir(parents=True, exist_ok=True)
+            fd = os.open(lock_path, os.O_CREAT | os.O_WRONLY, 0o644)
+        os.close(fd)
+
+
+def run(lock_backend: LockBackendFilesystem, iterations: int) -> tuple[float, float]:
+    """Return median and 99th percentile seconds per acquire of new identifier, released afterwards."""
+    latencies = []
+    for i in range(iterations):
+        identifier = f"bench.new.args.{i}"
+        start = time.perf_counter()
+        lock_backend.acquire(identifier, 60)
+        latencies.append(time.perf_counter() - start)
+        lock_backend.release(identifier)
+    percentiles = statistics.quantiles(latencies, n=100)
+    return percentiles[49], percentiles[98]
+
+
+def main() -> None:
+    """Run benchmark."""
+    sizes = [int(size) for size in sys.argv[1].split(",")] if len(sys.argv) > 1 else [10000, 100000, 1000000]
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    root = Path(os.environ.get("BENCH_LOCK_DIR", tempfile.gettempdir())).joinpath("flask_celery_bench_layout")
+
+    for size in sizes:
+        results = {}
+        for name, backend_class in (("flat", FlatLockBackendFilesystem), ("sharded", LockBackendFilesystem)):
+            path = root.joinpath(name)
+            shutil.rmtree(path, ignore_errors=True)
+            path.mkdir(parents=True)
+            lock_backend = backend_class(f"file://{path}")
+            populate(lock_backend, size)
+            # Flush populated files so their writeback does not slow down measured acquires
+            os.sync()
+            results[name] = run(lock_backend, iterations)
+            shutil.rmtree(path, ignore_errors=True)
+        print(f"{size:>9} files | " + " | ".join(
+            f"{name}: median {median * 1e6:>7.1f} us, p99 {p99 * 1e6:>8.1f} us" for name, (median, p99) in results.items()
+        ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Benchmark import time of flask_celery.
+
+Backends used to be imported by flask_celery.lock_manager, so every import of flask_celery loaded redis and
+sqlalchemy, now backend module is imported when its URI scheme is selected.
+
+Usage:
+    python -m benchmarks.bench_import_time
+"""
+
+import statistics
+import subprocess
+import sys
+
+RUNS = 10
+BACKEND_LIBRARIES = ("redis", "sqlalchemy")
+TOTAL = "<total>"
+
+
+def import_times(statement: str) -> dict[str, int]:
+    """Return cumulative import time in us of every module imported by statement in a fresh interpreter."""
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-X", "importtime", "-c", statement], capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line.removeprefix("import time:").split("|")
+        times[module.strip()] = int(cumulative)
+        if not module.startswith("  "):
+            # Top level import, its cumulative time includes all modules imported by it
+            times[TOTAL] = times.get(TOTAL, 0) + int(cumulative)
+    return times
+
+
+def main() -> None:
+    """Run benchmark."""
+    for statement in ("import flask_celery", "import flask_celery, flask_celery.backends.redis, flask_celery.backends.database"):
+        runs = [import_times(statement) for _ in range(RUNS)]
+        loaded = sorted({module for module in runs[0] if module.split(".")[0] in BACKEND_LIBRARIES and "." not in module})
+        median = statistics.median(times[TOTAL] for times in runs)
+        print(f"{statement:<90} {median / 1000:>7.1f} ms, backend libraries loaded: {', '.join(loaded) or '-'}")
+
+    assert not any(module.split(".")[0] in BACKEND_LIBRARIES for module in import_times("import flask_celery"))
+
+
+if __name__ == "__main__":
+    main()
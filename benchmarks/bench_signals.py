@@ -0,0 +1,69 @@
+"""Benchmark overhead of lock signals on acquire/release with memory backend.
+
+Signals are sent only when connected, so without receivers LockManager has to be as fast as it was without
+instrumentation (within measurement noise).
+
+Usage:
+    python -m benchmarks.bench_signals [iterations]
+"""
+
+import sys
+import timeit
+from types import SimpleNamespace, TracebackType
+
+from flask_celery.backends.memory import LockBackendMemory
+from flask_celery.exceptions import OtherInstanceError
+from flask_celery.lock_manager import LockManager
+from flask_celery.metrics import PrometheusLockMetrics
+
+MAX_DISABLED_OVERHEAD = 0.05
+REPEAT = 7
+
+
+class UninstrumentedLockManager(LockManager):
+    """Lock manager entering and exiting the way it did before signals were added."""
+
+    def __enter__(self) -> None:
+        """Acquire lock if possible."""
+        self.debug("Key %s | Timeout %ds", self.timeout)
+        if not self.acquire():
+            msg = f"Failed to acquire lock, {self.task_identifier} already running."
+            raise OtherInstanceError(msg)
+        self.debug("Key %s | Got lock, running.")
+
+    def __exit__(self, exc_type: type[BaseException] | None, _value: BaseException | None, _traceback: TracebackType | None) -> bool | None:
+        """Release lock."""
+        self.debug("Key %s | Releasing lock.")
+        self.lock_backend.release(self.task_identifier, self.token)
+        return None
+
+
+def run(manager_class: type[LockManager], lock_backend: LockBackendMemory, task: object, iterations: int) -> float:
+    """Return best seconds per acquire and release."""
+    def cycle() -> None:
+        with manager_class(lock_backend, task, 60, (), {}, include_args=False):
+            pass
+    return min(timeit.repeat(cycle, number=iterations, repeat=REPEAT)) / iterations
+
+
+def main() -> None:
+    """Run benchmark."""
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    lock_backend = LockBackendMemory("memory://")
+    task = SimpleNamespace(name="bench.task")
+
+    uninstrumented = run(UninstrumentedLockManager, lock_backend, task, iterations)
+    disabled = run(LockManager, lock_backend, task, iterations)
+    metrics = PrometheusLockMetrics().connect()
+    enabled = run(LockManager, lock_backend, task, iterations)
+    metrics.disconnect()
+
+    overhead = disabled / uninstrumented - 1
+    print(f"uninstrumented:          {uninstrumented * 1e6:>7.2f} us per acquire/release")
+    print(f"signals without receiver: {disabled * 1e6:>7.2f} us ({overhead:+.1%})")
+    print(f"prometheus collector:     {enabled * 1e6:>7.2f} us ({enabled / uninstrumented - 1:+.1%})")
+    assert overhead < MAX_DISABLED_OVERHEAD, f"Disabled instrumentation overhead {overhead:.1%}"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Benchmark per-call overhead of single_instance against undecorated task, with memory lock backend.
+
+Tasks are called directly, the way worker runs them after receiving the message, without app context.
+
+Usage:
+    python -m benchmarks.bench_single_instance [iterations]
+"""
+
+import sys
+import timeit
+from functools import partial
+
+from celery import Task
+from flask import Flask
+
+from flask_celery import Celery, single_instance
+
+REPEAT = 7
+
+
+def main() -> None:
+    """Run benchmark."""
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    app = Flask("bench_single_instance")
+    app.config.update(
+        CELERY_BROKER_URL="memory://",
+        CELERY_TASK_LOCK_BACKEND="memory://",
+        CELERY_TASK_APP_CONTEXT="none",
+    )
+    celery = Celery(app)
+
+    @celery.task(bind=True)
+    def plain(_self: Task, a: int, b: int) -> int:
+        return a + b
+
+    @celery.task(bind=True)
+    @single_instance
+    def locked(_self: Task, a: int, b: int) -> int:
+        return a + b
+
+    @celery.task(bind=True)
+    @single_instance(include_args=True)
+    def locked_args(_self: Task, a: int, b: int) -> int:
+        return a + b
+
+    results = {
+        task.name.rpartition(".")[2]: min(timeit.repeat(partial(task, 1, 2), number=iterations, repeat=REPEAT)) / iterations
+        for task in (plain, locked, locked_args)
+    }
+    for name, seconds in results.items():
+        overhead = seconds - results["plain"]
+        print(f"{name:<12} {seconds * 1e6:>7.2f} us per call, single_instance overhead {overhead * 1e6:>6.2f} us")
+
+
+if __name__ == "__main__":
+    main()
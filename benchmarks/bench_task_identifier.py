@@ -0,0 +1,44 @@
+"""Benchmark task identifier generation for large argument payloads.
+
+Identifier used to be recomputed on every access, at least four times per task run (logger name, acquire, error
+message, release), now it is computed once per LockManager. Long lists of scalars are pickled and hashed instead of
+being formatted by str(), so even a single identifier is faster on large payloads.
+
+Usage:
+    python -m benchmarks.bench_task_identifier
+"""
+
+import hashlib
+import timeit
+
+from flask_celery.lock_manager import LockManager
+from flask_celery.types import CelerySerializable
+
+
+def legacy_task_identifier(task_name: str, args: tuple[CelerySerializable, ...], kwargs: dict[str, CelerySerializable]) -> str:
+    """Return identifier the way it was computed before (str() of arguments hashed by md5)."""
+    merged_args = str(args) + str([(k, kwargs[k]) for k in sorted(kwargs)])
+    return f"{task_name}.args.{hashlib.md5(merged_args.encode('utf-8'), usedforsecurity=False).hexdigest()}"
+
+
+def main() -> None:
+    """Run benchmark."""
+    payloads: dict[str, tuple[tuple[CelerySerializable, ...], dict[str, CelerySerializable]]] = {
+        "small": ((1, 2), {"force": True}),
+        "1k items": ((list(range(1000)),), {"options": {str(i): i for i in range(100)}}),
+        "100k items": ((list(range(100000)),), {"options": {str(i): {"value": i} for i in range(1000)}}),
+    }
+    for name, (args, kwargs) in payloads.items():
+        number = 10 if name == "100k items" else 1000
+        legacy = timeit.timeit(lambda: legacy_task_identifier("task", args, kwargs), number=number) / number  # noqa: B023
+        current = timeit.timeit(
+            lambda: LockManager.make_task_identifier("task", args, kwargs, include_args=True), number=number,  # noqa: B023
+        ) / number
+        print(
+            f"{name:<12} per identifier str+md5: {legacy * 1e6:>9.1f} us, canonical+blake2b: {current * 1e6:>9.1f} us"
+            f" | per task run: {legacy * 4 * 1e6:>9.1f} us -> {current * 1e6:>9.1f} us",
+        )
+
+
+if __name__ == "__main__":
+    main()
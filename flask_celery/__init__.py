@@ -1,17 +1,27 @@
 """Flask Celery Helper."""
 
+import json
+import math
 import tempfile
+import time
 from collections.abc import Callable
-from functools import partial, wraps
+from dataclasses import dataclass, field
+from functools import cached_property, partial, wraps
 from pathlib import Path
-from typing import TypeVar, overload
+from typing import Any, TypeVar, cast, overload
 
 from celery import Celery as CeleryClass
-from celery import Task, _state
-from flask import Flask
-
-from flask_celery.backends.base import LockBackend
+from celery import Task, _state, uuid
+from celery.exceptions import Retry
+from celery.result import AsyncResult
+from celery.signals import worker_process_init, worker_ready, worker_shutdown
+from celery.utils.time import rate as parse_rate
+from flask import Flask, has_app_context
+
+from flask_celery.backends.base import AsyncLockBackend, LockBackend
+from flask_celery.cli import locks_cli
 from flask_celery.lock_manager import LockManager, select_lock_backend
+from flask_celery.lock_reaper import LockReaper
 from flask_celery.types import CelerySerializable
 
 __author__ = "@Salamek"
@@ -20,6 +30,317 @@ __version__ = "1.5.3"
 
 CT = TypeVar("CT")
 
+# CELERY_TASK_APP_CONTEXT values: app context pushed around every task run, pushed once per worker process (or thread)
+# and kept, not pushed at all
+APP_CONTEXT_STRATEGIES = ("task", "worker", "none")
+
+# Message header telling the worker that lock was reserved by task id when the task was enqueued
+RESERVED_HEADER = "flask_celery_lock_reserved"
+
+# Settings get_timeout falls back to, new and old style names, compared by SingleInstanceOptions.for_task on every call
+TIME_LIMIT_SETTINGS = ("task_soft_time_limit", "task_time_limit", "CELERYD_TASK_SOFT_TIME_LIMIT", "CELERYD_TASK_TIME_LIMIT")
+
+# Suffixes of task identifier: lock of pending run, last trigger of debounced task, last run of throttled task
+PENDING_SUFFIX = ".pending"
+DEBOUNCE_TRIGGER_SUFFIX = ".debounce_trigger"
+THROTTLE_RUN_SUFFIX = ".throttle_run"
+
+
+@dataclass(frozen=True)
+class SingleInstanceOptions:
+    """Options of single_instance, attached to decorated function as its single_instance attribute."""
+
+    lock_timeout: int | None
+    include_args: bool
+    lease: int | None
+    key_func: Callable[..., CelerySerializable] | None
+    wait: bool
+    wait_timeout: float | None
+    deduplicate: bool
+    max_instances: int
+    debounce: float | None = None
+    throttle: float | None = None
+    memoize: bool = False  # Results are cached in the lock backend
+    # Task name: values resolved on first run of the task
+    resolved: dict[str, "SingleInstanceTask"] = field(default_factory=dict, compare=False, repr=False)
+
+    def get_timeout(self, task: Task, *, reservation: bool = False) -> int:
+        """Return lock timeout of task, time limits are read from config.
+
+        :param task: task instance
+        :param reservation: timeout of lock reserved at enqueue, lease is not renewed until the task runs so it is not used
+        :return: timeout in seconds
+        """
+        # Rounded up, fractional time limit must not become 0 (lock without expiry)
+        return max(1, math.ceil(
+            (None if reservation else self.lease) or self.lock_timeout or task.soft_time_limit or task.time_limit
+            or task.app.conf.get("task_soft_time_limit")
+            or task.app.conf.get("task_time_limit")
+            or (60 * 5),
+        ))
+
+    def check_lock_backend(self, lock_backend: LockBackend, task_name: str) -> None:
+        """Check lock backend supports the options, called when task is bound to the app and when it is resolved.
+
+        :param lock_backend: lock backend
+        :param task_name: task name
+        :raise ValueError: lock backend does not support the options
+        :return: None
+        """
+        if (self.deduplicate or self.debounce or self.throttle) and not lock_backend.cross_process_ownership:
+            msg = (
+                f"{type(lock_backend).__name__} locks belong to the process acquiring them, worker can not take over lock"
+                f" reserved at enqueue. Task {task_name} uses deduplicate, debounce or throttle, use another lock backend."
+            )
+            raise ValueError(msg)
+        if (self.memoize or self.debounce or self.throttle) and not lock_backend.supports_cache:
+            msg = f"Task {task_name} uses memoize, debounce or throttle, {lock_backend.task_lock_backend_uri} lock backend has no cache."
+            raise ValueError(msg)
+
+    def for_task(self, task: Task) -> "SingleInstanceTask":
+        """Return values of task resolved on its first run, resolved again when its time limits change.
+
+        Time limits of task and config can be changed by plain assignment which notifies nobody, so they are compared
+        on every call. Config ones are read from conf.changes where every assignment and update() stores them, a dict
+        read is cheap while resolving the setting through conf is not.
+
+        :param task: task instance
+        :return: SingleInstanceTask
+        """
+        limits = (task.soft_time_limit, task.time_limit, *map(task.app.conf.changes.get, TIME_LIMIT_SETTINGS))
+        resolved = self.resolved.get(task.name)
+        if resolved is None or resolved.task is not task or resolved.limits != limits:
+            resolved = self.resolved[task.name] = SingleInstanceTask(self, task, limits)
+        return resolved
+
+    def lock_manager(
+            self,
+            task: Task,
+            args: tuple[CelerySerializable, ...],
+            kwargs: dict[str, CelerySerializable],
+            *,
+            reservation: bool = False,
+            token: str | None = None,
+            reserved: bool = False,
+    ) -> LockManager:
+        """Return lock manager of task instance.
+
+        :param task: task instance
+        :param args: task args
+        :param kwargs: task kwargs
+        :param reservation: manager reserves the lock at enqueue
+        :param token: owner token
+        :param reserved: lock was reserved by token at enqueue
+        :return: LockManager
+        """
+        return self.for_task(task).lock_manager(args, kwargs, reservation=reservation, token=token, reserved=reserved)
+
+
+class SingleInstanceTask:
+    """Values of single_instance task resolved once, so every run only builds its LockManager."""
+
+    __slots__ = (
+        "bound", "limits", "lock_backend", "options", "pending_timeout", "reservation_timeout", "task", "task_identifier",
+        "timeout",
+    )
+
+    def __init__(self, options: SingleInstanceOptions, task: Task, limits: tuple[object, ...]) -> None:
+        """SingleInstanceTask constructor.
+
+        :param options: single_instance options
+        :param task: task instance
+        :param limits: time limits of task and config the timeouts are resolved from
+        """
+        self.options = options
+        self.task = task
+        self.limits = limits
+        self.lock_backend: LockBackend = task.app.lock_backend
+        options.check_lock_backend(self.lock_backend, task.name)
+        self.bound: bool = task.__bound__
+        self.timeout = options.get_timeout(task)
+        self.reservation_timeout = options.get_timeout(task, reservation=True)
+        # Pending run of debounced or throttled task waits for its window before it is taken by worker
+        self.pending_timeout = self.reservation_timeout + math.ceil(options.debounce or options.throttle or 0)
+        # Identifier does not depend on arguments
+        self.task_identifier = task.name if not options.include_args and options.key_func is None else None
+
+    def lock_manager(
+            self,
+            args: tuple[CelerySerializable, ...],
+            kwargs: dict[str, CelerySerializable],
+            *,
+            reservation: bool = False,
+            token: str | None = None,
+            reserved: bool = False,
+    ) -> LockManager:
+        """Return lock manager of task instance.
+
+        :param args: task args
+        :param kwargs: task kwargs
+        :param reservation: manager reserves the lock at enqueue
+        :param token: owner token
+        :param reserved: lock was reserved by token at enqueue
+        :return: LockManager
+        """
+        options = self.options
+        timeout = self.reservation_timeout if reservation else self.timeout
+        return LockManager(
+            self.lock_backend,
+            self.task,
+            timeout,
+            args,
+            kwargs,
+            include_args=options.include_args,
+            renew=options.lease is not None and not reservation,
+            key_func=options.key_func,
+            # Pending run of debounced or throttled task waits for the running one, so the trailing trigger is kept
+            wait_timeout=(options.wait_timeout or timeout) if options.wait or options.debounce or options.throttle else None,
+            token=token,
+            reserved=reserved,
+            task_identifier=self.task_identifier,
+            max_instances=options.max_instances,
+        )
+
+    def apply_async(
+            self,
+            apply_async: Callable[..., AsyncResult],
+            args: tuple[CelerySerializable, ...] | list[CelerySerializable] | None,
+            kwargs: dict[str, CelerySerializable] | None,
+            task_id: str | None,
+            **options: Any,  # noqa: ANN401
+    ) -> AsyncResult | None:
+        """Publish task, reserve its lock (deduplicate) or its pending run (debounce, throttle) first.
+
+        Reservation owner token is the task id, worker takes the reservation over. Retry of running instance holding the
+        lock by its task id is published, its copy keeps the reservation. Pending run is published with countdown of its
+        window.
+
+        :param apply_async: Task.apply_async publishing the task
+        :param args: task args
+        :param kwargs: task kwargs
+        :param task_id: task id
+        :param options: apply_async options
+        :return: AsyncResult, of queued or running instance or of pending run when task was not published, None when its
+            owner is not known
+        """
+        if not (self.options.deduplicate or self.options.debounce or self.options.throttle) \
+                or (options.get("headers") or {}).get(RESERVED_HEADER):
+            # Nothing to reserve, or postponed copy of reserved task
+            return apply_async(args, kwargs, task_id, **options)
+
+        task_id = task_id or uuid()
+        lock_manager = self.lock_manager(tuple(args or ()), kwargs or {}, reservation=True, token=task_id)
+        if self.options.deduplicate:
+            reserved_identifier = lock_manager.task_identifier
+            if not lock_manager.reserve():
+                owner = self.lock_backend.get_owner(reserved_identifier, self.reservation_timeout)
+                # Released meanwhile when owner is gone, try once more
+                if owner != task_id and (owner is not None or not lock_manager.reserve()):
+                    return None if owner is None else self.task.AsyncResult(owner)
+        else:
+            reserved_identifier = lock_manager.task_identifier + PENDING_SUFFIX
+            countdown = self.trigger(lock_manager.task_identifier, task_id)
+            if countdown is None:
+                owner = self.lock_backend.get_owner(reserved_identifier, self.pending_timeout)
+                return None if owner is None else self.task.AsyncResult(owner)
+            options["countdown"] = max(countdown, options.get("countdown") or 0)
+
+        options["headers"] = {**(options.get("headers") or {}), RESERVED_HEADER: True}
+        try:
+            return apply_async(args, kwargs, task_id, **options)
+        except Exception:
+            self.lock_backend.release(reserved_identifier, task_id)
+            raise
+
+    def trigger(self, task_identifier: str, token: str) -> float | None:
+        """Record trigger of debounced or throttled task at enqueue, reserve its pending run.
+
+        :param task_identifier: task identifier
+        :param token: task id of pending run
+        :return: countdown of pending run, None when trigger was collapsed into already pending run
+        """
+        now = time.time()
+        if self.options.debounce:
+            self.lock_backend.cache_set(
+                task_identifier + DEBOUNCE_TRIGGER_SUFFIX, repr(now).encode(), math.ceil(self.options.debounce) + 1,
+            )
+        if not self.lock_backend.acquire(task_identifier + PENDING_SUFFIX, self.pending_timeout, token):
+            return None
+        return self.remaining(task_identifier, now)
+
+    def remaining(self, task_identifier: str, now: float) -> float:
+        """Return seconds until debounce window after last trigger or throttle window after last run passes.
+
+        :param task_identifier: task identifier
+        :param now: current time
+        :return: seconds, 0.0 when pending run can start
+        """
+        if self.options.debounce:
+            stored, window = self.lock_backend.cache_get(task_identifier + DEBOUNCE_TRIGGER_SUFFIX), self.options.debounce
+        else:
+            stored, window = self.lock_backend.cache_get(task_identifier + THROTTLE_RUN_SUFFIX), self.options.throttle or 0
+        return 0.0 if stored is None else max(float(stored) + window - now, 0.0)
+
+    def start(self, task_identifier: str) -> None:
+        """Postpone pending run of debounced or throttled task until its window passed.
+
+        :param task_identifier: task identifier
+        :return: None
+        """
+        token = self.task.request.id
+        while remaining := self.remaining(task_identifier, time.time()):
+            if token:
+                self.lock_backend.extend(task_identifier + PENDING_SUFFIX, self.pending_timeout, token)
+            postpone(self.task, remaining)
+
+    def started(self, task_identifier: str) -> None:
+        """Record run of throttled task and release pending run, once the run holds its lock.
+
+        Triggers while the pending run waits for the running one still collapse into it, trigger arriving once it runs
+        reserves next pending run, so the trailing trigger is never lost.
+
+        :param task_identifier: task identifier
+        :return: None
+        """
+        if self.options.throttle:
+            self.lock_backend.cache_set(
+                task_identifier + THROTTLE_RUN_SUFFIX, repr(time.time()).encode(), math.ceil(self.options.throttle) + 1,
+            )
+        if token := self.task.request.id:
+            self.lock_backend.release(task_identifier + PENDING_SUFFIX, token)
+
+
+def is_reserved(task: Task) -> bool:
+    """Check if lock of running task was reserved when it was enqueued.
+
+    Custom headers are in request.headers of eager tasks and request attributes of tasks received by worker.
+
+    :param task: running task
+    :return: bool
+    """
+    request = task.request
+    return bool((request.headers or {}).get(RESERVED_HEADER) or getattr(request, RESERVED_HEADER, False))
+
+
+def postpone(task: Task, countdown: float) -> None:
+    """Publish running task again with countdown and raise Retry, retries are not incremented.
+
+    Eager task and task called directly sleep instead and return, reservation of the task is kept in published copy.
+
+    :param task: running task
+    :param countdown: seconds
+    :raise Retry: task was published again
+    :return: None
+    """
+    request = task.request
+    if request.is_eager or request.called_directly:
+        time.sleep(countdown)
+        return
+    options = {"headers": {**(request.headers or {}), RESERVED_HEADER: True}} if is_reserved(task) else {}
+    signature = task.signature_from_request(countdown=countdown, **options)
+    signature.apply_async()
+    raise Retry(when=countdown, sig=signature)
+
 
 class _CeleryState:
     """Remember the configuration for the (celery, app) tuple. Modeled from SQLAlchemy."""
@@ -48,6 +369,8 @@ class Celery(CeleryClass):  # type: ignore[misc]
     """
 
     lock_backend: LockBackend|None
+    lock_reaper: LockReaper|None
+    worker_app: Flask|None  # App whose context is pushed once per worker process, CELERY_TASK_APP_CONTEXT=worker
 
     def __init__(self, app: Flask|None=None) -> None:
         """If app argument provided then initialize celery using application config values.
@@ -59,12 +382,22 @@ class Celery(CeleryClass):  # type: ignore[misc]
         # Backup Celery app registration function.
         self.original_register_app = _state._register_app  # noqa: SLF001
         self.lock_backend = None
+        self.lock_reaper = None
+        self.worker_app = None
         # Upon Celery app registration attempt, do nothing.
         _state._register_app = lambda _: None  # noqa: SLF001
         super().__init__()
         if app is not None:
             self.init_app(app)
 
+    @cached_property
+    def async_lock_backend(self) -> AsyncLockBackend:
+        """Return asyncio lock backend sharing locks with lock_backend, created on first use."""
+        if self.lock_backend is None:
+            msg = "Lock backend is not initialized, call init_app first."
+            raise RuntimeError(msg)
+        return self.lock_backend.to_async()
+
     def init_app(self, app: Flask) -> None:
         """Actual method to read celery settings from app configuration and initialize the celery instance.
 
@@ -78,12 +411,61 @@ class Celery(CeleryClass):  # type: ignore[misc]
             msg = "Already registered extension CELERY."
             raise ValueError(msg)
         app.extensions["celery"] = _CeleryState(self, app)
+        app.cli.add_command(locks_cli)
+
+        app_context_strategy = app.config.get("CELERY_TASK_APP_CONTEXT", "task")
+        if app_context_strategy not in APP_CONTEXT_STRATEGIES:
+            msg = f"Unknown CELERY_TASK_APP_CONTEXT {app_context_strategy!r}, use one of {', '.join(APP_CONTEXT_STRATEGIES)}."
+            raise ValueError(msg)
+        worker_app_context = app_context_strategy == "worker"
+        self.worker_app = app if worker_app_context else None
 
         class FlaskTask(Task):  # type: ignore[misc]
+            # Task option, @celery.task(app_context=False) runs the task without app context
+            app_context = app_context_strategy != "none"
+
             def __call__(self, *args: object, **kwargs: object) -> object:
+                if not self.app_context:
+                    return self.run(*args, **kwargs)
+                if worker_app_context:
+                    if has_app_context():
+                        return self.run(*args, **kwargs)
+                    if not self.request.is_eager:
+                        # Worker thread not initialized by worker_process_init (solo, threads pool), keep context pushed
+                        app.app_context().push()
+                        return self.run(*args, **kwargs)
                 with app.app_context():
                     return self.run(*args, **kwargs)
 
+            @classmethod
+            def on_bound(cls, celery: CeleryClass) -> None:
+                """Fail early when decorated task needs lock backend feature the configured backend lacks."""
+                for decorator in ("single_instance", "rate_limited"):
+                    options: SingleInstanceOptions | RateLimitOptions | None = getattr(cls.run, decorator, None)
+                    if options is not None and celery.lock_backend is not None:
+                        options.check_lock_backend(celery.lock_backend, cls.name)
+
+            def apply_async(
+                    self,
+                    args: tuple[CelerySerializable, ...] | list[CelerySerializable] | None = None,
+                    kwargs: dict[str, CelerySerializable] | None = None,
+                    task_id: str | None = None,
+                    **options: Any,  # noqa: ANN401
+            ) -> AsyncResult | None:
+                """Publish task, skip it when single_instance(deduplicate=True) task instance is already queued or running.
+
+                Lock is reserved with task id as owner token before publishing, worker takes the reservation over.
+                Debounced and throttled task is published with countdown of its window, trigger while its run is
+                pending is not published.
+
+                :return: AsyncResult, of the queued or running instance when duplicate was not published, None when
+                    lock backend does not store its task id
+                """
+                single_instance_options: SingleInstanceOptions | None = getattr(self.run, "single_instance", None)
+                if single_instance_options is None:
+                    return super().apply_async(args, kwargs, task_id, **options)
+                return single_instance_options.for_task(self).apply_async(super().apply_async, args, kwargs, task_id, **options)
+
         # Instantiate celery and read config.
         super().__init__(
             app.import_name,
@@ -103,7 +485,19 @@ class Celery(CeleryClass):  # type: ignore[misc]
 
         # Instantiate lock backend
         lock_backend_class = select_lock_backend(task_lock_backend_name)
-        self.lock_backend = lock_backend_class(task_lock_backend_name)
+        lock_backend_options = app.config.get("CELERY_TASK_LOCK_BACKEND_OPTIONS") or {}
+        self.lock_backend = lock_backend_class(task_lock_backend_name, **lock_backend_options)
+
+        # Remove expired locks from worker main process when enabled
+        reaper_max_age = app.config.get("CELERY_TASK_LOCK_REAPER_MAX_AGE")
+        if reaper_max_age:
+            self.lock_reaper = LockReaper(
+                self.lock_backend,
+                reaper_max_age,
+                batch_size=app.config.get("CELERY_TASK_LOCK_REAPER_BATCH_SIZE", 500),
+                interval=app.config.get("CELERY_TASK_LOCK_REAPER_INTERVAL", 60),
+                pause=app.config.get("CELERY_TASK_LOCK_REAPER_PAUSE", 0.1),
+            )
 
         # Set result backend default.
         if "CELERY_RESULT_BACKEND" in app.config:
@@ -117,12 +511,61 @@ class Celery(CeleryClass):  # type: ignore[misc]
         self.conf.update(celery_config)
 
 
+@worker_process_init.connect
+def push_worker_app_context(**_kwargs: object) -> None:
+    """Push app context once in new worker process, when the app of the worker uses CELERY_TASK_APP_CONTEXT=worker.
+
+    Connected once for all instances, worker_process_init has no sender, pool sets the app of the worker as current
+    before sending it.
+    """
+    celery = _state.get_current_app()
+    if isinstance(celery, Celery) and celery.worker_app is not None:
+        celery.worker_app.app_context().push()
+
+
+def worker_lock_reaper(sender: object) -> LockReaper | None:
+    """Return lock reaper of the app of worker sending signal, the current app when sender has none.
+
+    :param sender: worker signal sender, consumer or WorkController
+    :return: LockReaper, None when the app does not reap expired locks
+    """
+    celery = getattr(sender, "app", None) or _state.get_current_app()
+    return celery.lock_reaper if isinstance(celery, Celery) else None
+
+
+@worker_ready.connect
+def start_lock_reaper(sender: object = None, **_kwargs: object) -> None:
+    """Start lock reaper in worker main process, when the app of the worker sets CELERY_TASK_LOCK_REAPER_MAX_AGE.
+
+    Connected once for all instances like push_worker_app_context, so apps initialized again do not stack receivers.
+    """
+    lock_reaper = worker_lock_reaper(sender)
+    if lock_reaper is not None:
+        lock_reaper.start()
+
+
+@worker_shutdown.connect
+def stop_lock_reaper(sender: object = None, **_kwargs: object) -> None:
+    """Stop lock reaper started by start_lock_reaper."""
+    lock_reaper = worker_lock_reaper(sender)
+    if lock_reaper is not None:
+        lock_reaper.stop()
+
+
 @overload
 def single_instance(
         func: Callable[..., CT],
         lock_timeout: int|None=None,
         *,
         include_args:bool=False,
+        lease: int|None=None,
+        key_func: Callable[..., CelerySerializable]|None=None,
+        wait: bool=False,
+        wait_timeout: float|None=None,
+        deduplicate: bool=False,
+        max_instances: int=1,
+        debounce: float|None=None,
+        throttle: float|None=None,
 ) -> Callable[..., CT]: ...
 
 @overload
@@ -131,13 +574,29 @@ def single_instance(
         lock_timeout: int|None=None,
         *,
         include_args:bool=False,
+        lease: int|None=None,
+        key_func: Callable[..., CelerySerializable]|None=None,
+        wait: bool=False,
+        wait_timeout: float|None=None,
+        deduplicate: bool=False,
+        max_instances: int=1,
+        debounce: float|None=None,
+        throttle: float|None=None,
 ) -> Callable[[Callable[..., CT]], Callable[..., CT]]: ...
 
-def single_instance(
+def single_instance(  # noqa: PLR0913
         func: Callable[..., CT]|None=None,
         lock_timeout: int|None=None,
         *,
         include_args:bool=False,
+        lease: int|None=None,
+        key_func: Callable[..., CelerySerializable]|None=None,
+        wait: bool=False,
+        wait_timeout: float|None=None,
+        deduplicate: bool=False,
+        max_instances: int=1,
+        debounce: float|None=None,
+        throttle: float|None=None,
 ) -> Callable[..., CT] | Callable[[Callable[..., CT]], Callable[..., CT]]:
     """Celery task decorator. Forces the task to have only one running instance at a time.
 
@@ -155,39 +614,257 @@ def single_instance(
     :param int lock_timeout: Lock timeout in seconds plus five more seconds, in-case the task crashes and fails to
         release the lock. If not specified, the values of the task's soft/hard limits are used. If all else fails,
         timeout will be 5 minutes.
-    :param bool include_args: Include the md5 checksum of the arguments passed to the task in the Redis key. This allows
-        the same task to run with different arguments, only stopping a task from running if another instance of it is
-        running with the same arguments.
+    :param bool include_args: Include the hash of the arguments passed to the task in the lock key. This allows the same
+        task to run with different arguments, only stopping a task from running if another instance of it is running
+        with the same arguments.
+    :param int lease: Opt-in lease mode, lock is taken for this many seconds and renewed in background while the task
+        runs, lock_timeout and time limits are ignored. Lock of a crashed worker expires within the lease.
+    :param key_func: Like include_args, but only the value returned by key_func(*args, **kwargs) is hashed into the lock
+        key, e.g. lambda user_id, **_: user_id.
+    :param bool wait: Wait in the worker for the lock to be released instead of raising OtherInstanceError at once.
+    :param float wait_timeout: Max seconds to wait for the lock when wait is set, defaults to the lock timeout.
+    :param bool deduplicate: Opt-in enqueue time deduplication, apply_async/delay reserve the lock before publishing and
+        return AsyncResult of another instance without publishing when it is queued or running. Lock timeout has to
+        cover the time task waits in queue. Requires lock backend with cross_process_ownership.
+    :param int max_instances: Allow up to this many instances running at once (counting semaphore), lock of every
+        instance expires like single lock. Cannot be combined with deduplicate.
+    :param float debounce: Run once, this many seconds after the last trigger. apply_async/delay publishes one pending
+        run and returns its AsyncResult for triggers while it is pending, worker postpones it until triggers settle.
+    :param float throttle: Run at most once per this many seconds, trigger within the window is kept as one pending run
+        at the end of the window. With debounce and throttle the pending run always waits for the running one, as with
+        wait=True. Both require lock backend with cross_process_ownership and cache (not pgadvisory, not memory backend
+        with shared table).
     """
+    if max_instances < 1:
+        msg = f"max_instances has to be at least 1, got {max_instances}."
+        raise ValueError(msg)
+    if deduplicate and max_instances > 1:
+        msg = "deduplicate reserves single lock, it cannot be combined with max_instances."
+        raise ValueError(msg)
+    if debounce and throttle:
+        msg = "Use either debounce or throttle."
+        raise ValueError(msg)
+    if deduplicate and (debounce or throttle):
+        msg = "debounce and throttle collapse triggers already, they cannot be combined with deduplicate."
+        raise ValueError(msg)
+
     if func is None:
-        return partial(single_instance, lock_timeout=lock_timeout, include_args=include_args)
+        return partial(
+            single_instance,
+            lock_timeout=lock_timeout,
+            include_args=include_args,
+            lease=lease,
+            key_func=key_func,
+            wait=wait,
+            wait_timeout=wait_timeout,
+            deduplicate=deduplicate,
+            max_instances=max_instances,
+            debounce=debounce,
+            throttle=throttle,
+        )
+
+    options = SingleInstanceOptions(
+        lock_timeout, include_args, lease, key_func, wait, wait_timeout, deduplicate, max_instances, debounce, throttle,
+    )
 
     @wraps(func)
     def wrapped(celery_self: Task, *args: CelerySerializable, **kwargs: CelerySerializable) -> CT:
         """Wrapp Celery task, for single_instance()."""
-        # Select the manager and get timeout.
-        timeout = (
-            lock_timeout or celery_self.soft_time_limit or celery_self.time_limit
-            or celery_self.app.conf.get("task_soft_time_limit")
-            or celery_self.app.conf.get("task_time_limit")
-            or (60 * 5)
-        )
-
-        lock_manager = LockManager(
-            celery_self.app.lock_backend,
-            celery_self,
-            timeout,
-            args,
-            kwargs,
-            include_args=include_args,
-        )
+        single_instance_task = options.for_task(celery_self)
+        reserved = options.deduplicate and is_reserved(celery_self)
+        # Deduplicated instance holds the lock by its task id, so its retry is recognized at enqueue
+        token = celery_self.request.id if options.deduplicate else None
+        lock_manager = single_instance_task.lock_manager(args, kwargs, token=token, reserved=reserved)
+        debounced = bool(options.debounce or options.throttle)
+        if debounced:
+            single_instance_task.start(lock_manager.task_identifier)
 
         # Lock and execute.
-        with lock_manager:
+        try:
+            with lock_manager:
+                if debounced:
+                    single_instance_task.started(lock_manager.task_identifier)
+                if single_instance_task.bound:
+                    return func(celery_self, *args, **kwargs)
+
+                return func(*args, **kwargs)
+        except Retry:
+            if token:
+                # Published retry keeps the reservation, duplicates enqueued meanwhile return its AsyncResult
+                single_instance_task.lock_backend.acquire(lock_manager.task_identifier, single_instance_task.reservation_timeout, token)
+            raise
+
+    wrapped.single_instance = options  # type: ignore[attr-defined]
+    return wrapped
+
+
+@overload
+def memoize(
+        func: Callable[..., CT],
+        ttl: int=300,
+        *,
+        lock_timeout: int|None=None,
+        key_func: Callable[..., CelerySerializable]|None=None,
+        wait_timeout: float|None=None,
+) -> Callable[..., CT]: ...
+
+@overload
+def memoize(
+        func: None=None,
+        ttl: int=300,
+        *,
+        lock_timeout: int|None=None,
+        key_func: Callable[..., CelerySerializable]|None=None,
+        wait_timeout: float|None=None,
+) -> Callable[[Callable[..., CT]], Callable[..., CT]]: ...
+
+def memoize(
+        func: Callable[..., CT]|None=None,
+        ttl: int=300,
+        *,
+        lock_timeout: int|None=None,
+        key_func: Callable[..., CelerySerializable]|None=None,
+        wait_timeout: float|None=None,
+) -> Callable[..., CT] | Callable[[Callable[..., CT]], Callable[..., CT]]:
+    """Celery task decorator. Caches task result in the lock backend by task arguments, for pure tasks.
+
+    Use with binded tasks (@celery.task(bind=True)). Lock is the one of single_instance(include_args=True), identical
+    calls while one instance runs wait for it and return its cached result instead of raising OtherInstanceError.
+    Result has to be JSON serializable.
+
+    :raise OtherInstanceError: If identical instance did not finish within wait_timeout.
+    :raise ValueError: When the task is bound to the app and its lock backend has no cache (pgadvisory, memory backend
+        with shared table).
+
+    :param function func: The function to decorate, must be also decorated by @celery.task.
+    :param int ttl: Seconds the result is cached for.
+    :param int lock_timeout: Lock timeout in seconds, defaults to the task's time limits like in single_instance.
+    :param key_func: Called with task args and kwargs, returns the part of arguments identifying the result.
+    :param float wait_timeout: Max seconds to wait for running identical instance, defaults to the lock timeout.
+    """
+    if func is None:
+        return partial(memoize, ttl=ttl, lock_timeout=lock_timeout, key_func=key_func, wait_timeout=wait_timeout)
+
+    options = SingleInstanceOptions(
+        lock_timeout=lock_timeout,
+        include_args=True,
+        lease=None,
+        key_func=key_func,
+        wait=True,
+        wait_timeout=wait_timeout,
+        deduplicate=False,
+        max_instances=1,
+        memoize=True,
+    )
+
+    @wraps(func)
+    def wrapped(celery_self: Task, *args: CelerySerializable, **kwargs: CelerySerializable) -> CT:
+        """Wrapp Celery task, for memoize()."""
+        single_instance_task = options.for_task(celery_self)
+        lock_backend = single_instance_task.lock_backend
+        lock_manager = single_instance_task.lock_manager(args, kwargs)
+        cached = lock_backend.cache_get(lock_manager.task_identifier)
+        if cached is None:
+            with lock_manager:
+                # Identical instance holding the lock before may have cached its result
+                cached = lock_backend.cache_get(lock_manager.task_identifier)
+                if cached is None:
+                    result = func(celery_self, *args, **kwargs) if single_instance_task.bound else func(*args, **kwargs)
+                    lock_backend.cache_set(lock_manager.task_identifier, json.dumps(result).encode(), ttl)
+                    return result
+        return cast("CT", json.loads(cached))
+
+    wrapped.single_instance = options  # type: ignore[attr-defined]
+    return wrapped
+
+@dataclass(frozen=True)
+class RateLimitOptions:
+    """Options of rate_limited, attached to decorated function as its rate_limited attribute."""
+
+    key: str | None
+    interval: float
+    burst: int
+    # Task name: lock backend checked on first run of the task
+    checked: dict[str, LockBackend] = field(default_factory=dict, compare=False, repr=False)
+
+    def check_lock_backend(self, lock_backend: LockBackend, task_name: str) -> None:
+        """Check lock backend supports rate limit, called when task is bound to the app and on its first run.
+
+        :param lock_backend: lock backend
+        :param task_name: task name
+        :raise ValueError: lock backend does not support rate limit
+        :return: None
+        """
+        if not lock_backend.supports_rate_limit:
+            msg = f"Task {task_name} uses rate_limited, {lock_backend.task_lock_backend_uri} lock backend has no rate limit."
+            raise ValueError(msg)
+        self.checked[task_name] = lock_backend
+
+
+@overload
+def rate_limited(
+        key: Callable[..., CT],
+        rate: str="100/s",
+        *,
+        burst: int=1,
+) -> Callable[..., CT]: ...
+
+@overload
+def rate_limited(
+        key: str|None=None,
+        rate: str="100/s",
+        *,
+        burst: int=1,
+) -> Callable[[Callable[..., CT]], Callable[..., CT]]: ...
+
+def rate_limited(
+        key: str|Callable[..., CT]|None=None,
+        rate: str="100/s",
+        *,
+        burst: int=1,
+) -> Callable[..., CT] | Callable[[Callable[..., CT]], Callable[..., CT]]:
+    """Celery task decorator. Limits how often the task starts across all workers, Celery's rate_limit is per worker.
+
+    Use with binded tasks (@celery.task(bind=True)), bare @rate_limited limits the task at the default rate. Calls are
+    counted by GCRA (generic cell rate algorithm) in the lock backend, one atomic operation per call. Task over the
+    limit does not run, it is published again with countdown of when it will be allowed and does not count as retry.
+    Eager task and task called directly sleep instead.
+
+    :raise ValueError: When the task is bound to the app and its lock backend has no rate limit (pgadvisory).
+
+    :param str key: Rate limit key, tasks with the same key share the limit. Defaults to the task name.
+    :param str rate: Calls per second, minute or hour in Celery rate_limit format, e.g. "100/s" or "10/m".
+    :param int burst: Calls allowed at once before they are spaced by the rate.
+    """
+    if callable(key):
+        # Bare decorator, key is the decorated function
+        return rate_limited(rate=rate, burst=burst)(key)
+
+    per_second = parse_rate(rate)
+    if per_second <= 0:
+        msg = f"Invalid rate {rate!r}, use e.g. 100/s."
+        raise ValueError(msg)
+    if burst < 1:
+        msg = f"burst has to be at least 1, got {burst}."
+        raise ValueError(msg)
+    options = RateLimitOptions(key, 1 / per_second, burst)
+
+    def decorator(func: Callable[..., CT]) -> Callable[..., CT]:
+        @wraps(func)
+        def wrapped(celery_self: Task, *args: CelerySerializable, **kwargs: CelerySerializable) -> CT:
+            """Wrapp Celery task, for rate_limited()."""
+            lock_backend: LockBackend = celery_self.app.lock_backend
+            if options.checked.get(celery_self.name) is not lock_backend:
+                options.check_lock_backend(lock_backend, celery_self.name)
+            while wait := lock_backend.rate_limit(options.key or celery_self.name, options.interval, options.burst):
+                postpone(celery_self, wait)
+
             if celery_self.__bound__:
-                modified_args = list(args)
-                modified_args.insert(0, celery_self)
-                return func(*modified_args, **kwargs)
+                return func(celery_self, *args, **kwargs)
 
             return func(*args, **kwargs)
-    return wrapped
+
+        wrapped.rate_limited = options  # type: ignore[attr-defined]
+        return wrapped
+
+    return decorator
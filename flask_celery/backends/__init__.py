@@ -1 +1,46 @@
 """Lock backends."""
+
+from functools import cache
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from flask_celery.backends.base import LockBackend
+
+# Entry point group third party packages register backend classes in, entry point name is the URI scheme
+ENTRY_POINT_GROUP = "flask_celery.lock_backends"
+
+# URI scheme (part before "+"): backend class, module is imported on first use only
+LOCK_BACKENDS = {
+    "redis": "flask_celery.backends.redis:LockBackendRedis",
+    "rediss": "flask_celery.backends.redis:LockBackendRedis",
+    "sqla": "flask_celery.backends.database:LockBackendDb",
+    "db": "flask_celery.backends.database:LockBackendDb",
+    "mysql": "flask_celery.backends.database:LockBackendDb",
+    "postgresql": "flask_celery.backends.database:LockBackendDb",
+    "sqlite": "flask_celery.backends.database:LockBackendDb",
+    "file": "flask_celery.backends.filesystem:LockBackendFilesystem",
+    "memory": "flask_celery.backends.memory:LockBackendMemory",
+    "pgadvisory": "flask_celery.backends.pgadvisory:LockBackendPgAdvisory",
+}
+
+
+@cache
+def load_lock_backend(scheme: str) -> "type[LockBackend] | None":
+    """Import backend class registered for URI scheme, built-in backends first, then entry points.
+
+    :param scheme: URI scheme without driver, e.g. redis for redis+socket://
+    :return: backend class, None when no backend is registered for scheme
+    """
+    target = LOCK_BACKENDS.get(scheme)
+    if target is not None:
+        module_name, _, class_name = target.partition(":")
+        backend_class: type[LockBackend] = getattr(import_module(module_name), class_name)
+        return backend_class
+
+    from importlib.metadata import entry_points  # noqa: PLC0415, metadata scan is slow, done only for unknown schemes
+
+    for entry_point in entry_points(group=ENTRY_POINT_GROUP, name=scheme):
+        loaded: type[LockBackend] = entry_point.load()
+        return loaded
+    return None
@@ -1,11 +1,55 @@
 """Lock backend."""
 
+import asyncio
+import random
+import time
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass
 from logging import getLogger
 
 
+@dataclass(frozen=True)
+class LockInfo:
+    """Lock listed by LockBackend.iter_locks."""
+
+    task_identifier: str
+    age: float | None  # seconds since lock was acquired or renewed, None when backend does not know
+    ttl: float | None  # seconds until lock expires (negative when expired), None when unknown or lock never expires
+    owner: str | None = None  # owner token, the id of task holding the lock by default, None when backend does not know
+
+
+def gcra(now: float, tat: float | None, interval: float, burst: int) -> tuple[float, float]:
+    """Take one call of GCRA (generic cell rate algorithm) rate limit.
+
+    State is single theoretical arrival time (TAT) per key, call is allowed when it does not push TAT more than burst
+    intervals ahead of now. TAT in the past is the same as no state.
+
+    :param now: current time in seconds
+    :param tat: stored theoretical arrival time, None when there is none
+    :param interval: seconds between calls at the limit
+    :param burst: calls allowed at once
+    :return: seconds until the call is allowed (0.0 when allowed now), TAT to store when allowed
+    """
+    start = now if tat is None else max(tat, now)
+    # Computed from start rather than new_tat, adding and subtracting interval leaves rounding error instead of 0.0
+    return max(start - now - interval * (burst - 1), 0.0), start + interval
+
+
 class LockBackend:
     """Abstract class for implementation of LockBackend."""
 
+    SLOT_NAME = "{}.slot.{}"
+    CACHE_MAX_ENTRIES = 10000  # Enforced by purge_cache of backends not evicting entries by themselves
+    CACHE_PURGE_INTERVAL = 100  # Such backends run purge_cache once per this many cache_set calls of the process
+
+    # Lock acquired with owner token can be extended and released by any process passing the token, required by locks
+    # reserved at enqueue and taken over by the worker (deduplicate, debounce, throttle)
+    cross_process_ownership = True
+    # cache_get and cache_set are implemented, required by memoize, debounce and throttle
+    supports_cache = False
+    # rate_limit is implemented, required by rate_limited
+    supports_rate_limit = False
+
     def __init__(self, task_lock_backend_uri: str) -> None:
         """LockBackend constructor.
 
@@ -13,24 +57,37 @@ class LockBackend:
         """
         self.task_lock_backend_uri = task_lock_backend_uri
         self.log = getLogger(f"{self.__class__.__name__}")
+        self.cache_writes = 0
 
-    def acquire(self, task_identifier: str, timeout: int) -> bool:
+    def acquire(self, task_identifier: str, timeout: int, token: str | None = None) -> bool:
         """Acquire lock.
 
         :param task_identifier: task identifier
         :param timeout: lock timeout
+        :param token: owner token
         :return: bool
         """
         raise NotImplementedError
 
-    def release(self, task_identifier: str) -> None:
+    def release(self, task_identifier: str, token: str | None = None) -> None:
         """Release lock.
 
         :param task_identifier: task identifier
+        :param token: owner token, backends storing owner remove lock only when held by this owner
         :return: None
         """
         raise NotImplementedError
 
+    def extend(self, task_identifier: str, timeout: int, token: str) -> bool:
+        """Reset lock timeout, used to renew lease of lock held by running task.
+
+        :param task_identifier: task identifier
+        :param timeout: new lock timeout
+        :param token: owner token
+        :return: bool, False when lock does not exist anymore
+        """
+        raise NotImplementedError
+
     def exists(self, task_identifier: str, timeout: int) -> bool:
         """Check if lock exists and is valid.
 
@@ -39,3 +96,298 @@ class LockBackend:
         :return: bool
         """
         raise NotImplementedError
+
+    def get_owner(self, task_identifier: str, timeout: int) -> str | None:
+        """Return owner token of valid lock.
+
+        :param task_identifier: task identifier
+        :param timeout: lock timeout
+        :return: owner token, None when lock does not exist, expired or backend does not store owner
+        """
+        _ = task_identifier, timeout
+        return None
+
+    def wait_for_release(self, task_identifier: str, timeout: float) -> None:
+        """Block until lock was possibly released or timeout passed.
+
+        Backends with release notifications override this to wake up as soon as lock is released, default just sleeps.
+
+        :param task_identifier: task identifier
+        :param timeout: max seconds to wait
+        :return: None
+        """
+        _ = task_identifier
+        time.sleep(timeout)
+
+    def acquire_slot(self, task_identifier: str, limit: int, timeout: int, token: str) -> str | None:
+        """Acquire one of limit slots of counting semaphore.
+
+        Default tries slot locks task_identifier.slot.N starting at random one, so concurrent workers rarely compete
+        for the same slot. Expired slots are taken over like expired locks.
+
+        :param task_identifier: task identifier
+        :param limit: max concurrent holders
+        :param timeout: slot timeout
+        :param token: owner token
+        :return: acquired slot passed to release_slot and extend_slot, None when all slots are held
+        """
+        start = random.randrange(limit)  # noqa: S311
+        for i in range(limit):
+            slot = self.SLOT_NAME.format(task_identifier, (start + i) % limit)
+            if self.acquire(slot, timeout, token):
+                return slot
+        return None
+
+    def release_slot(self, slot: str, token: str) -> None:
+        """Release semaphore slot.
+
+        :param slot: slot returned by acquire_slot
+        :param token: owner token
+        :return: None
+        """
+        self.release(slot, token)
+
+    def extend_slot(self, slot: str, timeout: int, token: str) -> bool:
+        """Reset semaphore slot timeout.
+
+        :param slot: slot returned by acquire_slot
+        :param timeout: new slot timeout
+        :param token: owner token
+        :return: bool, False when slot is not held by owner anymore
+        """
+        return self.extend(slot, timeout, token)
+
+    def rate_limit(self, key: str, interval: float, burst: int) -> float:
+        """Take one call of GCRA rate limit shared by all workers, atomically.
+
+        :param key: rate limit key
+        :param interval: seconds between calls at the limit
+        :param burst: calls allowed at once
+        :return: seconds until the call is allowed, 0.0 when it is allowed now and was counted
+        """
+        raise NotImplementedError
+
+    def acquire_many(self, task_identifiers: Sequence[str], timeout: int, token: str | None = None) -> dict[str, bool]:
+        """Acquire many locks, backends override this to use one round trip.
+
+        :param task_identifiers: task identifiers
+        :param timeout: lock timeout
+        :param token: owner token
+        :return: dict task identifier: acquired
+        """
+        return {task_identifier: self.acquire(task_identifier, timeout, token) for task_identifier in task_identifiers}
+
+    def release_many(self, task_identifiers: Sequence[str], token: str | None = None) -> None:
+        """Release many locks, backends override this to use one round trip.
+
+        :param task_identifiers: task identifiers
+        :param token: owner token
+        :return: None
+        """
+        for task_identifier in task_identifiers:
+            self.release(task_identifier, token)
+
+    def exists_many(self, task_identifiers: Sequence[str], timeout: int) -> dict[str, bool]:
+        """Check if locks exist and are valid, backends override this to use one round trip.
+
+        :param task_identifiers: task identifiers
+        :param timeout: lock timeout
+        :return: dict task identifier: exists
+        """
+        return {task_identifier: self.exists(task_identifier, timeout) for task_identifier in task_identifiers}
+
+    def iter_locks(self, prefix: str = "", timeout: int | None = None, batch_size: int = 1000) -> Iterator[LockInfo]:
+        """Iterate locks, expired ones still stored included, fetching batch_size of them at once.
+
+        :param prefix: task identifier prefix, e.g. task name
+        :param timeout: lock timeout to compute ttl with on backends not storing expiry
+        :param batch_size: max locks fetched per round trip
+        :return: iterator of locks
+        """
+        raise NotImplementedError
+
+    def count_locks(self, prefix: str = "") -> int:
+        """Count locks.
+
+        :param prefix: task identifier prefix
+        :return: int
+        """
+        return sum(1 for _ in self.iter_locks(prefix))
+
+    def expire_locks(self, prefix: str = "", older_than: float | None = None, batch_size: int = 1000) -> int:
+        """Remove locks regardless of owner, in batches.
+
+        :param prefix: task identifier prefix
+        :param older_than: remove only locks older than this many seconds, locks of unknown age are kept
+        :param batch_size: max locks removed per round trip
+        :return: number of removed locks
+        """
+        removed = 0
+        batch: list[str] = []
+        for lock in self.iter_locks(prefix, batch_size=batch_size):
+            if older_than is not None and (lock.age is None or lock.age < older_than):
+                continue
+            batch.append(lock.task_identifier)
+            if len(batch) >= batch_size:
+                self.release_many(batch)
+                removed += len(batch)
+                batch = []
+        if batch:
+            self.release_many(batch)
+            removed += len(batch)
+        return removed
+
+    def purge_expired(self, max_age: int, batch_size: int = 1000) -> int:
+        """Remove at most batch_size locks older than max_age, backends expiring locks by themselves return 0.
+
+        :param max_age: age in seconds after which lock is expired, at least the longest lock timeout in use
+        :param batch_size: max locks removed
+        :return: number of removed locks, batch_size when more expired locks may be left
+        """
+        _ = max_age, batch_size
+        return 0
+
+    def cache_get(self, key: str) -> bytes | None:
+        """Return cached value.
+
+        :param key: cache key
+        :return: value, None when it is not cached or expired
+        """
+        raise NotImplementedError
+
+    def cache_set(self, key: str, value: bytes, ttl: int) -> None:
+        """Cache value.
+
+        :param key: cache key
+        :param value: value
+        :param ttl: seconds until value expires
+        :return: None
+        """
+        raise NotImplementedError
+
+    def purge_cache(self, batch_size: int = 1000) -> int:
+        """Remove at most batch_size expired cache entries, then oldest ones over CACHE_MAX_ENTRIES.
+
+        Backends expiring and evicting entries by themselves return 0.
+
+        :param batch_size: max entries removed
+        :return: number of removed entries, batch_size when more of them may be left
+        """
+        _ = batch_size
+        return 0
+
+    def purge_cache_periodically(self) -> None:
+        """Count cache write, run purge_cache once per CACHE_PURGE_INTERVAL of them.
+
+        Called by cache_set of backends not evicting entries by themselves, so the cache stays bounded without lock
+        reaper, each run removes up to batch_size entries, more than the process wrote since the previous one.
+
+        :return: None
+        """
+        self.cache_writes += 1
+        if self.cache_writes % self.CACHE_PURGE_INTERVAL == 0:
+            self.purge_cache()
+
+    def to_async(self) -> "AsyncLockBackend":
+        """Return asyncio backend sharing locks with this one.
+
+        Backends with asyncio client override this, default runs methods of this backend in a thread.
+
+        :return: AsyncLockBackend
+        """
+        return AsyncLockBackendThreaded(self)
+
+
+class AsyncLockBackend:
+    """Abstract class for implementation of asyncio LockBackend, methods match LockBackend."""
+
+    def __init__(self, task_lock_backend_uri: str) -> None:
+        """AsyncLockBackend constructor.
+
+        :param task_lock_backend_uri: URI
+        """
+        self.task_lock_backend_uri = task_lock_backend_uri
+        self.log = getLogger(f"{self.__class__.__name__}")
+
+    async def acquire(self, task_identifier: str, timeout: int, token: str | None = None) -> bool:
+        """Acquire lock.
+
+        :param task_identifier: task identifier
+        :param timeout: lock timeout
+        :param token: owner token
+        :return: bool
+        """
+        raise NotImplementedError
+
+    async def release(self, task_identifier: str, token: str | None = None) -> None:
+        """Release lock.
+
+        :param task_identifier: task identifier
+        :param token: owner token, backends storing owner remove lock only when held by this owner
+        :return: None
+        """
+        raise NotImplementedError
+
+    async def extend(self, task_identifier: str, timeout: int, token: str) -> bool:
+        """Reset lock timeout.
+
+        :param task_identifier: task identifier
+        :param timeout: new lock timeout
+        :param token: owner token
+        :return: bool, False when lock does not exist anymore
+        """
+        raise NotImplementedError
+
+    async def exists(self, task_identifier: str, timeout: int) -> bool:
+        """Check if lock exists and is valid.
+
+        :param task_identifier: task identifier
+        :param timeout: lock timeout
+        :return: bool
+        """
+        raise NotImplementedError
+
+    async def wait_for_release(self, task_identifier: str, timeout: float) -> None:
+        """Wait until lock was possibly released or timeout passed, default just sleeps.
+
+        :param task_identifier: task identifier
+        :param timeout: max seconds to wait
+        :return: None
+        """
+        _ = task_identifier
+        await asyncio.sleep(timeout)
+
+
+class AsyncLockBackendThreaded(AsyncLockBackend):
+    """Asyncio backend running blocking methods of LockBackend in default executor, so event loop is not blocked."""
+
+    def __init__(self, lock_backend: LockBackend) -> None:
+        """AsyncLockBackendThreaded constructor.
+
+        :param lock_backend: wrapped lock backend
+        """
+        super().__init__(lock_backend.task_lock_backend_uri)
+        self.lock_backend = lock_backend
+
+    async def acquire(self, task_identifier: str, timeout: int, token: str | None = None) -> bool:
+        """Acquire lock."""
+        return await asyncio.to_thread(self.lock_backend.acquire, task_identifier, timeout, token)
+
+    async def release(self, task_identifier: str, token: str | None = None) -> None:
+        """Release lock."""
+        await asyncio.to_thread(self.lock_backend.release, task_identifier, token)
+
+    async def extend(self, task_identifier: str, timeout: int, token: str) -> bool:
+        """Reset lock timeout."""
+        return await asyncio.to_thread(self.lock_backend.extend, task_identifier, timeout, token)
+
+    async def exists(self, task_identifier: str, timeout: int) -> bool:
+        """Check if lock exists and is valid."""
+        return await asyncio.to_thread(self.lock_backend.exists, task_identifier, timeout)
+
+    async def wait_for_release(self, task_identifier: str, timeout: float) -> None:
+        """Wait until lock was possibly released or timeout passed, sleeping in the loop unless backend is notified."""
+        if type(self.lock_backend).wait_for_release is LockBackend.wait_for_release:
+            await asyncio.sleep(timeout)
+        else:
+            await asyncio.to_thread(self.lock_backend.wait_for_release, task_identifier, timeout)
@@ -1,27 +1,55 @@
 """SQLAlchemy backend."""
 
-from collections.abc import Iterator
+import time
+from collections.abc import Callable, Iterator, Sequence
 from contextlib import contextmanager
 from datetime import UTC, datetime, timedelta
+from typing import Any, TypeVar, cast
 
+from sqlalchemy import Boolean, ColumnElement, CursorResult, Insert, Update, delete, func, insert, literal_column, make_url, select, true, update
+from sqlalchemy.dialects import mysql, postgresql, sqlite
 from sqlalchemy.exc import IntegrityError, ProgrammingError
 from sqlalchemy.orm import Session
 
-from flask_celery.backends.base import LockBackend
-from flask_celery.backends.database.models import Lock
+from flask_celery.backends.base import AsyncLockBackend, LockBackend, LockInfo, gcra
+from flask_celery.backends.database.models import CacheEntry, Lock, RateLimit, bounded_key
 from flask_celery.backends.database.sessions import SessionManager
+from flask_celery.metrics import task_name_of
+from flask_celery.signals import lock_expired_takeover
+
+T = TypeVar("T")
+
+
+def aware(value: datetime) -> datetime:
+    """Return datetime read from database as timezone-aware (SQLite stores naive datetimes).
+
+    :param value: datetime
+    :return: datetime
+    """
+    return value.replace(tzinfo=UTC) if value.tzinfo is None else value
 
 
 class LockBackendDb(LockBackend):
-    """Lock backend implemented on SQLAlchemy supporting multiple databases."""
+    """Lock backend implemented on SQLAlchemy supporting multiple databases.
 
-    def __init__(self, task_lock_backend_uri: str) -> None:
+    Lock row stores its expiry and owner token, lock is valid while expires_at is in the future. Keys longer than 255
+    characters are stored cut and suffixed by their hash, iter_locks returns them so.
+    """
+
+    BATCH_SIZE = 500  # Max identifiers per statement in *_many methods
+    RATE_LIMIT_ATTEMPTS = 5  # Compare-and-set rounds of rate_limit before the call is delayed by one interval
+    supports_cache = True
+    supports_rate_limit = True
+
+    def __init__(self, task_lock_backend_uri: str, engine_options: dict[str, Any] | None = None) -> None:
         """LockBackendDb constructor.
 
         :param task_lock_backend_uri: URI
+        :param engine_options: keyword arguments for create_engine, e.g. pool_size or pool_recycle
         """
         super().__init__(task_lock_backend_uri)
         self.task_lock_backend_uri = task_lock_backend_uri
+        self.session_manager = SessionManager(engine_options)
 
     def result_session(self, session_manager: SessionManager | None = None) -> Session:
         """Return session.
@@ -30,7 +58,7 @@ class LockBackendDb(LockBackend):
         :return: session
         """
         if session_manager is None:
-            session_manager = SessionManager()
+            session_manager = self.session_manager
 
         return session_manager.session_factory(self.task_lock_backend_uri)
 
@@ -50,68 +78,554 @@ class LockBackendDb(LockBackend):
         finally:
             session.close()
 
-    def acquire(self, task_identifier: str, timeout: int) -> bool:
+    @staticmethod
+    def lock_values(task_identifier: str, timeout: int, token: str | None, now: datetime) -> dict[str, Any]:
+        """Return column values of newly acquired lock.
+
+        :param task_identifier: task identifier
+        :param timeout: lock timeout
+        :param token: owner token
+        :param now: current time
+        :return: dict
+        """
+        return {
+            "task_identifier": task_identifier,
+            "task_name": task_name_of(task_identifier),
+            "owner": token,
+            "created": now,
+            "expires_at": now + timedelta(seconds=timeout),
+        }
+
+    @staticmethod
+    def owned_by(token: str | None) -> ColumnElement[bool]:
+        """Return predicate matching locks held by owner, any lock when token is None.
+
+        :param token: owner token
+        :return: predicate
+        """
+        return true() if token is None else Lock.owner == token
+
+    def to_async(self) -> "AsyncLockBackend":
+        """Return asyncio backend, using SQLAlchemy async engine when URI driver is async, e.g. postgresql+asyncpg.
+
+        :return: AsyncLockBackend
+        """
+        if make_url(self.task_lock_backend_uri).get_dialect().is_async:
+            return AsyncLockBackendDb(self)
+        return super().to_async()
+
+    def acquire(self, task_identifier: str, timeout: int, token: str | None = None) -> bool:
         """Acquire lock.
 
+        Uses single atomic upsert on PostgreSQL and SQLite, INSERT IGNORE followed by conditional UPDATE on MySQL and
+        INSERT followed by conditional UPDATE on other databases.
+
         :param task_identifier: task identifier
         :param timeout: lock timeout
+        :param token: owner token
         :return: bool
         """
         session = self.result_session()
         with self.session_cleanup(session):
-            try:
-                lock = Lock(task_identifier)
-                session.add(lock)
-                session.commit()
-            except (IntegrityError, ProgrammingError):
-                session.rollback()
+            return self.acquire_in_session(session, task_identifier, timeout, token)
 
-                # task_id exists, lets check expiration date
-                lock = session.query(Lock).\
-                    filter(Lock.task_identifier == task_identifier).one()
-                # Ensure lock.created is timezone-aware (SQLite stores naive datetimes)
-                lock_created = lock.created.replace(tzinfo=UTC) if lock.created.tzinfo is None else lock.created
-                difference = datetime.now(UTC) - lock_created
-                if difference < timedelta(seconds=timeout):
-                    return False
-                lock.created = datetime.now(UTC)
-                session.add(lock)
-                session.commit()
-                return True
-            except Exception:
+    def acquire_in_session(self, session: Session, task_identifier: str, timeout: int, token: str | None = None) -> bool:
+        """Acquire lock and commit, shared by sync and async backend.
+
+        :param session: session
+        :param task_identifier: task identifier
+        :param timeout: lock timeout
+        :param token: owner token
+        :return: bool
+        """
+        dialect = session.get_bind().dialect
+        if dialect.name in ("postgresql", "sqlite") and dialect.insert_returning:
+            acquired = task_identifier in self._acquire_upsert(session, dialect.name, [task_identifier], timeout, token)
+        elif dialect.name in ("mysql", "mariadb"):
+            acquired = self._acquire_mysql(session, task_identifier, timeout, token)
+        else:
+            return self._acquire_fallback(session, task_identifier, timeout, token)
+        session.commit()
+        return acquired
+
+    def _acquire_upsert(
+            self,
+            session: Session,
+            dialect_name: str,
+            task_identifiers: Sequence[str],
+            timeout: int,
+            token: str | None,
+    ) -> set[str]:
+        """Acquire locks with INSERT ... ON CONFLICT DO UPDATE ... WHERE expired RETURNING, one round trip.
+
+        Updated rows are locks taken over after they expired, PostgreSQL tells them apart from inserted ones by xmax, on
+        SQLite expired rows are read first, only while lock_expired_takeover has receivers.
+
+        :param session: session
+        :param dialect_name: postgresql or sqlite
+        :param task_identifiers: task identifiers
+        :param timeout: lock timeout
+        :param token: owner token
+        :return: acquired task identifiers
+        """
+        stored = {bounded_key(task_identifier): task_identifier for task_identifier in task_identifiers}
+        now = datetime.now(UTC)
+        insert_dialect = postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+        statement = insert_dialect(Lock).values([
+            self.lock_values(task_identifier, timeout, token, now) for task_identifier in task_identifiers
+        ])
+        statement = statement.on_conflict_do_update(
+            index_elements=[Lock.task_identifier],
+            set_={
+                "owner": statement.excluded.owner,
+                "created": statement.excluded.created,
+                "expires_at": statement.excluded.expires_at,
+            },
+            where=Lock.expires_at <= now,
+        )
+        if dialect_name == "postgresql":
+            # xmax of inserted row is 0, of row updated on conflict it is id of this transaction
+            rows = session.execute(statement.returning(Lock.task_identifier, literal_column("xmax = 0", Boolean))).all()
+            acquired = {stored[key] for key, _ in rows}
+            taken_over = {stored[key] for key, inserted in rows if not inserted}
+        else:
+            expired: set[str] = set()
+            if lock_expired_takeover.receivers:
+                expired.update(stored[key] for key in session.execute(
+                    select(Lock.task_identifier).where(Lock.task_identifier.in_(task_identifiers), Lock.expires_at <= now),
+                ).scalars())
+            acquired = {stored[key] for key in session.execute(statement.returning(Lock.task_identifier)).scalars()}
+            taken_over = acquired & expired
+        if taken_over and lock_expired_takeover.receivers:
+            for task_identifier in taken_over:
+                lock_expired_takeover.send(self, task_identifier=task_identifier)
+        return acquired
+
+    def rate_limit(self, key: str, interval: float, burst: int) -> float:
+        """Take one call of GCRA rate limit with compare-and-set of stored theoretical arrival time.
+
+        Row is inserted, or updated only while it still holds the value read, lost race is retried. Works the same on
+        every database, calls over the limit only read.
+
+        :param key: rate limit key
+        :param interval: seconds between calls at the limit
+        :param burst: calls allowed at once
+        :return: seconds until the call is allowed, 0.0 when it is allowed now and was counted
+        """
+        session = self.result_session()
+        with self.session_cleanup(session):
+            for _ in range(self.RATE_LIMIT_ATTEMPTS):
+                tat = session.execute(select(RateLimit.tat).where(RateLimit.key == key)).scalar_one_or_none()
+                wait, new_tat = gcra(time.time(), None if tat is None else tat / 1000000, interval, burst)
+                if wait:
+                    session.rollback()
+                    return wait
+                statement: Insert | Update
+                if tat is None:
+                    statement = insert(RateLimit).values(key=key, tat=round(new_tat * 1000000))
+                else:
+                    statement = update(RateLimit).where(RateLimit.key == key, RateLimit.tat == tat)\
+                        .values(tat=round(new_tat * 1000000)).execution_options(synchronize_session=False)
+                try:
+                    stored = cast("CursorResult[Any]", session.execute(statement)).rowcount == 1
+                except IntegrityError:
+                    stored = False
+                if stored:
+                    session.commit()
+                    return 0.0
                 session.rollback()
-                raise
-            else:
-                return True
+            return interval
 
-    def release(self, task_identifier: str) -> None:
+    def _take_over_expired(self, session: Session, task_identifier: str, timeout: int, token: str | None) -> bool:
+        """Take over expired lock with conditional UPDATE.
+
+        :param session: session
+        :param task_identifier: task identifier
+        :param timeout: lock timeout
+        :param token: owner token
+        :return: bool
+        """
+        now = datetime.now(UTC)
+        statement = update(Lock).where(Lock.task_identifier == task_identifier, Lock.expires_at <= now)\
+            .values(owner=token, created=now, expires_at=now + timedelta(seconds=timeout))\
+            .execution_options(synchronize_session=False)
+        taken_over = cast("CursorResult[Any]", session.execute(statement)).rowcount == 1
+        if taken_over and lock_expired_takeover.receivers:
+            lock_expired_takeover.send(self, task_identifier=task_identifier)
+        return taken_over
+
+    def _acquire_mysql(self, session: Session, task_identifier: str, timeout: int, token: str | None) -> bool:
+        """Acquire lock with INSERT IGNORE, take over expired lock with conditional UPDATE when row exists.
+
+        Both statements are atomic so two workers can never acquire the same lock, fresh lock takes one round trip.
+
+        :param session: session
+        :param task_identifier: task identifier
+        :param timeout: lock timeout
+        :param token: owner token
+        :return: bool
+        """
+        values = self.lock_values(task_identifier, timeout, token, datetime.now(UTC))
+        statement = mysql.insert(Lock).values(values).prefix_with("IGNORE")
+        if cast("CursorResult[Any]", session.execute(statement)).rowcount == 1:
+            return True
+        return self._take_over_expired(session, task_identifier, timeout, token)
+
+    def _acquire_fallback(self, session: Session, task_identifier: str, timeout: int, token: str | None) -> bool:
+        """Acquire lock with INSERT, on conflict take over expired lock with conditional UPDATE.
+
+        :param session: session
+        :param task_identifier: task identifier
+        :param timeout: lock timeout
+        :param token: owner token
+        :return: bool
+        """
+        try:
+            session.execute(insert(Lock).values(self.lock_values(task_identifier, timeout, token, datetime.now(UTC))))
+            session.commit()
+        except (IntegrityError, ProgrammingError):
+            session.rollback()
+            taken_over = self._take_over_expired(session, task_identifier, timeout, token)
+            session.commit()
+            return taken_over
+        except Exception:
+            session.rollback()
+            raise
+        else:
+            return True
+
+    def release(self, task_identifier: str, token: str | None = None) -> None:
         """Release lock.
 
         :param task_identifier: task identifier
+        :param token: owner token, lock is removed only when held by this owner, regardless of owner when None
         :return: None
         """
         session = self.result_session()
         with self.session_cleanup(session):
-            session.query(Lock).filter(Lock.task_identifier == task_identifier).delete()
-            session.commit()
+            self.release_in_session(session, task_identifier, token)
+
+    def release_in_session(self, session: Session, task_identifier: str, token: str | None = None) -> None:
+        """Release lock and commit.
+
+        :param session: session
+        :param task_identifier: task identifier
+        :param token: owner token
+        :return: None
+        """
+        session.execute(
+            delete(Lock).where(Lock.task_identifier == task_identifier, self.owned_by(token))
+            .execution_options(synchronize_session=False),
+        )
+        session.commit()
+
+    def extend(self, task_identifier: str, timeout: int, token: str) -> bool:
+        """Reset lock timeout when lock is held by owner.
+
+        :param task_identifier: task identifier
+        :param timeout: new lock timeout
+        :param token: owner token
+        :return: bool, False when lock is not held by owner anymore
+        """
+        session = self.result_session()
+        with self.session_cleanup(session):
+            return self.extend_in_session(session, task_identifier, timeout, token)
+
+    @staticmethod
+    def extend_in_session(session: Session, task_identifier: str, timeout: int, token: str) -> bool:
+        """Reset lock timeout when lock is held by owner and commit.
+
+        :param session: session
+        :param task_identifier: task identifier
+        :param timeout: new lock timeout
+        :param token: owner token
+        :return: bool
+        """
+        now = datetime.now(UTC)
+        statement = update(Lock).where(Lock.task_identifier == task_identifier, Lock.owner == token)\
+            .values(created=now, expires_at=now + timedelta(seconds=timeout)).execution_options(synchronize_session=False)
+        extended = cast("CursorResult[Any]", session.execute(statement)).rowcount == 1
+        session.commit()
+        return extended
 
     def exists(self, task_identifier: str, timeout: int) -> bool:
         """Check if lock exists and is valid.
 
         :param task_identifier: task identifier
-        :param timeout: lock timeout
+        :param timeout: not used, expiry is stored with the lock
         :return: bool
         """
         session = self.result_session()
         with self.session_cleanup(session):
-            lock = session.query(Lock)\
-                .filter(Lock.task_identifier == task_identifier).first()
-            if not lock:
-                return False
-            # Ensure lock.created is timezone-aware (SQLite stores naive datetimes)
-            lock_created = lock.created.replace(tzinfo=UTC) if lock.created.tzinfo is None else lock.created
-            difference = datetime.now(UTC) - lock_created
-            if difference < timedelta(seconds=timeout):
-                return True
-
-        return False
+            return self.exists_in_session(session, task_identifier, timeout)
+
+    @staticmethod
+    def exists_in_session(session: Session, task_identifier: str, timeout: int) -> bool:
+        """Check if lock exists and is valid.
+
+        :param session: session
+        :param task_identifier: task identifier
+        :param timeout: not used, expiry is stored with the lock
+        :return: bool
+        """
+        _ = timeout
+        statement = select(Lock.task_identifier).where(Lock.task_identifier == task_identifier, Lock.expires_at > datetime.now(UTC))
+        return session.execute(statement).first() is not None
+
+    def get_owner(self, task_identifier: str, timeout: int) -> str | None:
+        """Return owner token of valid lock.
+
+        :param task_identifier: task identifier
+        :param timeout: not used, expiry is stored with the lock
+        :return: owner token, None when lock does not exist, expired or has no owner
+        """
+        _ = timeout
+        session = self.result_session()
+        with self.session_cleanup(session):
+            return session.execute(
+                select(Lock.owner).where(Lock.task_identifier == task_identifier, Lock.expires_at > datetime.now(UTC)),
+            ).scalar_one_or_none()
+
+    def acquire_many(self, task_identifiers: Sequence[str], timeout: int, token: str | None = None) -> dict[str, bool]:
+        """Acquire many locks, with one bulk upsert per batch on PostgreSQL and SQLite.
+
+        :param task_identifiers: task identifiers
+        :param timeout: lock timeout
+        :param token: owner token
+        :return: dict task identifier: acquired
+        """
+        session = self.result_session()
+        with self.session_cleanup(session):
+            dialect = session.get_bind().dialect
+            if dialect.name not in ("postgresql", "sqlite") or not dialect.insert_returning:
+                return super().acquire_many(task_identifiers, timeout, token)
+
+            acquired: set[str] = set()
+            unique_identifiers = list(dict.fromkeys(task_identifiers))
+            for start in range(0, len(unique_identifiers), self.BATCH_SIZE):
+                batch = unique_identifiers[start:start + self.BATCH_SIZE]
+                acquired.update(self._acquire_upsert(session, dialect.name, batch, timeout, token))
+            session.commit()
+        return {task_identifier: task_identifier in acquired for task_identifier in task_identifiers}
+
+    def release_many(self, task_identifiers: Sequence[str], token: str | None = None) -> None:
+        """Release many locks with one DELETE per batch.
+
+        :param task_identifiers: task identifiers
+        :param token: owner token, locks are removed only when held by this owner, regardless of owner when None
+        :return: None
+        """
+        session = self.result_session()
+        with self.session_cleanup(session):
+            for start in range(0, len(task_identifiers), self.BATCH_SIZE):
+                batch = task_identifiers[start:start + self.BATCH_SIZE]
+                session.execute(
+                    delete(Lock).where(Lock.task_identifier.in_(batch), self.owned_by(token))
+                    .execution_options(synchronize_session=False),
+                )
+            session.commit()
+
+    def exists_many(self, task_identifiers: Sequence[str], timeout: int) -> dict[str, bool]:
+        """Check if locks exist and are valid with one SELECT per batch.
+
+        :param task_identifiers: task identifiers
+        :param timeout: not used, expiry is stored with the lock
+        :return: dict task identifier: exists
+        """
+        _ = timeout
+        now = datetime.now(UTC)
+        existing: set[str] = set()
+        session = self.result_session()
+        with self.session_cleanup(session):
+            for start in range(0, len(task_identifiers), self.BATCH_SIZE):
+                batch = task_identifiers[start:start + self.BATCH_SIZE]
+                existing.update(session.execute(
+                    select(Lock.task_identifier).where(Lock.task_identifier.in_(batch), Lock.expires_at > now),
+                ).scalars())
+        return {task_identifier: bounded_key(task_identifier) in existing for task_identifier in task_identifiers}
+
+    def iter_locks(self, prefix: str = "", timeout: int | None = None, batch_size: int = 1000) -> Iterator[LockInfo]:
+        """Iterate locks ordered by task identifier, keyset paginated so no session is held between batches.
+
+        :param prefix: task identifier prefix
+        :param timeout: not used, expiry is stored with the lock
+        :param batch_size: max rows per SELECT
+        :return: iterator of locks
+        """
+        _ = timeout
+        last: str | None = None
+        while True:
+            statement = select(Lock.task_identifier, Lock.created, Lock.expires_at, Lock.owner)\
+                .where(Lock.task_identifier.startswith(prefix, autoescape=True))\
+                .order_by(Lock.task_identifier).limit(batch_size)
+            if last is not None:
+                statement = statement.where(Lock.task_identifier > last)
+            session = self.result_session()
+            with self.session_cleanup(session):
+                rows = session.execute(statement).all()
+            now = datetime.now(UTC)
+            for task_identifier, created, expires_at, owner in rows:
+                yield LockInfo(
+                    task_identifier, (now - aware(created)).total_seconds(), (aware(expires_at) - now).total_seconds(), owner,
+                )
+            if len(rows) < batch_size:
+                return
+            last = rows[-1][0]
+
+    def count_locks(self, prefix: str = "") -> int:
+        """Count locks with single SELECT count(*).
+
+        :param prefix: task identifier prefix
+        :return: int
+        """
+        session = self.result_session()
+        with self.session_cleanup(session):
+            return session.execute(
+                select(func.count()).select_from(Lock).where(Lock.task_identifier.startswith(prefix, autoescape=True)),
+            ).scalar_one()
+
+    def purge_expired(self, max_age: int, batch_size: int = 1000) -> int:
+        """Remove at most batch_size expired locks, found by expires_at index.
+
+        :param max_age: not used, expiry is stored with the lock
+        :param batch_size: max rows removed
+        :return: number of removed locks
+        """
+        _ = max_age
+        now = datetime.now(UTC)
+        session = self.result_session()
+        with self.session_cleanup(session):
+            expired = session.execute(
+                select(Lock.task_identifier).where(Lock.expires_at <= now).order_by(Lock.expires_at).limit(batch_size),
+            ).scalars().all()
+            if not expired:
+                return 0
+            # Expiry is checked again, lock may have been taken over meanwhile
+            statement = delete(Lock).where(Lock.task_identifier.in_(expired), Lock.expires_at <= now)\
+                .execution_options(synchronize_session=False)
+            removed = cast("CursorResult[Any]", session.execute(statement)).rowcount
+            session.commit()
+        return removed
+
+    def cache_get(self, key: str) -> bytes | None:
+        """Return cached value.
+
+        :param key: cache key
+        :return: value, None when it is not cached or expired
+        """
+        session = self.result_session()
+        with self.session_cleanup(session):
+            return session.execute(
+                select(CacheEntry.value).where(CacheEntry.key == key, CacheEntry.expires_at > datetime.now(UTC)),
+            ).scalar_one_or_none()
+
+    def cache_set(self, key: str, value: bytes, ttl: int) -> None:
+        """Cache value, replacing previous entry in one transaction, table is purged periodically.
+
+        :param key: cache key
+        :param value: value
+        :param ttl: seconds until value expires
+        :return: None
+        """
+        session = self.result_session()
+        with self.session_cleanup(session):
+            session.execute(delete(CacheEntry).where(CacheEntry.key == key).execution_options(synchronize_session=False))
+            session.execute(insert(CacheEntry).values(key=key, value=value, expires_at=datetime.now(UTC) + timedelta(seconds=ttl)))
+            try:
+                session.commit()
+            except IntegrityError:
+                # Cached by another worker meanwhile
+                session.rollback()
+        self.purge_cache_periodically()
+
+    def purge_cache(self, batch_size: int = 1000) -> int:
+        """Remove at most batch_size expired cache entries, then ones expiring first over CACHE_MAX_ENTRIES.
+
+        :param batch_size: max rows removed
+        :return: number of removed entries
+        """
+        now = datetime.now(UTC)
+        session = self.result_session()
+        with self.session_cleanup(session):
+            expired = session.execute(
+                select(CacheEntry.key).where(CacheEntry.expires_at <= now).order_by(CacheEntry.expires_at).limit(batch_size),
+            ).scalars().all()
+            removed = 0
+            if expired:
+                # Expiry is checked again, entry may have been set again meanwhile
+                statement = delete(CacheEntry).where(CacheEntry.key.in_(expired), CacheEntry.expires_at <= now)\
+                    .execution_options(synchronize_session=False)
+                removed = cast("CursorResult[Any]", session.execute(statement)).rowcount
+            over = session.execute(select(func.count()).select_from(CacheEntry)).scalar_one() - self.CACHE_MAX_ENTRIES
+            if over > 0 and removed < batch_size:
+                evicted = session.execute(
+                    select(CacheEntry.key).order_by(CacheEntry.expires_at).limit(min(over, batch_size - removed)),
+                ).scalars().all()
+                statement = delete(CacheEntry).where(CacheEntry.key.in_(evicted)).execution_options(synchronize_session=False)
+                removed += cast("CursorResult[Any]", session.execute(statement)).rowcount
+            session.commit()
+        return removed
+
+
+class AsyncLockBackendDb(AsyncLockBackend):
+    """Asyncio lock backend on SQLAlchemy async engine, runs the same statements as LockBackendDb."""
+
+    def __init__(self, lock_backend: LockBackendDb) -> None:
+        """AsyncLockBackendDb constructor.
+
+        :param lock_backend: sync backend providing statements and session manager
+        """
+        super().__init__(lock_backend.task_lock_backend_uri)
+        self.lock_backend = lock_backend
+
+    async def run_in_session(self, method: Callable[..., T], *args: object) -> T:
+        """Run method of sync backend with async session.
+
+        :param method: method taking session as first argument
+        :param args: other arguments
+        :return: result of method
+        """
+        async with await self.lock_backend.session_manager.async_session_factory(self.task_lock_backend_uri) as session:
+            try:
+                return await session.run_sync(method, *args)
+            except Exception:
+                await session.rollback()
+                raise
+
+    async def acquire(self, task_identifier: str, timeout: int, token: str | None = None) -> bool:
+        """Acquire lock.
+
+        :param task_identifier: task identifier
+        :param timeout: lock timeout
+        :param token: owner token
+        :return: bool
+        """
+        return await self.run_in_session(self.lock_backend.acquire_in_session, task_identifier, timeout, token)
+
+    async def release(self, task_identifier: str, token: str | None = None) -> None:
+        """Release lock.
+
+        :param task_identifier: task identifier
+        :param token: owner token, lock is removed only when held by this owner, regardless of owner when None
+        :return: None
+        """
+        await self.run_in_session(self.lock_backend.release_in_session, task_identifier, token)
+
+    async def extend(self, task_identifier: str, timeout: int, token: str) -> bool:
+        """Reset lock timeout when lock is held by owner.
+
+        :param task_identifier: task identifier
+        :param timeout: new lock timeout
+        :param token: owner token
+        :return: bool
+        """
+        return await self.run_in_session(self.lock_backend.extend_in_session, task_identifier, timeout, token)
+
+    async def exists(self, task_identifier: str, timeout: int) -> bool:
+        """Check if lock exists and is valid.
+
+        :param task_identifier: task identifier
+        :param timeout: not used, expiry is stored with the lock
+        :return: bool
+        """
+        return await self.run_in_session(self.lock_backend.exists_in_session, task_identifier, timeout)
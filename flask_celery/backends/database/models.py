@@ -1,31 +1,224 @@
 """SQLALchemy models."""
 
-from datetime import UTC, datetime
+import hashlib
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import UTC, datetime, timedelta
 
-from sqlalchemy import DateTime, Integer, Sequence, String
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    Connection,
+    DateTime,
+    Dialect,
+    LargeBinary,
+    MetaData,
+    Sequence,
+    String,
+    Table,
+    TypeDecorator,
+    insert,
+    inspect,
+    select,
+    text,
+)
+from sqlalchemy.exc import IntegrityError, OperationalError, ProgrammingError
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
-from flask_celery.backends.database.sessions import LockModelBase
+from flask_celery.metrics import task_name_of
+
+# Legacy table stored no expiry, its locks are carried over as if acquired with the default lock timeout
+LEGACY_LOCK_TIMEOUT = 60 * 5
+# Longest key stored as is, indexed VARCHAR(255) fits in primary key of every database including MySQL utf8mb4
+KEY_LENGTH = 255
+MIGRATION_LOCK_TIMEOUT = 60  # seconds MySQL worker waits for another one migrating the lock table
+
+
+def bounded_key(key: str) -> str:
+    """Return key fitting KEY_LENGTH, longer key is cut and suffixed by hash of the whole key.
+
+    Key keeps its prefix and stays unique, bounded key is returned unchanged.
+
+    :param key: task identifier or other key
+    :return: str
+    """
+    if len(key) <= KEY_LENGTH:
+        return key
+    digest = hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+    return f"{key[:KEY_LENGTH - len(digest) - 1]}#{digest}"
+
+
+class BoundedKey(TypeDecorator[str]):
+    """VARCHAR(255) key column, every bound value is passed through bounded_key."""
+
+    impl = String(KEY_LENGTH)
+    cache_ok = True
+
+    def process_bind_param(self, value: str | None, dialect: Dialect) -> str | None:
+        """Return value stored for key.
+
+        :param value: key
+        :param dialect: dialect
+        :return: bounded key
+        """
+        _ = dialect
+        return None if value is None else bounded_key(value)
+
+
+class LockModelBase(DeclarativeBase):
+    """Custom base."""
 
 
 class Lock(LockModelBase):
-    """Model defying table in sqlalchemy database."""
+    """Model defying table in sqlalchemy database.
+
+    Expiry and owner token are stored with the lock, so validity checks and cleanup are single indexed predicates.
+    """
 
     __tablename__ = "celeryd_lock"
-    __table_args__ = ({"sqlite_autoincrement": True}, )
-
-    id: Mapped[int] = mapped_column(Integer, Sequence("lock_id_sequence"), primary_key=True, autoincrement=True)
-    task_identifier: Mapped[str] = mapped_column(String, unique=True, nullable=False)
-    created: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True),
-        default=lambda: datetime.now(UTC),
-        onupdate=lambda: datetime.now(UTC),
-        nullable=True,
-    )
 
-    def __init__(self, task_identifier: str) -> None:
+    task_identifier: Mapped[str] = mapped_column(BoundedKey, primary_key=True)
+    task_name: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    owner: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    created: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)  # acquired or renewed at
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
+
+    def __init__(self, task_identifier: str, timeout: int, owner: str | None = None) -> None:
         """Lock constructor.
 
         :param task_identifier: task identifier
+        :param timeout: lock timeout
+        :param owner: owner token
         """
         self.task_identifier = task_identifier
+        self.task_name = task_name_of(task_identifier)
+        self.owner = owner
+        self.created = datetime.now(UTC)
+        self.expires_at = self.created + timedelta(seconds=timeout)
+
+
+class RateLimit(LockModelBase):
+    """GCRA state of rate limit key, row with theoretical arrival time in the past is the same as no row."""
+
+    __tablename__ = "celeryd_rate_limit"
+
+    key: Mapped[str] = mapped_column(BoundedKey, primary_key=True)
+    tat: Mapped[int] = mapped_column(BigInteger, nullable=False)  # theoretical arrival time, us since epoch
+
+
+class CacheEntry(LockModelBase):
+    """Result cached by memoize, expired entry is ignored until it is overwritten or purged."""
+
+    __tablename__ = "celeryd_cache"
+
+    key: Mapped[str] = mapped_column(BoundedKey, primary_key=True)
+    value: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
+
+
+def is_legacy_lock_table(connection: Connection) -> bool:
+    """Check if lock table exists and was created by versions without expiry.
+
+    :param connection: connection
+    :return: bool
+    """
+    inspector = inspect(connection)
+    if not inspector.has_table(Lock.__tablename__):
+        return False
+    return "expires_at" not in {column["name"] for column in inspector.get_columns(Lock.__tablename__)}
+
+
+@contextmanager
+def migration_lock(connection: Connection) -> Iterator[None]:
+    """Make workers starting at once migrate one after another, so the rest see migrated table.
+
+    PostgreSQL locks the table, SQLite takes the database write lock, MySQL, whose DDL commits implicitly, takes named
+    lock held by the connection. Other databases are not serialized.
+
+    :param connection: connection in transaction
+    :return: None
+    """
+    dialect_name = connection.dialect.name
+    if dialect_name == "postgresql":
+        connection.execute(text(f"LOCK TABLE {Lock.__tablename__} IN ACCESS EXCLUSIVE MODE"))
+    elif dialect_name == "sqlite":
+        # pysqlite begins transaction lazily, before the first DML statement, nothing was written yet
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+    elif dialect_name in ("mysql", "mariadb"):
+        name = f"{Lock.__tablename__}.migration"
+        connection.execute(text("SELECT GET_LOCK(:name, :timeout)"), {"name": name, "timeout": MIGRATION_LOCK_TIMEOUT})
+        try:
+            yield
+        finally:
+            connection.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": name})
+        return
+    yield
+
+
+def migrate_legacy_lock_table(connection: Connection) -> None:
+    """Rebuild lock table created by versions without expiry, owner and task_identifier primary key.
+
+    Locks younger than LEGACY_LOCK_TIMEOUT are carried over, older ones are expired and dropped. Legacy table is checked
+    again once the migration lock is held, on databases without one, failure of a worker which lost the race is ignored.
+
+    :param connection: connection in transaction
+    :return: None
+    """
+    if not is_legacy_lock_table(connection):
+        return
+    with migration_lock(connection):
+        if not is_legacy_lock_table(connection):
+            return
+        try:
+            rebuild_legacy_lock_table(connection)
+        except (IntegrityError, OperationalError, ProgrammingError):
+            # Migrated by another worker meanwhile
+            if is_legacy_lock_table(connection):
+                raise
+
+
+def rebuild_legacy_lock_table(connection: Connection) -> None:
+    """Replace legacy lock table by the current one, carrying over recent locks.
+
+    :param connection: connection in transaction
+    :return: None
+    """
+    legacy = Table(
+        Lock.__tablename__, MetaData(),
+        Column("task_identifier", String),
+        Column("created", DateTime(timezone=True)),
+    )
+    now = datetime.now(UTC)
+    rows = connection.execute(
+        select(legacy.c.task_identifier, legacy.c.created)
+        .where(legacy.c.created >= now - timedelta(seconds=LEGACY_LOCK_TIMEOUT)),
+    ).all()
+    legacy.drop(connection)
+    if connection.dialect.supports_sequences:
+        Sequence("lock_id_sequence").drop(connection, checkfirst=True)
+    Lock.__table__.create(connection)  # type: ignore[attr-defined]
+
+    if rows:
+        connection.execute(insert(Lock), [
+            {
+                "task_identifier": task_identifier,
+                "task_name": task_name_of(task_identifier),
+                "created": created,
+                "expires_at": created + timedelta(seconds=LEGACY_LOCK_TIMEOUT),
+            }
+            for task_identifier, created in rows
+        ])
+
+
+def create_tables(connection: Connection) -> None:
+    """Migrate legacy tables, create missing tables and indexes.
+
+    :param connection: connection in transaction
+    :return: None
+    """
+    migrate_legacy_lock_table(connection)
+    LockModelBase.metadata.create_all(connection)
+    # create_all skips existing tables, add indexes introduced later to them
+    for table in LockModelBase.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
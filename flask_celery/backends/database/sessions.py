@@ -1,55 +1,150 @@
 """SQLAlchemy sessions."""
 
-from sqlalchemy import Engine, create_engine
-from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
-from sqlalchemy.pool import NullPool
+import os
+import threading
+from typing import Any, ClassVar
 
+from sqlalchemy import Engine, create_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
 
-class LockModelBase(DeclarativeBase):
-    """Custom base."""
+from flask_celery.backends.database.models import create_tables
 
 
 class SessionManager:
-    """Manage SQLAlchemy sessions."""
+    """Manage SQLAlchemy sessions.
+
+    Engines and session factories are cached per process and keyed by database URI, so every lock operation reuses the
+    same connection pool instead of opening a new connection. Tables are created at most once per URI and process.
+    """
 
-    def __init__(self) -> None:
-        """SessionManager constructor."""
-        self.prepared = False
+    _engines: ClassVar[dict[str, Engine]] = {}
+    _session_makers: ClassVar[dict[str, sessionmaker[Session]]] = {}
+    _async_engines: ClassVar[dict[str, AsyncEngine]] = {}
+    _async_session_makers: ClassVar[dict[str, async_sessionmaker[AsyncSession]]] = {}
+    _prepared: ClassVar[set[str]] = set()
+    _lock: ClassVar[threading.Lock] = threading.Lock()
+
+    def __init__(self, engine_options: dict[str, Any] | None = None) -> None:
+        """SessionManager constructor.
+
+        :param engine_options: keyword arguments passed to create_engine (pool_size, pool_recycle, ...), used only when
+            the engine for given URI is created for the first time in this process
+        """
+        self.engine_options = engine_options or {}
 
-    @staticmethod
-    def get_engine(db_uri: str) -> Engine:
-        """Create engine.
+    def get_engine(self, db_uri: str) -> Engine:
+        """Return cached engine, create it when missing.
 
         :param db_uri: dburi
         :return: engine
         """
-        return create_engine(db_uri, poolclass=NullPool)
+        engine = self._engines.get(db_uri)
+        if engine is None:
+            with self._lock:
+                engine = self._engines.get(db_uri)
+                if engine is None:
+                    engine = create_engine(db_uri, **self.engine_options)
+                    self._engines[db_uri] = engine
+        return engine
 
     def create_session(self, db_uri: str) -> tuple[Engine, sessionmaker[Session]]:
-        """Create session.
+        """Return cached engine and session maker.
 
         :param db_uri: dburi
-        :return: session
+        :return: engine, session maker
         """
         engine = self.get_engine(db_uri)
-        return engine, sessionmaker(bind=engine)
+        session_maker = self._session_makers.get(db_uri)
+        if session_maker is None:
+            session_maker = sessionmaker(bind=engine)
+            self._session_makers[db_uri] = session_maker
+        return engine, session_maker
 
-    def prepare_models(self, engine: Engine) -> None:
-        """Prepare models (create tables).
+    def prepare_models(self, engine: Engine, db_uri: str | None = None) -> None:
+        """Prepare models (migrate legacy and create missing tables), once per URI and process.
 
         :param engine: engine
+        :param db_uri: dburi used as cache key, defaults to engine url
         :return: None
         """
-        if not self.prepared:
-            LockModelBase.metadata.create_all(engine)
-            self.prepared = True
+        key = db_uri or engine.url.render_as_string(hide_password=False)
+        if key in self._prepared:
+            return
+        with self._lock:
+            if key not in self._prepared:
+                with engine.begin() as connection:
+                    create_tables(connection)
+                self._prepared.add(key)
 
     def session_factory(self, db_uri: str) -> Session:
         """Session factory.
 
         :param db_uri: dburi
-        :return: engine, session
+        :return: session
+        """
+        engine, session_maker = self.create_session(db_uri)
+        self.prepare_models(engine, db_uri)
+        return session_maker()
+
+    def get_async_engine(self, db_uri: str) -> AsyncEngine:
+        """Return cached async engine, create it when missing.
+
+        :param db_uri: dburi with async driver
+        :return: async engine
         """
-        engine, session = self.create_session(db_uri)
-        self.prepare_models(engine)
-        return session()
+        engine = self._async_engines.get(db_uri)
+        if engine is None:
+            with self._lock:
+                engine = self._async_engines.get(db_uri)
+                if engine is None:
+                    engine = create_async_engine(db_uri, **self.engine_options)
+                    self._async_engines[db_uri] = engine
+                    self._async_session_makers[db_uri] = async_sessionmaker(bind=engine)
+        return engine
+
+    async def async_session_factory(self, db_uri: str) -> AsyncSession:
+        """Async session factory, creates tables on first use of URI.
+
+        :param db_uri: dburi with async driver
+        :return: async session
+        """
+        engine = self.get_async_engine(db_uri)
+        if db_uri not in self._prepared:
+            async with engine.begin() as connection:
+                await connection.run_sync(create_tables)
+            self._prepared.add(db_uri)
+        return self._async_session_makers[db_uri]()
+
+    @classmethod
+    def dispose_all(cls) -> None:
+        """Dispose all cached engines and forget prepared URIs.
+
+        Pooled connections of async engines are dropped without closing them, closing needs a running event loop.
+        """
+        with cls._lock:
+            for engine in cls._engines.values():
+                engine.dispose()
+            for async_engine in cls._async_engines.values():
+                async_engine.sync_engine.dispose(close=False)
+            cls._engines.clear()
+            cls._session_makers.clear()
+            cls._async_engines.clear()
+            cls._async_session_makers.clear()
+            cls._prepared.clear()
+
+    @classmethod
+    def _after_fork_in_child(cls) -> None:
+        """Drop pooled connections inherited from parent process without closing them.
+
+        Connections belong to the parent, the child gets fresh ones on first use (prefork workers).
+        """
+        cls._lock = threading.Lock()
+        for engine in cls._engines.values():
+            engine.dispose(close=False)
+        for async_engine in cls._async_engines.values():
+            async_engine.sync_engine.dispose(close=False)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=SessionManager._after_fork_in_child)  # noqa: SLF001
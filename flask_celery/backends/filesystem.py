@@ -1,17 +1,47 @@
 """Filesystem backend."""
 
+import contextlib
+import hashlib
+import os
+import re
+import tempfile
 import time
+from collections.abc import Iterator
 from pathlib import Path
-from urllib.parse import urlparse
+from urllib.parse import quote, unquote, urlparse
 
-from flask_celery.backends.base import LockBackend
+from flask_celery.backends.base import LockBackend, LockInfo, gcra
+from flask_celery.signals import lock_expired_takeover
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover, Windows
+    fcntl = None  # type: ignore[assignment]
 
 
 class LockBackendFilesystem(LockBackend):
-    """Lock backend implemented on local filesystem."""
+    """Lock backend implemented on local filesystem.
+
+    Lock file is created atomically with O_CREAT|O_EXCL, its mtime is the lock timestamp and its content the owner token.
+    Takeover of expired lock, release and renewal are done while holding flock on the lock file and after verifying the
+    path still points to the locked inode, so two processes can never hold the same lock.
+
+    Lock files are spread over two levels of subdirectories named by identifier hash, e.g. 3f/a/my_app.tasks.sync.lock,
+    4096 directories keep a million locks at about 250 entries each. Identifier is percent-encoded into the file name,
+    one too long for NAME_MAX is truncated and suffixed with its hash. Rate limit state is kept in rate_limits/ and
+    cached results in cache/, one file named by key hash, mtime of cache file is its expiry.
+    """
 
     path: Path
     LOCK_NAME = "{}.lock"
+    RATE_LIMIT_DIR = "rate_limits"  # Has no subdirectories, so it is never scanned for locks
+    RATE_LIMIT_NAME = "{}.rate"
+    CACHE_DIR = "cache"
+    CACHE_NAME = "{}.cache"
+    NAME_MAX = 255
+    HASH_SEPARATOR = "+"  # Never present in percent-encoded identifier
+    supports_cache = True
+    supports_rate_limit = True
 
     def __init__(self, task_lock_backend_uri: str) -> None:
         """LockBackendFilesystem constructor.
@@ -22,6 +52,32 @@ class LockBackendFilesystem(LockBackend):
         parsed_backend_uri = urlparse(task_lock_backend_uri)
         self.path = Path(parsed_backend_uri.path)
         self.path.mkdir(exist_ok=True)
+        self.migrate_flat_layout()
+
+    @classmethod
+    def lock_file_name(cls, task_identifier: str, digest: str) -> str:
+        """Return lock file name of task identifier.
+
+        :param task_identifier: task identifier
+        :param digest: task identifier hash
+        :return: file name
+        """
+        name = cls.LOCK_NAME.format(quote(task_identifier, safe=""))
+        if len(name) <= cls.NAME_MAX:
+            return name
+        suffix = cls.HASH_SEPARATOR + cls.LOCK_NAME.format(digest)
+        # Do not leave half of percent-encoded character at the end
+        truncated = re.sub(r"%[0-9A-F]?$", "", name[:cls.NAME_MAX - len(suffix)])
+        return truncated + suffix
+
+    @classmethod
+    def task_identifier_of(cls, file_name: str) -> str:
+        """Return task identifier of lock file name, leading part only of truncated one.
+
+        :param file_name: lock file name
+        :return: task identifier
+        """
+        return unquote(file_name.removesuffix(cls.LOCK_NAME.format("")).partition(cls.HASH_SEPARATOR)[0])
 
     def get_lock_path(self, task_identifier: str) -> Path:
         """Return path to lock by task identifier.
@@ -29,37 +85,198 @@ class LockBackendFilesystem(LockBackend):
         :param task_identifier: task identifier
         :return: str path to lock file
         """
-        return self.path.joinpath(self.LOCK_NAME.format(task_identifier))
+        digest = hashlib.blake2b(task_identifier.encode(), digest_size=16).hexdigest()
+        return self.path.joinpath(digest[:2], digest[2], self.lock_file_name(task_identifier, digest))
 
-    def acquire(self, task_identifier: str, timeout: int) -> bool:
+    def migrate_flat_layout(self) -> None:
+        """Move lock files of flat layout used by older versions into subdirectories.
+
+        Lock file is hard linked into new layout with its mtime and owner token, link fails when lock was created there
+        meanwhile, so it is never overwritten. Moved lock of running task is not released by an older worker anymore and
+        expires.
+
+        :return: None
+        """
+        suffix = self.LOCK_NAME.format("")
+        with os.scandir(self.path) as entries:
+            flat = [entry.name for entry in entries if entry.name.endswith(suffix) and entry.is_file(follow_symlinks=False)]
+        for name in flat:
+            lock_path = self.get_lock_path(name.removesuffix(suffix))
+            lock_path.parent.mkdir(parents=True, exist_ok=True)
+            flat_path = self.path.joinpath(name)
+            with contextlib.suppress(FileNotFoundError):
+                # Lock in new layout wins
+                with contextlib.suppress(FileExistsError):
+                    os.link(flat_path, lock_path)
+                flat_path.unlink()
+
+    def iter_lock_entries(self, prefix: str = "") -> Iterator[os.DirEntry[str]]:
+        """Iterate lock files streaming directory scans of all subdirectories.
+
+        :param prefix: task identifier prefix
+        :return: iterator of directory entries
+        """
+        name_prefix = quote(prefix, safe="")
+        suffix = self.LOCK_NAME.format("")
+        for first in self.scan_directories(self.path):
+            for second in self.scan_directories(first):
+                with contextlib.suppress(FileNotFoundError), os.scandir(second) as entries:
+                    for entry in entries:
+                        if entry.name.startswith(name_prefix) and entry.name.endswith(suffix):
+                            yield entry
+
+    @staticmethod
+    def scan_directories(path: Path | str) -> list[str]:
+        """Return paths of subdirectories.
+
+        :param path: directory
+        :return: list of paths
+        """
+        try:
+            with os.scandir(path) as entries:
+                return [entry.path for entry in entries if entry.is_dir(follow_symlinks=False)]
+        except FileNotFoundError:
+            return []
+
+    @staticmethod
+    @contextlib.contextmanager
+    def locked_file(lock_path: Path) -> Iterator[int | None]:
+        """Open existing lock file and hold exclusive flock on it.
+
+        :param lock_path: path to lock file
+        :return: file descriptor, None when file does not exist or was replaced meanwhile
+        """
+        try:
+            fd = os.open(lock_path, os.O_RDWR)
+        except FileNotFoundError:
+            yield None
+            return
+
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                same_file = os.path.samestat(os.fstat(fd), lock_path.stat())
+            except FileNotFoundError:
+                same_file = False
+            yield fd if same_file else None
+        finally:
+            os.close(fd)
+
+    @staticmethod
+    def write_token(fd: int, token: str | None) -> None:
+        """Store owner token in lock file.
+
+        :param fd: file descriptor
+        :param token: owner token
+        :return: None
+        """
+        if token:
+            os.ftruncate(fd, 0)
+            os.lseek(fd, 0, os.SEEK_SET)
+            os.write(fd, token.encode())
+
+    @staticmethod
+    def is_owner(fd: int, token: str) -> bool:
+        """Check owner token stored in lock file.
+
+        :param fd: file descriptor
+        :param token: owner token
+        :return: bool
+        """
+        expected = token.encode()
+        os.lseek(fd, 0, os.SEEK_SET)
+        return os.read(fd, len(expected) + 1) == expected
+
+    @staticmethod
+    def touch(fd: int, lock_path: Path) -> None:
+        """Set lock timestamp (mtime) to now.
+
+        :param fd: file descriptor
+        :param lock_path: path to lock file, used when platform can not set mtime by descriptor
+        :return: None
+        """
+        os.utime(fd if os.utime in os.supports_fd else lock_path)
+
+    def create_lock(self, lock_path: Path, token: str | None) -> bool:
+        """Create lock file atomically, fail when it exists.
+
+        :param lock_path: path to lock file
+        :param token: owner token
+        :return: bool
+        """
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+        except FileExistsError:
+            return False
+        except FileNotFoundError:
+            # First lock in this subdirectory
+            lock_path.parent.mkdir(parents=True, exist_ok=True)
+            return self.create_lock(lock_path, token)
+        try:
+            self.write_token(fd, token)
+        finally:
+            os.close(fd)
+        return True
+
+    def acquire(self, task_identifier: str, timeout: int, token: str | None = None) -> bool:
         """Acquire lock.
 
         :param task_identifier: task identifier.
         :param timeout: lock timeout
+        :param token: owner token
         :return: bool
         """
         lock_path = self.get_lock_path(task_identifier)
+        if self.create_lock(lock_path, token):
+            return True
 
-        try:
-            with lock_path.open("r") as file_read:
-                created = file_read.read().strip()
-                if not created:
-                    return True
+        with self.locked_file(lock_path) as fd:
+            if fd is None:
+                # Released meanwhile, try to create it once more
+                return self.create_lock(lock_path, token)
 
-                return not int(time.time()) < (int(created) + timeout)
-        except OSError:
-            with lock_path.open("w") as file_write:
-                file_write.write(str(int(time.time())))
-            return True
+            if time.time() < os.fstat(fd).st_mtime + timeout:
+                return False
+
+            # Expired, take over
+            self.write_token(fd, token)
+            self.touch(fd, lock_path)
+        if lock_expired_takeover.receivers:
+            lock_expired_takeover.send(self, task_identifier=task_identifier)
+        return True
 
-    def release(self, task_identifier: str) -> None:
+    def release(self, task_identifier: str, token: str | None = None) -> None:
         """Release lock.
 
         :param task_identifier: task identifier
+        :param token: owner token, lock is removed only when held by this owner, regardless of owner when None
         :return: None
         """
         lock_path = self.get_lock_path(task_identifier)
-        lock_path.unlink(missing_ok=True)
+        if token is None:
+            lock_path.unlink(missing_ok=True)
+            return
+
+        with self.locked_file(lock_path) as fd:
+            if fd is not None and self.is_owner(fd, token):
+                lock_path.unlink(missing_ok=True)
+
+    def extend(self, task_identifier: str, timeout: int, token: str) -> bool:
+        """Reset lock timeout when lock is held by owner.
+
+        :param task_identifier: task identifier
+        :param timeout: new lock timeout, expiry is computed from mtime by the caller
+        :param token: owner token
+        :return: bool, False when lock is not held by owner anymore
+        """
+        _ = timeout
+        lock_path = self.get_lock_path(task_identifier)
+        with self.locked_file(lock_path) as fd:
+            if fd is None or not self.is_owner(fd, token):
+                return False
+            self.touch(fd, lock_path)
+            return True
 
     def exists(self, task_identifier: str, timeout: int) -> bool:
         """Check if lock exists and is valid.
@@ -68,13 +285,182 @@ class LockBackendFilesystem(LockBackend):
         :param timeout: lock timeout
         :return: bool
         """
-        lock_path = self.get_lock_path(task_identifier)
         try:
-            with lock_path.open("r") as file_read:
-                created = file_read.read().strip()
-                if not created:
-                    return False
-
-                return int(time.time()) < (int(created) + timeout)
+            mtime = self.get_lock_path(task_identifier).stat().st_mtime
         except OSError:
             return False
+        return time.time() < mtime + timeout
+
+    def get_owner(self, task_identifier: str, timeout: int) -> str | None:
+        """Return owner token of valid lock, the lock file content.
+
+        :param task_identifier: task identifier
+        :param timeout: lock timeout
+        :return: owner token, None when lock does not exist, expired or has no owner
+        """
+        lock_path = self.get_lock_path(task_identifier)
+        with self.locked_file(lock_path) as fd:
+            if fd is None or time.time() >= os.fstat(fd).st_mtime + timeout:
+                return None
+            owner = os.read(fd, 1024)
+        return owner.decode() or None
+
+    def rate_limit(self, key: str, interval: float, burst: int) -> float:
+        """Take one call of GCRA rate limit, theoretical arrival time is read and written under flock of its file.
+
+        Rate limit files are never removed, so the locked file can not be replaced meanwhile.
+
+        :param key: rate limit key
+        :param interval: seconds between calls at the limit
+        :param burst: calls allowed at once
+        :return: seconds until the call is allowed, 0.0 when it is allowed now and was counted
+        """
+        digest = hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+        rate_path = self.path.joinpath(self.RATE_LIMIT_DIR, self.RATE_LIMIT_NAME.format(digest))
+        try:
+            fd = os.open(rate_path, os.O_CREAT | os.O_RDWR, 0o644)
+        except FileNotFoundError:
+            rate_path.parent.mkdir(exist_ok=True)
+            fd = os.open(rate_path, os.O_CREAT | os.O_RDWR, 0o644)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            stored = os.read(fd, 64)
+            wait, tat = gcra(time.time(), float(stored) if stored else None, interval, burst)
+            if not wait:
+                self.write_token(fd, repr(tat))
+            return wait
+        finally:
+            os.close(fd)
+
+    def get_cache_path(self, key: str) -> Path:
+        """Return path to cache file by key.
+
+        :param key: cache key
+        :return: path
+        """
+        digest = hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+        return self.path.joinpath(self.CACHE_DIR, self.CACHE_NAME.format(digest))
+
+    def cache_get(self, key: str) -> bytes | None:
+        """Return cached value.
+
+        :param key: cache key
+        :return: value, None when it is not cached or expired
+        """
+        try:
+            with self.get_cache_path(key).open("rb") as file:
+                if os.fstat(file.fileno()).st_mtime <= time.time():
+                    return None
+                return file.read()
+        except FileNotFoundError:
+            return None
+
+    def cache_set(self, key: str, value: bytes, ttl: int) -> None:
+        """Cache value, written to temporary file which atomically replaces the previous one, cache/ is purged periodically.
+
+        :param key: cache key
+        :param value: value
+        :param ttl: seconds until value expires
+        :return: None
+        """
+        cache_path = self.get_cache_path(key)
+        cache_path.parent.mkdir(exist_ok=True)
+        fd, temporary_path = tempfile.mkstemp(dir=cache_path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(value)
+            expires_at = time.time() + ttl
+            os.utime(temporary_path, (expires_at, expires_at))
+            Path(temporary_path).replace(cache_path)
+        except BaseException:
+            Path(temporary_path).unlink(missing_ok=True)
+            raise
+        self.purge_cache_periodically()
+
+    def purge_cache(self, batch_size: int = 1000) -> int:
+        """Unlink at most batch_size expired cache files, then ones expiring first over CACHE_MAX_ENTRIES.
+
+        :param batch_size: max files removed
+        :return: number of removed entries
+        """
+        suffix = self.CACHE_NAME.format("")
+        now = time.time()
+        entries: list[tuple[float, str]] = []
+        with contextlib.suppress(FileNotFoundError), os.scandir(self.path.joinpath(self.CACHE_DIR)) as scanned:
+            for entry in scanned:
+                with contextlib.suppress(OSError):
+                    if entry.name.endswith(suffix):
+                        entries.append((entry.stat().st_mtime, entry.path))
+        entries.sort()
+        expired = sum(1 for expires_at, _ in entries if expires_at <= now)
+        removed = 0
+        for _, path in entries[:min(max(expired, len(entries) - self.CACHE_MAX_ENTRIES), batch_size)]:
+            with contextlib.suppress(FileNotFoundError):
+                Path(path).unlink()
+                removed += 1
+        return removed
+
+    def iter_locks(self, prefix: str = "", timeout: int | None = None, batch_size: int = 1000) -> Iterator[LockInfo]:
+        """Iterate locks streaming directory scans, identifiers too long for a file name are listed truncated.
+
+        :param prefix: task identifier prefix
+        :param timeout: lock timeout to compute ttl with
+        :param batch_size: not used, os.scandir buffers entries itself
+        :return: iterator of locks
+        """
+        _ = batch_size
+        for entry in self.iter_lock_entries(prefix):
+            try:
+                age = time.time() - entry.stat().st_mtime
+                with Path(entry.path).open("rb") as file:
+                    owner = file.read(1024).decode() or None
+            except OSError:
+                continue
+            yield LockInfo(self.task_identifier_of(entry.name), age, timeout - age if timeout is not None else None, owner)
+
+    def expire_locks(self, prefix: str = "", older_than: float | None = None, batch_size: int = 1000) -> int:
+        """Remove lock files regardless of owner, found by directory scans so truncated identifiers are removed too.
+
+        :param prefix: task identifier prefix
+        :param older_than: remove only locks older than this many seconds
+        :param batch_size: not used, files are removed one by one
+        :return: number of removed locks
+        """
+        _ = batch_size
+        removed = 0
+        for entry in self.iter_lock_entries(prefix):
+            try:
+                if older_than is not None and time.time() - entry.stat().st_mtime < older_than:
+                    continue
+                Path(entry.path).unlink()
+            except FileNotFoundError:
+                continue
+            removed += 1
+        return removed
+
+    def purge_expired(self, max_age: int, batch_size: int = 1000) -> int:
+        """Unlink at most batch_size expired lock files found by directory scans.
+
+        :param max_age: age in seconds after which lock is expired
+        :param batch_size: max files removed
+        :return: number of removed locks
+        """
+        cutoff = time.time() - max_age
+        removed = 0
+        for entry in self.iter_lock_entries():
+            if removed >= batch_size:
+                break
+            try:
+                if entry.stat().st_mtime >= cutoff:
+                    continue
+            except OSError:
+                continue
+            lock_path = Path(entry.path)
+            with self.locked_file(lock_path) as fd:
+                # mtime is checked again under flock, lock may have been taken over meanwhile
+                if fd is None or os.fstat(fd).st_mtime >= cutoff:
+                    continue
+                lock_path.unlink(missing_ok=True)
+            removed += 1
+        return removed
@@ -0,0 +1,436 @@
+"""In-process memory backend."""
+
+import atexit
+import hashlib
+import heapq
+import multiprocessing
+import os
+import struct
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterator
+from multiprocessing.shared_memory import SharedMemory
+from typing import cast
+from urllib.parse import parse_qs, urlparse
+
+from flask_celery.backends.base import LockBackend, LockInfo, gcra
+from flask_celery.signals import lock_expired_takeover
+
+
+class LocalLockTable:
+    """Locks of one process, dict of identifier: (expiry, token) split into shards with own lock and expiry heap."""
+
+    SHARDS = 16
+
+    def __init__(self) -> None:
+        """LocalLockTable constructor."""
+        self.shard_locks = [threading.Lock() for _ in range(self.SHARDS)]
+        self.shard_locks_held: list[dict[str, tuple[float, str | None]]] = [{} for _ in range(self.SHARDS)]
+        self.shard_heaps: list[list[tuple[float, str]]] = [[] for _ in range(self.SHARDS)]
+        self.rate_limits_lock = threading.Lock()
+        self.rate_limits: dict[str, float] = {}  # rate limit key: theoretical arrival time
+
+    def shard(self, task_identifier: str) -> int:
+        """Return shard index of task identifier.
+
+        :param task_identifier: task identifier
+        :return: int
+        """
+        return hash(task_identifier) % self.SHARDS
+
+    def evict(self, shard: int, now: float) -> None:
+        """Remove expired locks of shard, O(log n) per lock, caller holds shard lock.
+
+        :param shard: shard index
+        :param now: current time
+        :return: None
+        """
+        locks = self.shard_locks_held[shard]
+        heap = self.shard_heaps[shard]
+        while heap and heap[0][0] <= now:
+            expiry, task_identifier = heapq.heappop(heap)
+            # Heap entry is stale when lock was released, extended or taken again meanwhile
+            lock = locks.get(task_identifier)
+            if lock is not None and lock[0] == expiry:
+                del locks[task_identifier]
+
+    def acquire(self, task_identifier: str, timeout: int, token: str | None) -> float | None:
+        """Acquire lock.
+
+        :return: None when lock is held, expiry of expired lock taken over, 0.0 when there was no lock
+        """
+        shard = self.shard(task_identifier)
+        now = time.monotonic()
+        with self.shard_locks[shard]:
+            locks = self.shard_locks_held[shard]
+            previous = locks.get(task_identifier)
+            self.evict(shard, now)
+            if task_identifier in locks:
+                return None
+            expiry = now + timeout
+            locks[task_identifier] = (expiry, token)
+            heapq.heappush(self.shard_heaps[shard], (expiry, task_identifier))
+            return previous[0] if previous is not None else 0.0
+
+    def release(self, task_identifier: str, token: str | None) -> None:
+        """Release lock."""
+        shard = self.shard(task_identifier)
+        with self.shard_locks[shard]:
+            locks = self.shard_locks_held[shard]
+            lock = locks.get(task_identifier)
+            if lock is not None and (token is None or lock[1] == token):
+                del locks[task_identifier]
+
+    def extend(self, task_identifier: str, timeout: int, token: str) -> bool:
+        """Reset lock timeout when lock is held by owner."""
+        shard = self.shard(task_identifier)
+        now = time.monotonic()
+        with self.shard_locks[shard]:
+            self.evict(shard, now)
+            locks = self.shard_locks_held[shard]
+            lock = locks.get(task_identifier)
+            if lock is None or lock[1] != token:
+                return False
+            expiry = now + timeout
+            locks[task_identifier] = (expiry, token)
+            heapq.heappush(self.shard_heaps[shard], (expiry, task_identifier))
+            return True
+
+    def exists(self, task_identifier: str) -> bool:
+        """Check if lock exists and is valid."""
+        shard = self.shard(task_identifier)
+        with self.shard_locks[shard]:
+            lock = self.shard_locks_held[shard].get(task_identifier)
+            return lock is not None and time.monotonic() < lock[0]
+
+    def get_owner(self, task_identifier: str) -> str | None:
+        """Return owner token of valid lock."""
+        shard = self.shard(task_identifier)
+        with self.shard_locks[shard]:
+            lock = self.shard_locks_held[shard].get(task_identifier)
+            return lock[1] if lock is not None and time.monotonic() < lock[0] else None
+
+    def rate_limit(self, key: str, interval: float, burst: int) -> float:
+        """Take one call of GCRA rate limit.
+
+        :return: seconds until the call is allowed, 0.0 when it is allowed now and was counted
+        """
+        with self.rate_limits_lock:
+            wait, tat = gcra(time.monotonic(), self.rate_limits.get(key), interval, burst)
+            if not wait:
+                self.rate_limits[key] = tat
+            return wait
+
+    def snapshot(self, prefix: str) -> Iterator[tuple[str, float, str | None]]:
+        """Iterate valid locks, copying one shard at a time.
+
+        :param prefix: task identifier prefix
+        :return: iterator of task identifier, expiry, owner token
+        """
+        for shard in range(self.SHARDS):
+            with self.shard_locks[shard]:
+                self.evict(shard, time.monotonic())
+                locks = [
+                    (task_identifier, expiry, owner)
+                    for task_identifier, (expiry, owner) in self.shard_locks_held[shard].items()
+                    if task_identifier.startswith(prefix)
+                ]
+            yield from locks
+
+
+class SharedLockTable:
+    """Locks shared by forked processes, fixed size open addressing hash table in shared memory.
+
+    Slot is (identifier hash, expiry, owner token hash), empty slot has zero identifier hash, released or expired slot
+    keeps its identifier hash and is reused. Table and its process lock must be created before workers fork.
+    """
+
+    SLOT = struct.Struct("<QdQ")
+    RATE_LIMIT_KEY = "\0rate_limit.{}"  # Never equal to task identifier
+
+    def __init__(self, slots: int) -> None:
+        """SharedLockTable constructor.
+
+        :param slots: max number of locks held at once
+        """
+        self.slots = slots
+        self.lock = multiprocessing.Lock()
+        self.memory = SharedMemory(create=True, size=slots * self.SLOT.size)
+        self.buffer[:] = bytes(slots * self.SLOT.size)
+        creator_pid = os.getpid()
+        atexit.register(lambda: self.close(unlink=os.getpid() == creator_pid))
+
+    @property
+    def buffer(self) -> memoryview:
+        """Return shared memory buffer."""
+        buffer = self.memory.buf
+        if buffer is None:
+            msg = "Shared lock table is closed"
+            raise ValueError(msg)
+        return buffer
+
+    @staticmethod
+    def key(value: str) -> int:
+        """Return non zero 64bit hash.
+
+        :param value: string to hash
+        :return: int
+        """
+        return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "little") | 1
+
+    def find(self, key: int, now: float) -> tuple[int | None, int | None]:
+        """Find slot of key and first reusable slot, caller holds the lock.
+
+        :param key: identifier hash
+        :param now: current time
+        :return: slot of key or None, first empty or expired slot or None
+        """
+        free = None
+        start = key % self.slots
+        for probe in range(self.slots):
+            slot = (start + probe) % self.slots
+            slot_key, expiry, _ = self.read(slot)
+            if slot_key == key:
+                return slot, free
+            if free is None and (slot_key == 0 or expiry <= now):
+                free = slot
+            if slot_key == 0:
+                break
+        return None, free
+
+    def read(self, slot: int) -> tuple[int, float, int]:
+        """Read slot."""
+        return cast("tuple[int, float, int]", self.SLOT.unpack_from(self.buffer, slot * self.SLOT.size))
+
+    def write(self, slot: int, key: int, expiry: float, token_key: int) -> None:
+        """Write slot."""
+        self.SLOT.pack_into(self.buffer, slot * self.SLOT.size, key, expiry, token_key)
+
+    def acquire(self, task_identifier: str, timeout: int, token: str | None) -> float | None:
+        """Acquire lock.
+
+        :return: None when lock is held, expiry of expired lock taken over, 0.0 when there was no lock
+        """
+        key = self.key(task_identifier)
+        token_key = self.key(token) if token else 0
+        with self.lock:
+            now = time.time()
+            previous = 0.0
+            slot, free = self.find(key, now)
+            if slot is not None:
+                previous = self.read(slot)[1]
+                if previous > now:
+                    return None
+                free = slot
+            if free is None:
+                msg = f"Shared lock table is full ({self.slots} slots)"
+                raise OverflowError(msg)
+            self.write(free, key, now + timeout, token_key)
+            return previous
+
+    def release(self, task_identifier: str, token: str | None) -> None:
+        """Release lock."""
+        key = self.key(task_identifier)
+        with self.lock:
+            slot, _ = self.find(key, time.time())
+            if slot is not None and (token is None or self.read(slot)[2] == self.key(token)):
+                self.write(slot, key, 0.0, 0)
+
+    def extend(self, task_identifier: str, timeout: int, token: str) -> bool:
+        """Reset lock timeout when lock is held by owner."""
+        key = self.key(task_identifier)
+        with self.lock:
+            now = time.time()
+            slot, _ = self.find(key, now)
+            if slot is None:
+                return False
+            _, expiry, token_key = self.read(slot)
+            if expiry <= now or token_key != self.key(token):
+                return False
+            self.write(slot, key, now + timeout, token_key)
+            return True
+
+    def exists(self, task_identifier: str) -> bool:
+        """Check if lock exists and is valid."""
+        with self.lock:
+            now = time.time()
+            slot, _ = self.find(self.key(task_identifier), now)
+            return slot is not None and self.read(slot)[1] > now
+
+    def rate_limit(self, key: str, interval: float, burst: int) -> float:
+        """Take one call of GCRA rate limit, theoretical arrival time is stored as expiry of slot keyed by rate limit key.
+
+        :return: seconds until the call is allowed, 0.0 when it is allowed now and was counted
+        """
+        slot_key = self.key(self.RATE_LIMIT_KEY.format(key))
+        with self.lock:
+            now = time.time()
+            slot, free = self.find(slot_key, now)
+            wait, tat = gcra(now, None if slot is None else self.read(slot)[1], interval, burst)
+            if wait:
+                return wait
+            if slot is None:
+                slot = free
+            if slot is None:
+                msg = f"Shared lock table is full ({self.slots} slots)"
+                raise OverflowError(msg)
+            self.write(slot, slot_key, tat, 0)
+            return 0.0
+
+    def close(self, *, unlink: bool) -> None:
+        """Close shared memory, unlink it in the process that created it.
+
+        :param unlink: remove shared memory segment
+        :return: None
+        """
+        self.memory.close()
+        if unlink:
+            self.memory.unlink()
+
+
+class LockBackendMemory(LockBackend):
+    """Lock backend keeping locks in memory, for single node deployments and tests.
+
+    memory:// locks are visible to threads (or greenlets) of one process. memory://?shared=1&slots=65536 keeps locks in
+    shared memory visible to all processes forked after the backend was created, e.g. prefork pool workers.
+
+    Cache of local table is LRU of at most cache_size entries (memory://?cache_size=1024), shared table has no cache.
+    """
+
+    table: LocalLockTable | SharedLockTable
+    supports_cache = True
+    supports_rate_limit = True
+
+    def __init__(self, task_lock_backend_uri: str) -> None:
+        """LockBackendMemory constructor.
+
+        :param task_lock_backend_uri: URI
+        """
+        super().__init__(task_lock_backend_uri)
+        query = parse_qs(urlparse(task_lock_backend_uri).query)
+        if query.get("shared", ["0"])[0].lower() in ("1", "true", "yes"):
+            self.table = SharedLockTable(int(query.get("slots", ["65536"])[0]))
+            self.supports_cache = False
+        else:
+            self.table = LocalLockTable()
+        self.cache_size = int(query.get("cache_size", ["1024"])[0])
+        self.cache_lock = threading.Lock()
+        self.cache: OrderedDict[str, tuple[float, bytes]] = OrderedDict()  # key: expiry, value, least recently used first
+
+    def acquire(self, task_identifier: str, timeout: int, token: str | None = None) -> bool:
+        """Acquire lock.
+
+        :param task_identifier: task identifier
+        :param timeout: lock timeout
+        :param token: owner token
+        :return: bool
+        """
+        previous = self.table.acquire(task_identifier, timeout, token)
+        if previous is None:
+            return False
+        if previous and lock_expired_takeover.receivers:
+            lock_expired_takeover.send(self, task_identifier=task_identifier)
+        return True
+
+    def release(self, task_identifier: str, token: str | None = None) -> None:
+        """Release lock.
+
+        :param task_identifier: task identifier
+        :param token: owner token, lock is removed only when held by this owner, regardless of owner when None
+        :return: None
+        """
+        self.table.release(task_identifier, token)
+
+    def extend(self, task_identifier: str, timeout: int, token: str) -> bool:
+        """Reset lock timeout when lock is held by owner.
+
+        :param task_identifier: task identifier
+        :param timeout: new lock timeout
+        :param token: owner token
+        :return: bool, False when lock is not held by owner anymore
+        """
+        return self.table.extend(task_identifier, timeout, token)
+
+    def rate_limit(self, key: str, interval: float, burst: int) -> float:
+        """Take one call of GCRA rate limit.
+
+        :param key: rate limit key
+        :param interval: seconds between calls at the limit
+        :param burst: calls allowed at once
+        :return: seconds until the call is allowed, 0.0 when it is allowed now and was counted
+        """
+        return self.table.rate_limit(key, interval, burst)
+
+    def exists(self, task_identifier: str, timeout: int) -> bool:
+        """Check if lock exists and is valid.
+
+        :param task_identifier: task identifier
+        :param timeout: lock timeout, expiry is set on acquire
+        :return: bool
+        """
+        _ = timeout
+        return self.table.exists(task_identifier)
+
+    def get_owner(self, task_identifier: str, timeout: int) -> str | None:
+        """Return owner token of valid lock, shared table stores token hashes only.
+
+        :param task_identifier: task identifier
+        :param timeout: lock timeout, expiry is set on acquire
+        :return: owner token, None when lock does not exist or table is shared
+        """
+        _ = timeout
+        if isinstance(self.table, SharedLockTable):
+            return None
+        return self.table.get_owner(task_identifier)
+
+    def iter_locks(self, prefix: str = "", timeout: int | None = None, batch_size: int = 1000) -> Iterator[LockInfo]:
+        """Iterate locks, shared table stores identifier hashes only so it cannot be listed.
+
+        :param prefix: task identifier prefix
+        :param timeout: not used, expiry is set on acquire
+        :param batch_size: not used
+        :return: iterator of locks, age is unknown
+        """
+        _ = timeout, batch_size
+        if isinstance(self.table, SharedLockTable):
+            msg = "Shared memory lock table stores identifier hashes only and cannot be listed"
+            raise NotImplementedError(msg)
+        for task_identifier, expiry, owner in self.table.snapshot(prefix):
+            yield LockInfo(task_identifier, None, expiry - time.monotonic(), owner)
+
+    def cache_get(self, key: str) -> bytes | None:
+        """Return cached value.
+
+        :param key: cache key
+        :return: value, None when it is not cached or expired
+        """
+        if isinstance(self.table, SharedLockTable):
+            msg = "Shared memory lock table has no cache"
+            raise NotImplementedError(msg)
+        with self.cache_lock:
+            entry = self.cache.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self.cache[key]
+                return None
+            self.cache.move_to_end(key)
+            return entry[1]
+
+    def cache_set(self, key: str, value: bytes, ttl: int) -> None:
+        """Cache value, least recently used entry is evicted when cache is full.
+
+        :param key: cache key
+        :param value: value
+        :param ttl: seconds until value expires
+        :return: None
+        """
+        if isinstance(self.table, SharedLockTable):
+            msg = "Shared memory lock table has no cache"
+            raise NotImplementedError(msg)
+        with self.cache_lock:
+            self.cache[key] = (time.monotonic() + ttl, value)
+            self.cache.move_to_end(key)
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
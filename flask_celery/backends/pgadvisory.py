@@ -0,0 +1,156 @@
+"""PostgreSQL advisory lock backend."""
+
+import hashlib
+import threading
+from collections.abc import Iterator
+from typing import Any
+
+from sqlalchemy import Connection, text
+from sqlalchemy.exc import SQLAlchemyError
+
+from flask_celery.backends.base import LockBackend, LockInfo
+from flask_celery.backends.database.sessions import SessionManager
+
+
+class LockBackendPgAdvisory(LockBackend):
+    """Lock backend implemented on PostgreSQL session level advisory locks.
+
+    Task identifier is hashed to a bigint key, no table is written. Lock is held on a pooled connection checked out
+    until release, PostgreSQL frees it automatically when the connection of a crashed worker dies. Locks do not expire,
+    timeout is ignored. Lock belongs to the process holding the connection, so it can not be reserved at enqueue.
+    """
+
+    SCHEME = "pgadvisory"
+    cross_process_ownership = False
+
+    def __init__(self, task_lock_backend_uri: str, engine_options: dict[str, Any] | None = None) -> None:
+        """LockBackendPgAdvisory constructor.
+
+        :param task_lock_backend_uri: URI, pgadvisory://... or pgadvisory+driver://...
+        :param engine_options: keyword arguments for create_engine, pool_size limits locks held at once per process
+        """
+        super().__init__(task_lock_backend_uri)
+        self.db_uri = "postgresql" + task_lock_backend_uri.removeprefix(self.SCHEME)
+        self.session_manager = SessionManager(engine_options)
+        self.held: dict[str, Connection] = {}
+        self.held_lock = threading.Lock()
+
+    @staticmethod
+    def lock_key(task_identifier: str) -> int:
+        """Return advisory lock key of task identifier.
+
+        :param task_identifier: task identifier
+        :return: signed 64bit int
+        """
+        return int.from_bytes(hashlib.blake2b(task_identifier.encode("utf-8"), digest_size=8).digest(), "big", signed=True)
+
+    def connect(self) -> Connection:
+        """Return pooled connection in autocommit mode, so no transaction is left open while lock is held.
+
+        :return: connection
+        """
+        return self.session_manager.get_engine(self.db_uri).connect().execution_options(isolation_level="AUTOCOMMIT")
+
+    def acquire(self, task_identifier: str, timeout: int, token: str | None = None) -> bool:
+        """Acquire lock.
+
+        :param task_identifier: task identifier
+        :param timeout: lock timeout, not used, lock is held until release or until connection dies
+        :param token: owner token, not used, lock belongs to the connection
+        :return: bool
+        """
+        _ = timeout, token
+        with self.held_lock:
+            if task_identifier in self.held:
+                return False
+
+        connection = self.connect()
+        try:
+            acquired = bool(connection.execute(
+                text("SELECT pg_try_advisory_lock(:key)"),
+                {"key": self.lock_key(task_identifier)},
+            ).scalar())
+        except Exception:
+            connection.close()
+            raise
+
+        if not acquired:
+            connection.close()
+            return False
+
+        with self.held_lock:
+            self.held[task_identifier] = connection
+        return True
+
+    def release(self, task_identifier: str, token: str | None = None) -> None:
+        """Release lock held by this process.
+
+        Advisory lock held by other process can not be released, it is freed when that process releases it or dies.
+
+        :param task_identifier: task identifier
+        :param token: owner token, not used
+        :return: None
+        """
+        _ = token
+        with self.held_lock:
+            connection = self.held.pop(task_identifier, None)
+        if connection is None:
+            self.log.warning("Lock %s is not held by this process, not releasing.", task_identifier)
+            return
+
+        try:
+            connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": self.lock_key(task_identifier)})
+        except SQLAlchemyError:
+            # Connection is gone, so is the lock
+            self.log.exception("Failed to release lock %s.", task_identifier)
+            connection.invalidate()
+        finally:
+            connection.close()
+
+    def extend(self, task_identifier: str, timeout: int, token: str) -> bool:
+        """Check lock is still held, advisory locks do not expire.
+
+        :param task_identifier: task identifier
+        :param timeout: new lock timeout, not used
+        :param token: owner token, not used
+        :return: bool
+        """
+        _ = timeout, token
+        with self.held_lock:
+            return task_identifier in self.held
+
+    def exists(self, task_identifier: str, timeout: int) -> bool:
+        """Check if lock is held by any session, without taking it.
+
+        :param task_identifier: task identifier
+        :param timeout: lock timeout, not used
+        :return: bool
+        """
+        _ = timeout
+        with self.held_lock:
+            if task_identifier in self.held:
+                return True
+
+        # Bigint advisory key is stored in pg_locks as high (classid) and low (objid) 32 bits with objsubid 1
+        key = self.lock_key(task_identifier) & 0xFFFFFFFFFFFFFFFF
+        with self.connect() as connection:
+            return bool(connection.execute(
+                text(
+                    "SELECT EXISTS (SELECT 1 FROM pg_locks WHERE locktype = 'advisory' AND granted"
+                    " AND classid = CAST(CAST(:classid AS bigint) AS oid) AND objid = CAST(CAST(:objid AS bigint) AS oid)"
+                    " AND objsubid = 1 AND database = (SELECT oid FROM pg_database WHERE datname = current_database()))",
+                ),
+                {"classid": key >> 32, "objid": key & 0xFFFFFFFF},
+            ).scalar())
+
+    def iter_locks(self, prefix: str = "", timeout: int | None = None, batch_size: int = 1000) -> Iterator[LockInfo]:
+        """Advisory locks are keyed by identifier hashes, pg_locks cannot be listed by task identifier.
+
+        :param prefix: not used
+        :param timeout: not used
+        :param batch_size: not used
+        :raise NotImplementedError: always
+        """
+        _ = prefix, timeout, batch_size
+        msg = "PostgreSQL advisory locks are keyed by identifier hashes and cannot be listed"
+        raise NotImplementedError(msg)
@@ -1,16 +1,154 @@
 """Redis backend."""
 
+import re
+import uuid
+from collections.abc import Iterator, Sequence
 from typing import cast
 
 import redis
+import redis.asyncio
 
-from flask_celery.backends.base import LockBackend
+from flask_celery.backends.base import AsyncLockBackend, LockBackend, LockInfo
+from flask_celery.signals import lock_expired_takeover
 
 
 class LockBackendRedis(LockBackend):
-    """Lock backend implemented on redis."""
+    """Lock backend implemented on redis.
+
+    Lock value is the owner token, release and extend are done by Lua scripts comparing the token first, so a worker
+    whose lock expired can never remove or prolong a lock held by someone else. Every operation is one round trip.
+
+    Expiring lock is paired with held marker living one more timeout, release removes both, so lock acquired while
+    the marker is left is reported as lock_expired_takeover.
+    """
 
     CELERY_LOCK = "_celery.single_instance.{task_id}"
+    CELERY_LOCK_RELEASED = "_celery.single_instance_released.{task_id}"
+    CELERY_LOCK_HELD = "_celery.single_instance_held.{task_id}"
+    CELERY_SEMAPHORE = "_celery.single_instance_semaphore.{task_id}"
+    CELERY_RATE_LIMIT = "_celery.rate_limit.{key}"
+    CELERY_CACHE = "_celery.cache.{key}"
+    RELEASED_TTL = 10000  # ms, release notification is kept for waiters that are between two BLPOPs
+    TAKEN_OVER = 2  # ACQUIRE_SCRIPT result when lock expired instead of being released and was acquired again
+    supports_cache = True
+    supports_rate_limit = True
+
+    # KEYS: lock, held marker; ARGV: owner token, timeout in ms, 0 when lock never expires
+    # returns 0 when lock is held, 1 when acquired, 2 when acquired after previous lock expired instead of being released
+    ACQUIRE_SCRIPT = """
+        local timeout = tonumber(ARGV[2])
+        local acquired
+        if timeout > 0 then
+            acquired = redis.call("SET", KEYS[1], ARGV[1], "NX", "PX", timeout)
+        else
+            acquired = redis.call("SET", KEYS[1], ARGV[1], "NX")
+        end
+        if not acquired then
+            return 0
+        end
+        local expired = redis.call("DEL", KEYS[2])
+        if timeout > 0 then
+            redis.call("SET", KEYS[2], 1, "PX", timeout * 2)
+        end
+        return 1 + expired
+    """
+
+    # KEYS: lock, release notification, held marker; ARGV: owner token or empty string to release regardless of owner,
+    # notification ttl
+    RELEASE_SCRIPT = """
+        if ARGV[1] == "" or redis.call("GET", KEYS[1]) == ARGV[1] then
+            if redis.call("DEL", KEYS[1]) == 1 then
+                redis.call("DEL", KEYS[3])
+                redis.call("LPUSH", KEYS[2], 1)
+                redis.call("LTRIM", KEYS[2], 0, 0)
+                redis.call("PEXPIRE", KEYS[2], ARGV[2])
+                return 1
+            end
+        end
+        return 0
+    """
+
+    # KEYS: lock, held marker; ARGV: owner token, timeout in ms
+    EXTEND_SCRIPT = """
+        if redis.call("GET", KEYS[1]) == ARGV[1] then
+            redis.call("PEXPIRE", KEYS[2], ARGV[2] * 2)
+            return redis.call("PEXPIRE", KEYS[1], ARGV[2])
+        end
+        return 0
+    """
+
+    # KEYS: locks followed by their release notifications and held markers; ARGV: same as RELEASE_SCRIPT
+    RELEASE_MANY_SCRIPT = """
+        local released = 0
+        local count = #KEYS / 3
+        for i = 1, count do
+            if ARGV[1] == "" or redis.call("GET", KEYS[i]) == ARGV[1] then
+                if redis.call("DEL", KEYS[i]) == 1 then
+                    redis.call("DEL", KEYS[2 * count + i])
+                    redis.call("LPUSH", KEYS[count + i], 1)
+                    redis.call("LTRIM", KEYS[count + i], 0, 0)
+                    redis.call("PEXPIRE", KEYS[count + i], ARGV[2])
+                    released = released + 1
+                end
+            end
+        end
+        return released
+    """
+
+    # Sorted set of owner tokens scored by expiry in ms of redis TIME, expired holders are dropped before counting
+    # KEYS: semaphore; ARGV: limit, owner token, timeout in ms
+    ACQUIRE_SLOT_SCRIPT = """
+        local time = redis.call("TIME")
+        local now = time[1] * 1000 + math.floor(time[2] / 1000)
+        redis.call("ZREMRANGEBYSCORE", KEYS[1], "-inf", now)
+        if redis.call("ZSCORE", KEYS[1], ARGV[2]) or redis.call("ZCARD", KEYS[1]) < tonumber(ARGV[1]) then
+            redis.call("ZADD", KEYS[1], now + ARGV[3], ARGV[2])
+            local last = redis.call("ZRANGE", KEYS[1], -1, -1, "WITHSCORES")
+            redis.call("PEXPIREAT", KEYS[1], last[2])
+            return 1
+        end
+        return 0
+    """
+
+    # KEYS: semaphore; ARGV: owner token, timeout in ms
+    EXTEND_SLOT_SCRIPT = """
+        local time = redis.call("TIME")
+        local now = time[1] * 1000 + math.floor(time[2] / 1000)
+        local expires = redis.call("ZSCORE", KEYS[1], ARGV[1])
+        if not expires or tonumber(expires) <= now then
+            return 0
+        end
+        redis.call("ZADD", KEYS[1], now + ARGV[2], ARGV[1])
+        local last = redis.call("ZRANGE", KEYS[1], -1, -1, "WITHSCORES")
+        redis.call("PEXPIREAT", KEYS[1], last[2])
+        return 1
+    """
+
+    # KEYS: semaphore, release notification; ARGV: owner token, notification ttl
+    RELEASE_SLOT_SCRIPT = """
+        if redis.call("ZREM", KEYS[1], ARGV[1]) == 1 then
+            redis.call("LPUSH", KEYS[2], 1)
+            redis.call("LTRIM", KEYS[2], 0, 0)
+            redis.call("PEXPIRE", KEYS[2], ARGV[2])
+            return 1
+        end
+        return 0
+    """
+
+    # GCRA, value is theoretical arrival time in us of redis TIME, it expires once it is in the past
+    # KEYS: rate limit; ARGV: interval in us, burst; returns us to wait, 0 when call is allowed
+    RATE_LIMIT_SCRIPT = """
+        local time = redis.call("TIME")
+        local now = time[1] * 1000000 + time[2]
+        local interval = tonumber(ARGV[1])
+        local tat = math.max(tonumber(redis.call("GET", KEYS[1]) or now), now) + interval
+        local wait = tat - interval * tonumber(ARGV[2]) - now
+        if wait > 0 then
+            return wait
+        end
+        redis.call("SET", KEYS[1], string.format("%d", tat), "PX", math.ceil((tat - now) / 1000))
+        return 0
+    """
 
     def __init__(self, task_lock_backend_uri: str) -> None:
         """LockBackendRedis constructor.
@@ -18,27 +156,99 @@ class LockBackendRedis(LockBackend):
         :param task_lock_backend_uri: URI
         """
         super().__init__(task_lock_backend_uri)
-        self.redis_client = redis.StrictRedis.from_url(task_lock_backend_uri.replace("redis+socket://", "unix://"))
+        self.redis_client = redis.StrictRedis.from_url(self.client_url(task_lock_backend_uri))
+        # Scripts are loaded on first use and then called by EVALSHA
+        self.acquire_script = self.redis_client.register_script(self.ACQUIRE_SCRIPT)
+        self.release_script = self.redis_client.register_script(self.RELEASE_SCRIPT)
+        self.extend_script = self.redis_client.register_script(self.EXTEND_SCRIPT)
+        self.release_many_script = self.redis_client.register_script(self.RELEASE_MANY_SCRIPT)
+        self.acquire_slot_script = self.redis_client.register_script(self.ACQUIRE_SLOT_SCRIPT)
+        self.extend_slot_script = self.redis_client.register_script(self.EXTEND_SLOT_SCRIPT)
+        self.release_slot_script = self.redis_client.register_script(self.RELEASE_SLOT_SCRIPT)
+        self.rate_limit_script = self.redis_client.register_script(self.RATE_LIMIT_SCRIPT)
+
+    @staticmethod
+    def client_url(task_lock_backend_uri: str) -> str:
+        """Return URL understood by redis client.
+
+        :param task_lock_backend_uri: URI
+        :return: str
+        """
+        return task_lock_backend_uri.replace("redis+socket://", "unix://")
 
-    def acquire(self, task_identifier: str, timeout: int) -> bool:
+    @classmethod
+    def lock_keys(cls, task_identifier: str) -> list[str]:
+        """Return keys of lock, its release notification and held marker.
+
+        :param task_identifier: task identifier
+        :return: list of keys
+        """
+        return [
+            cls.CELERY_LOCK.format(task_id=task_identifier),
+            cls.CELERY_LOCK_RELEASED.format(task_id=task_identifier),
+            cls.CELERY_LOCK_HELD.format(task_id=task_identifier),
+        ]
+
+    def acquired(self, task_identifier: str, result: int) -> bool:
+        """Return whether ACQUIRE_SCRIPT acquired lock, report lock taken over after it expired.
+
+        :param task_identifier: task identifier
+        :param result: script result
+        :return: bool
+        """
+        if result == self.TAKEN_OVER and lock_expired_takeover.receivers:
+            lock_expired_takeover.send(self, task_identifier=task_identifier)
+        return bool(result)
+
+    def to_async(self) -> "AsyncLockBackendRedis":
+        """Return asyncio backend using redis.asyncio client.
+
+        :return: AsyncLockBackendRedis
+        """
+        return AsyncLockBackendRedis(self.task_lock_backend_uri)
+
+    def acquire(self, task_identifier: str, timeout: int, token: str | None = None) -> bool:
         """Acquire lock.
 
         :param task_identifier: task identifier
-        :param timeout: lock timeout
+        :param timeout: lock timeout, lock never expires when 0
+        :param token: owner token
         :return: bool
         """
-        redis_key = self.CELERY_LOCK.format(task_id=task_identifier)
-        lock = self.redis_client.lock(redis_key, timeout=timeout)
-        return cast("bool", lock.acquire(blocking=False))
+        lock_key, _, held_key = self.lock_keys(task_identifier)
+        result = self.acquire_script(keys=[lock_key, held_key], args=[token or uuid.uuid4().hex, timeout * 1000])
+        return self.acquired(task_identifier, result)
 
-    def release(self, task_identifier: str) -> None:
+    def release(self, task_identifier: str, token: str | None = None) -> None:
         """Release lock.
 
         :param task_identifier: task identifier
+        :param token: owner token, lock is removed only when held by this owner, regardless of owner when None
         :return: None
+
+        Waiters blocked in wait_for_release are notified.
         """
-        redis_key = self.CELERY_LOCK.format(task_id=task_identifier)
-        self.redis_client.delete(redis_key)
+        self.release_script(keys=self.lock_keys(task_identifier), args=[token or "", self.RELEASED_TTL])
+
+    def wait_for_release(self, task_identifier: str, timeout: float) -> None:
+        """Block on release notification list until lock is released or timeout passed.
+
+        :param task_identifier: task identifier
+        :param timeout: max seconds to wait
+        :return: None
+        """
+        self.redis_client.blpop([self.CELERY_LOCK_RELEASED.format(task_id=task_identifier)], timeout=max(timeout, 0.01))
+
+    def extend(self, task_identifier: str, timeout: int, token: str) -> bool:
+        """Reset lock timeout when lock is held by owner.
+
+        :param task_identifier: task identifier
+        :param timeout: new lock timeout
+        :param token: owner token
+        :return: bool, False when lock is not held by owner anymore
+        """
+        lock_key, _, held_key = self.lock_keys(task_identifier)
+        return bool(self.extend_script(keys=[lock_key, held_key], args=[token, timeout * 1000]))
 
     def exists(self, task_identifier: str, timeout: int) -> bool:
         """Check if lock exists and is valid.
@@ -50,3 +260,230 @@ class LockBackendRedis(LockBackend):
         _ = timeout
         redis_key = self.CELERY_LOCK.format(task_id=task_identifier)
         return self.redis_client.exists(redis_key) == 1
+
+    def get_owner(self, task_identifier: str, timeout: int) -> str | None:
+        """Return owner token of valid lock, the lock value.
+
+        :param task_identifier: task identifier
+        :param timeout: lock timeout
+        :return: owner token, None when lock does not exist
+        """
+        _ = timeout
+        owner = cast("bytes | None", self.redis_client.get(self.CELERY_LOCK.format(task_id=task_identifier)))
+        return None if owner is None else owner.decode()
+
+    def acquire_slot(self, task_identifier: str, limit: int, timeout: int, token: str) -> str | None:
+        """Acquire semaphore slot with one script call, expired holders are removed first.
+
+        :param task_identifier: task identifier
+        :param limit: max concurrent holders
+        :param timeout: slot timeout
+        :param token: owner token
+        :return: task identifier of semaphore, None when all slots are held
+        """
+        redis_key = self.CELERY_SEMAPHORE.format(task_id=task_identifier)
+        if self.acquire_slot_script(keys=[redis_key], args=[limit, token, timeout * 1000]):
+            return task_identifier
+        return None
+
+    def release_slot(self, slot: str, token: str) -> None:
+        """Release semaphore slot and notify waiters.
+
+        :param slot: slot returned by acquire_slot
+        :param token: owner token
+        :return: None
+        """
+        redis_keys = [self.CELERY_SEMAPHORE.format(task_id=slot), self.CELERY_LOCK_RELEASED.format(task_id=slot)]
+        self.release_slot_script(keys=redis_keys, args=[token, self.RELEASED_TTL])
+
+    def extend_slot(self, slot: str, timeout: int, token: str) -> bool:
+        """Reset semaphore slot timeout when slot is held by owner.
+
+        :param slot: slot returned by acquire_slot
+        :param timeout: new slot timeout
+        :param token: owner token
+        :return: bool, False when slot is not held by owner anymore
+        """
+        redis_key = self.CELERY_SEMAPHORE.format(task_id=slot)
+        return bool(self.extend_slot_script(keys=[redis_key], args=[token, timeout * 1000]))
+
+    def rate_limit(self, key: str, interval: float, burst: int) -> float:
+        """Take one call of GCRA rate limit with one script call, clock of redis server is used.
+
+        :param key: rate limit key
+        :param interval: seconds between calls at the limit
+        :param burst: calls allowed at once
+        :return: seconds until the call is allowed, 0.0 when it is allowed now and was counted
+        """
+        redis_key = self.CELERY_RATE_LIMIT.format(key=key)
+        wait = self.rate_limit_script(keys=[redis_key], args=[max(round(interval * 1000000), 1), burst])
+        return int(wait) / 1000000
+
+    def cache_get(self, key: str) -> bytes | None:
+        """Return cached value.
+
+        :param key: cache key
+        :return: value, None when it is not cached or expired
+        """
+        return cast("bytes | None", self.redis_client.get(self.CELERY_CACHE.format(key=key)))
+
+    def cache_set(self, key: str, value: bytes, ttl: int) -> None:
+        """Cache value, redis expires it and evicts it by its maxmemory-policy.
+
+        :param key: cache key
+        :param value: value
+        :param ttl: seconds until value expires
+        :return: None
+        """
+        self.redis_client.set(self.CELERY_CACHE.format(key=key), value, px=max(ttl * 1000, 1))
+
+    def acquire_many(self, task_identifiers: Sequence[str], timeout: int, token: str | None = None) -> dict[str, bool]:
+        """Acquire many locks in one pipeline of script calls.
+
+        :param task_identifiers: task identifiers
+        :param timeout: lock timeout, lock never expires when 0
+        :param token: owner token
+        :return: dict task identifier: acquired
+        """
+        pipeline = self.redis_client.pipeline(transaction=False)
+        for task_identifier in task_identifiers:
+            lock_key, _, held_key = self.lock_keys(task_identifier)
+            self.acquire_script(keys=[lock_key, held_key], args=[token or uuid.uuid4().hex, timeout * 1000], client=pipeline)
+        return {
+            task_identifier: self.acquired(task_identifier, result)
+            for task_identifier, result in zip(task_identifiers, pipeline.execute(), strict=True)
+        }
+
+    def release_many(self, task_identifiers: Sequence[str], token: str | None = None) -> None:
+        """Release many locks with one script call.
+
+        :param task_identifiers: task identifiers
+        :param token: owner token, locks are removed only when held by this owner, regardless of owner when None
+        :return: None
+        """
+        if not task_identifiers:
+            return
+        redis_keys = [self.CELERY_LOCK.format(task_id=task_identifier) for task_identifier in task_identifiers]
+        redis_keys += [self.CELERY_LOCK_RELEASED.format(task_id=task_identifier) for task_identifier in task_identifiers]
+        redis_keys += [self.CELERY_LOCK_HELD.format(task_id=task_identifier) for task_identifier in task_identifiers]
+        self.release_many_script(keys=redis_keys, args=[token or "", self.RELEASED_TTL])
+
+    def exists_many(self, task_identifiers: Sequence[str], timeout: int) -> dict[str, bool]:
+        """Check if locks exist with one MGET.
+
+        :param task_identifiers: task identifiers
+        :param timeout: lock timeout
+        :return: dict task identifier: exists
+        """
+        _ = timeout
+        if not task_identifiers:
+            return {}
+        values = self.redis_client.mget([self.CELERY_LOCK.format(task_id=task_identifier) for task_identifier in task_identifiers])
+        return {task_identifier: value is not None for task_identifier, value in zip(task_identifiers, values, strict=True)}
+
+
+    def iter_locks(self, prefix: str = "", timeout: int | None = None, batch_size: int = 1000) -> Iterator[LockInfo]:
+        """Iterate locks with SCAN, TTLs of every batch are read in one pipeline.
+
+        :param prefix: task identifier prefix
+        :param timeout: not used, redis stores expiry
+        :param batch_size: SCAN count hint and pipeline size
+        :return: iterator of locks, age is unknown
+        """
+        _ = timeout
+        key_prefix = self.CELERY_LOCK.format(task_id="")
+        match = key_prefix + re.sub(r"([*?\[\]\\])", r"\\\1", prefix) + "*"
+        keys: list[bytes] = []
+        for key in self.redis_client.scan_iter(match=match, count=batch_size):
+            keys.append(key)
+            if len(keys) >= batch_size:
+                yield from self.lock_infos(keys, key_prefix)
+                keys = []
+        yield from self.lock_infos(keys, key_prefix)
+
+    def lock_infos(self, keys: list[bytes], key_prefix: str) -> Iterator[LockInfo]:
+        """Read TTLs and owners of lock keys in one pipeline.
+
+        :param keys: lock keys
+        :param key_prefix: lock key prefix
+        :return: iterator of locks still existing
+        """
+        if not keys:
+            return
+        pipeline = self.redis_client.pipeline(transaction=False)
+        for key in keys:
+            pipeline.pttl(key)
+            pipeline.get(key)
+        results = pipeline.execute()
+        for key, pttl, owner in zip(keys, results[::2], results[1::2], strict=True):
+            if pttl == -2 or owner is None:  # noqa: PLR2004, deleted meanwhile
+                continue
+            task_identifier = key.decode().removeprefix(key_prefix)
+            yield LockInfo(task_identifier, None, pttl / 1000 if pttl >= 0 else None, owner.decode())
+
+class AsyncLockBackendRedis(AsyncLockBackend):
+    """Asyncio lock backend implemented on redis.asyncio, keys and scripts are the same as in LockBackendRedis."""
+
+    def __init__(self, task_lock_backend_uri: str) -> None:
+        """AsyncLockBackendRedis constructor.
+
+        :param task_lock_backend_uri: URI
+        """
+        super().__init__(task_lock_backend_uri)
+        self.redis_client = redis.asyncio.StrictRedis.from_url(LockBackendRedis.client_url(task_lock_backend_uri))
+        self.acquire_script = self.redis_client.register_script(LockBackendRedis.ACQUIRE_SCRIPT)
+        self.release_script = self.redis_client.register_script(LockBackendRedis.RELEASE_SCRIPT)
+        self.extend_script = self.redis_client.register_script(LockBackendRedis.EXTEND_SCRIPT)
+
+    async def acquire(self, task_identifier: str, timeout: int, token: str | None = None) -> bool:
+        """Acquire lock.
+
+        :param task_identifier: task identifier
+        :param timeout: lock timeout, lock never expires when 0
+        :param token: owner token
+        :return: bool
+        """
+        lock_key, _, held_key = LockBackendRedis.lock_keys(task_identifier)
+        result = await self.acquire_script(keys=[lock_key, held_key], args=[token or uuid.uuid4().hex, timeout * 1000])
+        if result == LockBackendRedis.TAKEN_OVER and lock_expired_takeover.receivers:
+            lock_expired_takeover.send(self, task_identifier=task_identifier)
+        return bool(result)
+
+    async def release(self, task_identifier: str, token: str | None = None) -> None:
+        """Release lock and notify waiters.
+
+        :param task_identifier: task identifier
+        :param token: owner token, lock is removed only when held by this owner, regardless of owner when None
+        :return: None
+        """
+        await self.release_script(keys=LockBackendRedis.lock_keys(task_identifier), args=[token or "", LockBackendRedis.RELEASED_TTL])
+
+    async def wait_for_release(self, task_identifier: str, timeout: float) -> None:
+        """Wait on release notification list until lock is released or timeout passed.
+
+        :param task_identifier: task identifier
+        :param timeout: max seconds to wait
+        :return: None
+        """
+        await self.redis_client.blpop([LockBackendRedis.CELERY_LOCK_RELEASED.format(task_id=task_identifier)], timeout=max(timeout, 0.01))
+
+    async def extend(self, task_identifier: str, timeout: int, token: str) -> bool:
+        """Reset lock timeout when lock is held by owner.
+
+        :param task_identifier: task identifier
+        :param timeout: new lock timeout
+        :param token: owner token
+        :return: bool, False when lock is not held by owner anymore
+        """
+        lock_key, _, held_key = LockBackendRedis.lock_keys(task_identifier)
+        return bool(await self.extend_script(keys=[lock_key, held_key], args=[token, timeout * 1000]))
+
+    async def exists(self, task_identifier: str, timeout: int) -> bool:
+        """Check if lock exists and is valid.
+
+        :param task_identifier: task identifier
+        :param timeout: lock timeout
+        :return: bool
+        """
+        _ = timeout
+        return bool(await self.redis_client.exists(LockBackendRedis.CELERY_LOCK.format(task_id=task_identifier)) == 1)
@@ -0,0 +1,82 @@
+"""Flask CLI commands managing task locks, registered by Celery.init_app as flask celery-locks."""
+
+import contextlib
+import itertools
+from collections.abc import Iterator
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+from flask_celery.backends.base import LockBackend
+
+locks_cli = AppGroup("celery-locks", help="Inspect and manage single_instance task locks.")
+
+
+def get_lock_backend() -> LockBackend:
+    """Return lock backend of current app.
+
+    :return: LockBackend
+    """
+    lock_backend: LockBackend = current_app.extensions["celery"].celery.lock_backend
+    return lock_backend
+
+
+@contextlib.contextmanager
+def lock_listing() -> Iterator[None]:
+    """Report lock backend unable to list locks (PostgreSQL advisory locks, shared memory table) as command error.
+
+    :raise click.ClickException: lock backend cannot list locks
+    :return: context manager
+    """
+    try:
+        yield
+    except NotImplementedError as error:
+        raise click.ClickException(str(error) or f"{type(get_lock_backend()).__name__} cannot list locks") from error
+
+
+def format_seconds(seconds: float | None) -> str:
+    """Return seconds rounded for output, - when unknown.
+
+    :param seconds: seconds
+    :return: str
+    """
+    return "-" if seconds is None else f"{seconds:.1f}"
+
+
+@locks_cli.command("list")
+@click.option("--prefix", default="", help="Task identifier prefix, e.g. task name.")
+@click.option("--timeout", type=int, default=None, help="Lock timeout to compute TTL with on backends not storing expiry.")
+@click.option("--older-than", type=float, default=None, help="List only locks older than this many seconds.")
+@click.option("--limit", type=int, default=None, help="Stop after this many locks.")
+def list_locks(prefix: str, timeout: int | None, older_than: float | None, limit: int | None) -> None:
+    """List locks with age and TTL in seconds and owner (task id), streamed as they are fetched."""
+    with lock_listing():
+        locks = get_lock_backend().iter_locks(prefix, timeout)
+        if older_than is not None:
+            locks = (lock for lock in locks if lock.age is not None and lock.age >= older_than)
+        # First lock is fetched before the header, so backend unable to list locks fails without output
+        first = next(locks, None)
+        click.echo("AGE\tTTL\tOWNER\tTASK IDENTIFIER")
+        for lock in itertools.islice(itertools.chain([first] if first else [], locks), limit):
+            click.echo(f"{format_seconds(lock.age)}\t{format_seconds(lock.ttl)}\t{lock.owner or '-'}\t{lock.task_identifier}")
+
+
+@locks_cli.command("count")
+@click.option("--prefix", default="", help="Task identifier prefix, e.g. task name.")
+def count_locks(prefix: str) -> None:
+    """Print number of locks."""
+    with lock_listing():
+        click.echo(get_lock_backend().count_locks(prefix))
+
+
+@locks_cli.command("expire")
+@click.option("--prefix", default="", help="Task identifier prefix, e.g. task name.")
+@click.option("--older-than", type=float, default=None, help="Remove only locks older than this many seconds.")
+@click.option("--batch-size", type=int, default=1000, show_default=True, help="Locks removed per round trip.")
+@click.confirmation_option(prompt="Remove matching locks regardless of running tasks?")
+def expire_locks(prefix: str, older_than: float | None, batch_size: int) -> None:
+    """Remove locks regardless of owner, e.g. left behind by killed workers."""
+    with lock_listing():
+        removed = get_lock_backend().expire_locks(prefix, older_than, batch_size)
+    click.echo(f"Removed {removed} locks.")
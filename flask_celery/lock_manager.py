@@ -1,18 +1,31 @@
 """Lock manager."""
 import hashlib
-from logging import getLogger
+import io
+import os
+import pickle
+import random
+import socket
+import time
+import uuid
+from collections.abc import Callable, Iterable, Iterator
+from functools import cached_property
+from logging import DEBUG, getLogger
+from operator import itemgetter
 from types import TracebackType
+from typing import Any, cast
 from urllib.parse import urlparse
 
 from celery import Task
 
-from flask_celery.backends.base import LockBackend
-from flask_celery.backends.database import LockBackendDb
-from flask_celery.backends.filesystem import LockBackendFilesystem
-from flask_celery.backends.redis import LockBackendRedis
+from flask_celery.backends import load_lock_backend
+from flask_celery.backends.base import AsyncLockBackend, LockBackend
 from flask_celery.exceptions import OtherInstanceError
+from flask_celery.lock_renewer import lock_renewer
+from flask_celery.signals import lock_acquired, lock_contended, lock_released
 from flask_celery.types import CelerySerializable
 
+logger = getLogger(__name__)
+
 
 def select_lock_backend(task_lock_backend: str) -> type[LockBackend]:
     """Detect lock backend on task_lock_backend uri.
@@ -20,26 +33,218 @@ def select_lock_backend(task_lock_backend: str) -> type[LockBackend]:
     :param task_lock_backend: uri
     :return: LockBackend
     """
-    parsed_backend_uri = urlparse(task_lock_backend)
-    scheme = str(parsed_backend_uri.scheme)
+    scheme = urlparse(task_lock_backend).scheme.partition("+")[0]
+    lock_backend_class = load_lock_backend(scheme)
+    if lock_backend_class is None:
+        msg = f"No backend found for {task_lock_backend}"
+        raise NotImplementedError(msg)
+    return lock_backend_class
+
 
-    if scheme.startswith("redis"):
-        return LockBackendRedis
+# Types whose repr is canonical and tells them apart, exact types only, subclasses are tagged with their name
+CANONICAL_SCALARS = frozenset({str, int, float, bool, bytes, type(None)})
+STR_TYPE = frozenset({str})
+# Sequences of scalars from this length are pickled and hashed, many times faster than repr of every item
+PICKLE_MIN_ITEMS = 64
 
-    if scheme.startswith(("sqla+", "db+", "mysql", "postgresql", "sqlite")):
-        return LockBackendDb
 
-    if scheme.startswith("file"):
-        return LockBackendFilesystem
+def pickle_digest(value: object) -> str:
+    """Return hash of value pickled without memo, so equal values pickle the same whether their items are shared or not.
 
-    msg = f"No backend found for {task_lock_backend}"
-    raise NotImplementedError(msg)
+    :param value: value to hash
+    :return: hex digest
+    """
+    buffer = io.BytesIO()
+    pickler = pickle.Pickler(buffer, protocol=5)
+    pickler.fast = True
+    pickler.dump(value)
+    return hashlib.blake2b(buffer.getbuffer(), digest_size=16).hexdigest()
 
 
-class LockManager:
-    """Lock manager."""
+def canonical_encode(value: object) -> str:
+    """Encode value to repr-like string, equal only for equal values of equal types.
+
+    Scalars keep their repr, so int and str keys, tuple and list and 1, True and 1.0 stay apart. Lists and tuples of
+    scalars are encoded at C speed, by one repr call or pickled and hashed when long, only nested containers are
+    walked. Dict items and set members are sorted, so the result does not depend on insertion order or hash seed.
+    Other objects are encoded by repr tagged with their type name.
+
+    :param value: value to encode
+    :return: canonical encoding
+    """
+    value_type = type(value)
+    if value_type in CANONICAL_SCALARS:
+        return repr(value)
+    if value_type is list or value_type is tuple:
+        sequence = cast("list[object] | tuple[object, ...]", value)
+        if CANONICAL_SCALARS.issuperset(map(type, sequence)):
+            if len(sequence) < PICKLE_MIN_ITEMS:
+                return repr(sequence)
+            return f"{value_type.__name__}<{pickle_digest(sequence)}>"
+        items = ", ".join(map(canonical_encode, sequence))
+        if value_type is list:
+            return f"[{items}]"
+        return f"({items},)" if len(sequence) == 1 else f"({items})"
+    if value_type is dict:
+        mapping = cast("dict[Any, object]", value)
+        if STR_TYPE.issuperset(map(type, mapping)) and CANONICAL_SCALARS.issuperset(map(type, mapping.values())):
+            return repr(dict(sorted(mapping.items(), key=itemgetter(0))))
+        encoded = sorted(((canonical_encode(key), item) for key, item in mapping.items()), key=itemgetter(0))
+        return f"{{{', '.join(f'{key}: {canonical_encode(item)}' for key, item in encoded)}}}"
+    if value_type is set or value_type is frozenset:
+        members = ", ".join(sorted(map(canonical_encode, cast("set[object] | frozenset[object]", value))))
+        return f"{value_type.__name__}({{{members}}})"
+    return f"{value_type.__qualname__}:{value!r}"
+
+
+def default_token(celery_self: Task) -> str:
+    """Return owner token of lock acquired without one, the id of running task so listed locks point to it.
+
+    :param celery_self: task the lock belongs to
+    :return: task id, hostname:pid:unique id when the task is called directly
+    """
+    return celery_self.request.id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex}"
+
+
+class BaseLockManager:
+    """Identifier, logging, backoff and signals shared by LockManager and AsyncLockManager."""
+
+    # Shared by all managers, identifier is passed in record extra as task_identifier
+    log = logger
+    # Seconds, first and max delay between acquire attempts when waiting for lock
+    BACKOFF_BASE = 0.05
+    BACKOFF_MAX = 2.0
 
     def __init__(
+            self,
+            celery_self: Task,
+            timeout: int,
+            args: tuple[CelerySerializable, ...],
+            kwargs: dict[str, CelerySerializable],
+            *,
+            include_args: bool,
+            key_func: Callable[..., CelerySerializable] | None,
+            wait_timeout: float | None,
+            token: str | None,
+    ) -> None:
+        """Set attributes shared by lock managers, parameters are documented by LockManager."""
+        self.celery_self = celery_self
+        self.timeout = timeout
+        self.include_args = include_args
+        self.key_func = key_func
+        self.wait_timeout = wait_timeout
+        self.args = args
+        self.kwargs = kwargs
+        self.token = token or default_token(celery_self)
+        self.acquired_at = 0.0
+
+    @staticmethod
+    def make_task_identifier(
+            task_name: str,
+            args: tuple[CelerySerializable, ...],
+            kwargs: dict[str, CelerySerializable],
+            *,
+            include_args: bool,
+            key_func: Callable[..., CelerySerializable] | None = None,
+    ) -> str:
+        """Return the unique identifier (string) of a task called with args and kwargs.
+
+        Arguments are encoded by canonical_encode, so the identifier does not depend on keyword or nested dict order,
+        and hashed by blake2b.
+
+        :param task_name: task name
+        :param args: task args
+        :param kwargs: task kwargs
+        :param include_args: If arguments are part of the identifier.
+        :param key_func: Called with args and kwargs, returns the part of arguments used instead of all of them.
+        :return: task identifier
+        """
+        if key_func is not None:
+            payload: object = key_func(*args, **kwargs)
+        elif include_args:
+            payload = (tuple(args), kwargs)
+        else:
+            return task_name
+
+        args_hash = hashlib.blake2b(canonical_encode(payload).encode("utf-8"), digest_size=16).hexdigest()
+        return f"{task_name}.args.{args_hash}"
+
+    @cached_property
+    def task_identifier(self) -> str:
+        """Return the unique identifier (string) of a task instance, computed once."""
+        return self.make_task_identifier(
+            self.celery_self.name,
+            self.args,
+            self.kwargs,
+            include_args=self.include_args,
+            key_func=self.key_func,
+        )
+
+    def debug(self, msg: str, *args: object) -> None:
+        """Log debug message with task identifier, formatting is skipped when debug logging is disabled.
+
+        :param msg: message, task identifier is the first format argument
+        :param args: other format arguments
+        """
+        if self.log.isEnabledFor(DEBUG):
+            self.log.debug(msg, self.task_identifier, *args, extra={"task_identifier": self.task_identifier})
+
+    def backoff_delays(self) -> Iterator[float]:
+        """Yield waits between acquire attempts until wait_timeout passes, exponential backoff with jitter.
+
+        :return: iterator of seconds, the last one capped by time left
+        """
+        deadline = time.monotonic() + (self.wait_timeout or 0)
+        attempt = 0
+        while (remaining := deadline - time.monotonic()) > 0:
+            delay = min(self.BACKOFF_MAX, self.BACKOFF_BASE * 2 ** attempt)
+            delay = delay / 2 + random.uniform(0, delay / 2)  # noqa: S311
+            self.debug("Key %s | Waiting %.3fs for release.", delay)
+            yield min(delay, remaining)
+            attempt += 1
+
+    def contended(self, started_at: float) -> None:
+        """Log and signal lock held by another instance.
+
+        :param started_at: perf_counter when acquiring started
+        """
+        self.debug("Key %s | Another instance is running.")
+        if lock_contended.receivers:
+            lock_contended.send(
+                self, task_name=self.celery_self.name, task_identifier=self.task_identifier,
+                duration=time.perf_counter() - started_at,
+            )
+
+    def acquired(self, started_at: float) -> None:
+        """Log and signal acquired lock.
+
+        :param started_at: perf_counter when acquiring started
+        """
+        self.acquired_at = time.perf_counter()
+        self.debug("Key %s | Got lock, running.")
+        if lock_acquired.receivers:
+            lock_acquired.send(
+                self, task_name=self.celery_self.name, task_identifier=self.task_identifier,
+                duration=self.acquired_at - started_at,
+            )
+
+    def released(self, started_at: float) -> None:
+        """Signal released lock.
+
+        :param started_at: perf_counter when releasing started
+        """
+        if lock_released.receivers:
+            released_at = time.perf_counter()
+            lock_released.send(
+                self, task_name=self.celery_self.name, task_identifier=self.task_identifier,
+                duration=released_at - started_at, held=released_at - self.acquired_at,
+            )
+
+
+class LockManager(BaseLockManager):
+    """Lock manager."""
+
+    def __init__(  # noqa: PLR0913
             self,
             lock_backend: LockBackend,
             celery_self: Task,  # @TODO RENAME
@@ -48,6 +253,13 @@ class LockManager:
             kwargs: dict[str, CelerySerializable],
             *,
             include_args: bool,
+            renew: bool = False,
+            key_func: Callable[..., CelerySerializable] | None = None,
+            wait_timeout: float | None = None,
+            token: str | None = None,
+            reserved: bool = False,
+            task_identifier: str | None = None,
+            max_instances: int = 1,
     ) -> None:
         """Lock manager constructor.
 
@@ -57,42 +269,100 @@ class LockManager:
         :param bool include_args: If single instance should take arguments into account.
         :param iter args: The task instance's args.
         :param dict kwargs: The task instance's kwargs.
+        :param bool renew: Treat timeout as a short lease renewed in background while the lock is held.
+        :param key_func: Called with task args and kwargs, returns the part of arguments identifying the task instance.
+        :param float wait_timeout: Wait up to this many seconds for the lock to be released instead of failing at once.
+        :param str token: Owner token, defaults to the task id (see default_token).
+        :param bool reserved: Lock was reserved by token when the task was enqueued, it is taken over instead of acquired.
+        :param str task_identifier: Precomputed identifier, computed from task name and arguments when not set.
+        :param int max_instances: Allow this many concurrent holders, counting semaphore slot is acquired when over 1.
+
+        Backends storing owner release only locks held by the token, identifiers of managers sharing it differ.
         """
+        super().__init__(
+            celery_self, timeout, args, kwargs,
+            include_args=include_args, key_func=key_func, wait_timeout=wait_timeout, token=token,
+        )
         self.lock_backend = lock_backend
-        self.celery_self = celery_self
-        self.timeout = timeout
-        self.include_args = include_args
-        self.args = args
-        self.kwargs = kwargs
-        self.log = getLogger(f"{self.__class__.__name__}:{self.task_identifier}")
+        self.renew = renew
+        self.reserved = reserved
+        self.max_instances = max_instances
+        self.slot: str | None = None
+        if task_identifier is not None:
+            # Takes precedence over cached_property
+            self.task_identifier = task_identifier
 
-    @property
-    def task_identifier(self) -> str:
-        """Return the unique identifier (string) of a task instance."""
-        task_id: str = self.celery_self.name
-        if self.include_args:
-            merged_args = str(self.args) + str([(k, self.kwargs[k]) for k in sorted(self.kwargs)])
-            args_hash = hashlib.md5(merged_args.encode("utf-8"), usedforsecurity=False).hexdigest()
-            task_id += f".args.{args_hash}"
-        return task_id
+    def acquire(self) -> bool:
+        """Acquire lock, wait with exponential backoff and jitter when wait_timeout is set.
+
+        Between attempts the backend blocks in wait_for_release, backends with release notifications wake up as soon as
+        the lock is released.
+
+        :return: bool
+        """
+        if self.reserved and self.lock_backend.extend(self.task_identifier, self.timeout, self.token):
+            self.debug("Key %s | Took over lock reserved at enqueue.")
+            return True
+        if self.try_acquire():
+            return True
+        for delay in self.backoff_delays():
+            self.lock_backend.wait_for_release(self.task_identifier, delay)
+            if self.try_acquire():
+                return True
+        return False
+
+    def try_acquire(self) -> bool:
+        """Acquire lock, or one of semaphore slots when max_instances is over 1, without waiting.
+
+        :return: bool
+        """
+        if self.max_instances == 1:
+            return self.lock_backend.acquire(self.task_identifier, self.timeout, self.token)
+        self.slot = self.lock_backend.acquire_slot(self.task_identifier, self.max_instances, self.timeout, self.token)
+        return self.slot is not None
+
+    def reserve(self) -> bool:
+        """Acquire lock when task is enqueued, the token has to be the task id so the worker can take the lock over.
+
+        :return: bool, False when another instance is queued or running
+        """
+        reserved = self.lock_backend.acquire(self.task_identifier, self.timeout, self.token)
+        self.debug("Key %s | Reserved at enqueue: %s.", reserved)
+        return reserved
 
     def __enter__(self) -> None:
         """Acquire lock if possible."""
-        self.log.debug("Timeout %ds | Key %s", self.timeout, self.task_identifier)
-        if not self.lock_backend.acquire(self.task_identifier, self.timeout):
-            self.log.debug("Another instance is running.")
-            msg = f"Failed to acquire lock, {self.task_identifier} already running."
+        self.debug("Key %s | Timeout %ds", self.timeout)
+        started_at = time.perf_counter()
+        if not self.acquire():
+            self.contended(started_at)
+            if self.max_instances == 1:
+                msg = f"Failed to acquire lock, {self.task_identifier} already running."
+            else:
+                msg = f"Failed to acquire lock, {self.max_instances} instances of {self.task_identifier} already running."
             raise OtherInstanceError(msg)
 
-        self.log.debug("Got lock, running.")
+        if self.renew:
+            if self.slot is None:
+                lock_renewer.register(self.lock_backend, self.task_identifier, self.token, self.timeout)
+            else:
+                lock_renewer.register(self.lock_backend, self.slot, self.token, self.timeout, slot=True)
+        self.acquired(started_at)
 
     def __exit__(self, exc_type: type[BaseException] | None, _value: BaseException | None, _traceback: TracebackType | None) -> bool | None:
         """Release lock."""
         if exc_type == OtherInstanceError:
             # Failed to get lock last time, not releasing.
             return None
-        self.log.debug("Releasing lock.")
-        self.lock_backend.release(self.task_identifier)
+        if self.renew:
+            lock_renewer.unregister(self.token, self.task_identifier if self.slot is None else self.slot)
+        self.debug("Key %s | Releasing lock.")
+        started_at = time.perf_counter()
+        if self.slot is None:
+            self.lock_backend.release(self.task_identifier, self.token)
+        else:
+            self.lock_backend.release_slot(self.slot, self.token)
+        self.released(started_at)
         return None
 
     @property
@@ -103,3 +373,105 @@ class LockManager:
     def reset_lock(self) -> None:
         """Remove the lock regardless of timeout."""
         self.lock_backend.release(self.task_identifier)
+
+    @classmethod
+    def is_already_running_many(
+            cls,
+            lock_backend: LockBackend,
+            tasks: Iterable[tuple[Task, tuple[CelerySerializable, ...], dict[str, CelerySerializable]]],
+            timeout: int,
+            *,
+            include_args: bool,
+            key_func: Callable[..., CelerySerializable] | None = None,
+    ) -> list[bool]:
+        """Check many task instances with one backend round trip.
+
+        :param lock_backend: lock backend
+        :param tasks: (task, args, kwargs) tuples
+        :param timeout: Lock's timeout value in seconds.
+        :param include_args: If single instance takes arguments into account.
+        :param key_func: Called with task args and kwargs, returns the part of arguments identifying the task instance.
+        :return: list of bools in the order of tasks, True if lock exists and has not timed out
+        """
+        task_identifiers = [
+            cls.make_task_identifier(task.name, args, kwargs, include_args=include_args, key_func=key_func)
+            for task, args, kwargs in tasks
+        ]
+        running = lock_backend.exists_many(task_identifiers, timeout)
+        return [running[task_identifier] for task_identifier in task_identifiers]
+
+
+class AsyncLockManager(BaseLockManager):
+    """Asyncio lock manager for async views and producers, same identifiers and locks as LockManager.
+
+    Leases are not renewed, locks of long running coroutines need timeout long enough for the whole run.
+    """
+
+    def __init__(
+            self,
+            lock_backend: AsyncLockBackend,
+            celery_self: Task,
+            timeout: int,
+            args: tuple[CelerySerializable, ...],
+            kwargs: dict[str, CelerySerializable],
+            *,
+            include_args: bool,
+            key_func: Callable[..., CelerySerializable] | None = None,
+            wait_timeout: float | None = None,
+    ) -> None:
+        """Async lock manager constructor.
+
+        :param lock_backend: asyncio lock backend, e.g. Celery.async_lock_backend
+        :param celery_self: task the lock belongs to
+        :param int timeout: Lock's timeout value in seconds.
+        :param iter args: The task instance's args.
+        :param dict kwargs: The task instance's kwargs.
+        :param bool include_args: If single instance should take arguments into account.
+        :param key_func: Called with task args and kwargs, returns the part of arguments identifying the task instance.
+        :param float wait_timeout: Wait up to this many seconds for the lock to be released instead of failing at once.
+        """
+        super().__init__(
+            celery_self, timeout, args, kwargs, include_args=include_args, key_func=key_func, wait_timeout=wait_timeout, token=None,
+        )
+        self.lock_backend = lock_backend
+
+    async def acquire(self) -> bool:
+        """Acquire lock, wait with exponential backoff and jitter when wait_timeout is set.
+
+        :return: bool
+        """
+        if await self.lock_backend.acquire(self.task_identifier, self.timeout, self.token):
+            return True
+        for delay in self.backoff_delays():
+            await self.lock_backend.wait_for_release(self.task_identifier, delay)
+            if await self.lock_backend.acquire(self.task_identifier, self.timeout, self.token):
+                return True
+        return False
+
+    async def __aenter__(self) -> None:
+        """Acquire lock if possible."""
+        self.debug("Key %s | Timeout %ds", self.timeout)
+        started_at = time.perf_counter()
+        if not await self.acquire():
+            self.contended(started_at)
+            msg = f"Failed to acquire lock, {self.task_identifier} already running."
+            raise OtherInstanceError(msg)
+        self.acquired(started_at)
+
+    async def __aexit__(self, exc_type: type[BaseException] | None, _value: BaseException | None, _traceback: TracebackType | None) -> None:
+        """Release lock."""
+        if exc_type == OtherInstanceError:
+            # Failed to get lock last time, not releasing.
+            return
+        self.debug("Key %s | Releasing lock.")
+        started_at = time.perf_counter()
+        await self.lock_backend.release(self.task_identifier, self.token)
+        self.released(started_at)
+
+    async def is_already_running(self) -> bool:
+        """Return True if lock exists and has not timed out."""
+        return await self.lock_backend.exists(self.task_identifier, self.timeout)
+
+    async def reset_lock(self) -> None:
+        """Remove the lock regardless of timeout."""
+        await self.lock_backend.release(self.task_identifier)
@@ -0,0 +1,87 @@
+"""Expired lock reaping."""
+
+import threading
+from functools import partial
+from logging import getLogger
+
+from flask_celery.backends.base import LockBackend
+
+
+class LockReaper:
+    """Remove expired locks and cache entries of database and filesystem backends from a daemon thread.
+
+    These backends overwrite expired lock only when the same task identifier is acquired again, so with include_args
+    locks of arguments never seen again pile up, so do memoized results. Every sweep removes batches of batch_size locks
+    with pause between them until no expired lock is left, then does the same with cache entries and waits interval
+    seconds for next sweep.
+    """
+
+    def __init__(
+            self,
+            lock_backend: LockBackend,
+            max_age: int,
+            batch_size: int = 500,
+            interval: float = 60,
+            pause: float = 0.1,
+    ) -> None:
+        """LockReaper constructor.
+
+        :param lock_backend: lock backend
+        :param max_age: age in seconds after which lock is expired, at least the longest lock timeout in use
+        :param batch_size: max locks removed per batch
+        :param interval: seconds between sweeps
+        :param pause: seconds between batches of one sweep, keeps reaping from competing with acquires
+        """
+        self.log = getLogger(self.__class__.__name__)
+        self.lock_backend = lock_backend
+        self.max_age = max_age
+        self.batch_size = batch_size
+        self.interval = interval
+        self.pause = pause
+        self.stopped = threading.Event()
+        self.thread: threading.Thread | None = None
+
+    def sweep(self) -> int:
+        """Remove all expired locks and cache entries, batch by batch.
+
+        :return: number of removed locks and cache entries
+        """
+        removed = 0
+        for purge in (partial(self.lock_backend.purge_expired, self.max_age), self.lock_backend.purge_cache):
+            while not self.stopped.is_set():
+                batch_removed = purge(self.batch_size)
+                removed += batch_removed
+                if batch_removed < self.batch_size:
+                    break
+                self.stopped.wait(self.pause)
+        return removed
+
+    def run(self) -> None:
+        """Sweep every interval until stopped."""
+        while not self.stopped.is_set():
+            try:
+                removed = self.sweep()
+            except Exception:
+                self.log.exception("Failed to remove expired locks, retrying in %ss.", self.interval)
+            else:
+                self.log.debug("Removed %d expired locks and cache entries.", removed)
+            self.stopped.wait(self.interval)
+
+    def start(self) -> None:
+        """Start reaper thread, nothing when it is running already."""
+        if self.thread is not None and self.thread.is_alive():
+            return
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self.run, name=self.__class__.__name__, daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        """Stop reaper thread.
+
+        :param timeout: seconds to wait for running batch to finish
+        :return: None
+        """
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join(timeout)
+            self.thread = None
@@ -0,0 +1,116 @@
+"""Lock lease renewal."""
+
+import os
+import threading
+import time
+from dataclasses import dataclass
+from logging import getLogger
+
+from flask_celery.backends.base import LockBackend
+
+
+@dataclass
+class Lease:
+    """Lock held by running task with short timeout renewed in background."""
+
+    lock_backend: LockBackend
+    task_identifier: str
+    token: str
+    timeout: int
+    renew_at: float
+    slot: bool = False  # task_identifier is semaphore slot
+
+
+class LockRenewer:
+    """Renew leases of all locks held in this process from one shared daemon thread.
+
+    Every lease is renewed after a third of its timeout passed, so a healthy task keeps its lock while lock of crashed
+    worker expires within the lease timeout.
+    """
+
+    RENEW_FRACTION = 3
+
+    def __init__(self) -> None:
+        """LockRenewer constructor."""
+        self.log = getLogger(self.__class__.__name__)
+        self.leases: dict[tuple[str, str], Lease] = {}  # (owner token, task identifier): lease
+        self.condition = threading.Condition()
+        self.thread: threading.Thread | None = None
+
+    def register(self, lock_backend: LockBackend, task_identifier: str, token: str, timeout: int, *, slot: bool = False) -> None:
+        """Start renewing lease of acquired lock.
+
+        :param lock_backend: lock backend holding the lock
+        :param task_identifier: task identifier, or slot returned by acquire_slot
+        :param token: owner token
+        :param timeout: lease timeout in seconds
+        :param slot: lock is semaphore slot
+        :return: None
+        """
+        lease = Lease(lock_backend, task_identifier, token, timeout, time.monotonic() + timeout / self.RENEW_FRACTION, slot)
+        with self.condition:
+            self.leases[token, task_identifier] = lease
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self.run, name=self.__class__.__name__, daemon=True)
+                self.thread.start()
+            self.condition.notify()
+
+    def unregister(self, token: str, task_identifier: str) -> None:
+        """Stop renewing lease.
+
+        :param token: owner token
+        :param task_identifier: task identifier, or slot returned by acquire_slot
+        :return: None
+        """
+        with self.condition:
+            self.leases.pop((token, task_identifier), None)
+
+    def run(self) -> None:
+        """Renew due leases, sleep until next one is due."""
+        while True:
+            with self.condition:
+                now = time.monotonic()
+                due = [lease for lease in self.leases.values() if lease.renew_at <= now]
+                if not due:
+                    next_renewal = min((lease.renew_at for lease in self.leases.values()), default=None)
+                    self.condition.wait(None if next_renewal is None else next_renewal - now)
+                    continue
+
+            for lease in due:
+                self.renew(lease)
+
+    def renew(self, lease: Lease) -> None:
+        """Renew one lease, forget it when lock was lost.
+
+        :param lease: lease to renew
+        :return: None
+        """
+        try:
+            if lease.slot:
+                renewed = lease.lock_backend.extend_slot(lease.task_identifier, lease.timeout, lease.token)
+            else:
+                renewed = lease.lock_backend.extend(lease.task_identifier, lease.timeout, lease.token)
+        except Exception:
+            self.log.exception("Failed to renew lock %s, retrying.", lease.task_identifier)
+            renewed = True
+
+        with self.condition:
+            if (lease.token, lease.task_identifier) not in self.leases:
+                return
+            if renewed:
+                lease.renew_at = time.monotonic() + lease.timeout / self.RENEW_FRACTION
+            else:
+                self.log.warning("Lock %s was lost, not renewing.", lease.task_identifier)
+                del self.leases[lease.token, lease.task_identifier]
+
+    def reset(self) -> None:
+        """Forget all leases and thread, used in forked child which does not hold any lock of its parent."""
+        self.leases = {}
+        self.condition = threading.Condition()
+        self.thread = None
+
+
+lock_renewer = LockRenewer()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=lock_renewer.reset)
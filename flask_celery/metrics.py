@@ -0,0 +1,173 @@
+"""Lock metrics collectors subscribed to lock signals."""
+
+import bisect
+import threading
+from collections import defaultdict
+from typing import Protocol, Self
+
+from flask_celery.signals import lock_acquired, lock_contended, lock_expired_takeover, lock_released
+
+
+def task_name_of(task_identifier: str) -> str:
+    """Return task name part of task identifier.
+
+    :param task_identifier: task identifier
+    :return: task name
+    """
+    return task_identifier.partition(".args.")[0]
+
+
+class LockMetrics:
+    """Base collector, counts lock events and observes latencies per task name.
+
+    Counters: acquired, contended, released, expired_takeover. Latencies in seconds: acquire, contended (time spent
+    before giving up), release, held.
+    """
+
+    def connect(self) -> Self:
+        """Subscribe to lock signals.
+
+        :return: self
+        """
+        lock_acquired.connect(self.on_acquired, weak=False)
+        lock_contended.connect(self.on_contended, weak=False)
+        lock_released.connect(self.on_released, weak=False)
+        lock_expired_takeover.connect(self.on_expired_takeover, weak=False)
+        return self
+
+    def disconnect(self) -> None:
+        """Unsubscribe from lock signals, instrumentation is free again when no other collector is connected."""
+        lock_acquired.disconnect(self.on_acquired)
+        lock_contended.disconnect(self.on_contended)
+        lock_released.disconnect(self.on_released)
+        lock_expired_takeover.disconnect(self.on_expired_takeover)
+
+    def count(self, name: str, task_name: str) -> None:
+        """Increment counter.
+
+        :param name: counter name
+        :param task_name: task name
+        """
+        raise NotImplementedError
+
+    def observe(self, name: str, task_name: str, seconds: float) -> None:
+        """Observe latency.
+
+        :param name: latency name
+        :param task_name: task name
+        :param seconds: latency in seconds
+        """
+        raise NotImplementedError
+
+    def on_acquired(self, _sender: object, *, task_name: str, duration: float, **_kwargs: object) -> None:
+        """Handle lock_acquired."""
+        self.count("acquired", task_name)
+        self.observe("acquire", task_name, duration)
+
+    def on_contended(self, _sender: object, *, task_name: str, duration: float, **_kwargs: object) -> None:
+        """Handle lock_contended."""
+        self.count("contended", task_name)
+        self.observe("contended", task_name, duration)
+
+    def on_released(self, _sender: object, *, task_name: str, duration: float, held: float, **_kwargs: object) -> None:
+        """Handle lock_released."""
+        self.count("released", task_name)
+        self.observe("release", task_name, duration)
+        self.observe("held", task_name, held)
+
+    def on_expired_takeover(self, _sender: object, *, task_identifier: str, **_kwargs: object) -> None:
+        """Handle lock_expired_takeover."""
+        self.count("expired_takeover", task_name_of(task_identifier))
+
+
+class PrometheusLockMetrics(LockMetrics):
+    """Collector keeping counters and latency histograms in memory, rendered in Prometheus text exposition format."""
+
+    BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 60.0, 300.0, 3600.0)
+
+    def __init__(self, prefix: str = "flask_celery_lock") -> None:
+        """PrometheusLockMetrics constructor.
+
+        :param prefix: metric name prefix
+        """
+        self.prefix = prefix
+        self.lock = threading.Lock()
+        self.counters: dict[tuple[str, str], int] = defaultdict(int)
+        # name, task name: per bucket counts (last one is +Inf), sum
+        self.histograms: dict[tuple[str, str], tuple[list[int], list[float]]] = {}
+
+    def count(self, name: str, task_name: str) -> None:
+        """Increment counter."""
+        with self.lock:
+            self.counters[name, task_name] += 1
+
+    def observe(self, name: str, task_name: str, seconds: float) -> None:
+        """Observe latency."""
+        with self.lock:
+            histogram = self.histograms.get((name, task_name))
+            if histogram is None:
+                histogram = self.histograms[name, task_name] = ([0] * (len(self.BUCKETS) + 1), [0.0])
+            histogram[0][bisect.bisect_left(self.BUCKETS, seconds)] += 1
+            histogram[1][0] += seconds
+
+    def render(self) -> str:
+        """Return metrics in Prometheus text exposition format.
+
+        :return: str
+        """
+        lines = []
+        with self.lock:
+            counters = sorted(self.counters.items())
+            histograms = sorted((key, (list(counts), total[0])) for key, (counts, total) in self.histograms.items())
+
+        for name in sorted({name for (name, _), _ in counters}):
+            lines.append(f"# TYPE {self.prefix}_{name}_total counter")
+            lines.extend(
+                f'{self.prefix}_{name}_total{{task="{task_name}"}} {value}'
+                for (counter_name, task_name), value in counters if counter_name == name
+            )
+
+        for name in sorted({name for (name, _), _ in histograms}):
+            metric = f"{self.prefix}_{name}_seconds"
+            lines.append(f"# TYPE {metric} histogram")
+            for (histogram_name, task_name), (counts, total) in histograms:
+                if histogram_name != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip((*self.BUCKETS, "+Inf"), counts, strict=True):
+                    cumulative += count
+                    lines.append(f'{metric}_bucket{{task="{task_name}",le="{bound}"}} {cumulative}')
+                lines.append(f'{metric}_sum{{task="{task_name}"}} {total}')
+                lines.append(f'{metric}_count{{task="{task_name}"}} {cumulative}')
+        return "\n".join(lines) + "\n"
+
+
+class StatsdClient(Protocol):
+    """Client compatible with statsd package."""
+
+    def incr(self, stat: str, count: int = 1) -> None:
+        """Increment counter."""
+
+    def timing(self, stat: str, delta: float) -> None:
+        """Send timing in milliseconds."""
+
+
+class StatsdLockMetrics(LockMetrics):
+    """Collector forwarding lock events to StatsD, e.g. flask_celery.lock.acquired.my_app.tasks.sync."""
+
+    def __init__(self, client: StatsdClient, prefix: str = "flask_celery.lock") -> None:
+        """StatsdLockMetrics constructor.
+
+        :param client: StatsD client, e.g. statsd.StatsClient
+        :param prefix: stat name prefix
+        """
+        self.client = client
+        self.prefix = prefix
+
+    def count(self, name: str, task_name: str) -> None:
+        """Increment counter."""
+        self.client.incr(f"{self.prefix}.{name}.{task_name}")
+
+    def observe(self, name: str, task_name: str, seconds: float) -> None:
+        """Send timing."""
+        self.client.timing(f"{self.prefix}.{name}.{task_name}", seconds * 1000)
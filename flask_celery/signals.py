@@ -0,0 +1,21 @@
+"""Lock signals.
+
+Receivers get the sender (LockManager, AsyncLockManager or lock backend for lock_expired_takeover) and keyword arguments:
+
+* lock_acquired: task_name, task_identifier, duration (seconds spent acquiring, including waiting)
+* lock_contended: task_name, task_identifier, duration (seconds spent before giving up)
+* lock_released: task_name, task_identifier, duration (seconds spent releasing), held (seconds lock was held)
+* lock_expired_takeover: task_identifier, lock expired instead of being released and was acquired again, sent by
+  every backend except pgadvisory, whose locks do not expire; redis tells it within one more timeout after expiry
+
+Signals are sent only when they have receivers, so instrumentation costs nothing unless it is used.
+"""
+
+from blinker import Namespace
+
+_signals = Namespace()
+
+lock_acquired = _signals.signal("lock-acquired")
+lock_contended = _signals.signal("lock-contended")
+lock_released = _signals.signal("lock-released")
+lock_expired_takeover = _signals.signal("lock-expired-takeover")
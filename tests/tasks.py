@@ -1,8 +1,10 @@
 """Tasks for tests."""
+import time
+
 import flask
 from celery import Task, shared_task
 
-from flask_celery import single_instance
+from flask_celery import is_reserved, memoize, rate_limited, single_instance
 
 
 @shared_task(bind=True)
@@ -50,3 +52,64 @@ def ping() -> str:
 def in_context() -> bool:
     """Test if we are in flask app context."""
     return flask.has_app_context()
+
+
+@shared_task(bind=True)
+@single_instance(lease=1)
+def leased(_cls: Task, seconds: float) -> bool:
+    """Celery task: hold leased lock for a while."""
+    time.sleep(seconds)
+    return bool(leased.app.lock_backend.exists(leased.name, 2))
+
+
+@shared_task(bind=True)
+@single_instance(include_args=True, deduplicate=True)
+def deduplicated(cls: Task, x: int) -> bool:
+    """Celery task: report if it runs with the lock reserved at enqueue."""
+    _ = x
+    return is_reserved(cls)
+
+
+@shared_task(bind=True)
+@single_instance(max_instances=2)
+def limited(_cls: Task, x: int) -> int:
+    """Celery task: run at most twice at once."""
+    return x
+
+
+@shared_task(bind=True)
+@rate_limited(rate="10/s")
+def throttled(_cls: Task, x: int) -> int:
+    """Celery task: start at most ten times a second."""
+    return x
+
+
+memoized_runs: list[int] = []
+
+
+@shared_task(bind=True)
+@memoize(ttl=60)
+def memoized(_cls: Task, x: int) -> dict[str, int]:
+    """Celery task: square slowly, remember the run."""
+    time.sleep(0.3)
+    memoized_runs.append(x)
+    return {"square": x * x}
+
+
+debounced_runs: list[int] = []
+
+
+@shared_task(bind=True)
+@single_instance(include_args=True, debounce=1)
+def debounced(_cls: Task, x: int) -> int:
+    """Celery task: run once a second after the last trigger, remember the run."""
+    debounced_runs.append(x)
+    return x
+
+
+@shared_task(bind=True)
+@single_instance(include_args=True, throttle=1)
+def throttled_window(_cls: Task, x: int) -> float:
+    """Celery task: run at most once a second, return start time."""
+    _ = x
+    return time.time()
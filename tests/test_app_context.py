@@ -0,0 +1,94 @@
+"""Test app context strategies."""
+
+from typing import TYPE_CHECKING
+
+import flask
+import pytest
+from celery import _state
+from celery.signals import worker_process_init
+from flask import Flask
+from flask.globals import app_ctx
+
+from flask_celery import Celery
+
+if TYPE_CHECKING:
+    from celery import Task
+
+
+def create_celery(**config: object) -> tuple[Flask, Celery]:
+    """Return new Flask app and its eager celery."""
+    app = Flask(__name__)
+    app.config.update(
+        CELERY_BROKER_URL="memory://",
+        CELERY_TASK_LOCK_BACKEND="memory://",
+        CELERY_TASK_ALWAYS_EAGER=True,
+        CELERY_TASK_EAGER_PROPAGATES=True,
+        **config,
+    )
+    return app, Celery(app)
+
+
+def marker() -> str | None:
+    """Return marker stored in g of current app context, None without app context."""
+    return flask.g.get("marker") if flask.has_app_context() else None
+
+
+def test_app_context_task() -> None:
+    """Test fresh app context is pushed for every task by default."""
+    app, celery = create_celery()
+    task: Task = celery.task(flask.has_app_context)
+    in_task: Task = celery.task(marker)
+    opted_out: Task = celery.task(flask.has_app_context, name="opted_out", app_context=False)
+
+    assert task.apply().get() is True
+    assert opted_out.apply().get() is False
+    with app.app_context():
+        flask.g.marker = "outer"
+        assert in_task.apply().get() is None
+
+
+def test_app_context_worker() -> None:
+    """Test active app context is reused, context pushed for eager task outside of it is popped."""
+    app, celery = create_celery(CELERY_TASK_APP_CONTEXT="worker")
+    task: Task = celery.task(flask.has_app_context)
+    in_task: Task = celery.task(marker)
+
+    assert task.apply().get() is True
+    assert flask.has_app_context() is False
+    with app.app_context():
+        flask.g.marker = "worker"
+        assert in_task.apply().get() == "worker"
+
+
+def test_app_context_worker_process_init() -> None:
+    """Test new worker process pushes context of the worker app only, apps do not connect receivers of their own."""
+    receivers = len(worker_process_init.receivers)
+    create_celery(CELERY_TASK_APP_CONTEXT="worker")
+    app, celery = create_celery(CELERY_TASK_APP_CONTEXT="worker")
+    assert len(worker_process_init.receivers) == receivers
+
+    previous = _state.get_current_app()
+    celery.set_current()
+    try:
+        worker_process_init.send(sender=None)
+        assert flask.current_app.config is app.config
+        app_ctx.pop()
+    finally:
+        previous.set_current()
+    assert flask.has_app_context() is False
+
+
+def test_app_context_none() -> None:
+    """Test no app context is pushed unless task opts in."""
+    _, celery = create_celery(CELERY_TASK_APP_CONTEXT="none")
+    task: Task = celery.task(flask.has_app_context)
+    opted_in: Task = celery.task(flask.has_app_context, name="opted_in", app_context=True)
+
+    assert task.apply().get() is False
+    assert opted_in.apply().get() is True
+
+
+def test_app_context_unknown() -> None:
+    """Test unknown strategy is rejected."""
+    with pytest.raises(ValueError, match="CELERY_TASK_APP_CONTEXT"):
+        create_celery(CELERY_TASK_APP_CONTEXT="request")
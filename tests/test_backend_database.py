@@ -0,0 +1,176 @@
+"""Test database backend."""
+
+import threading
+import time
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, create_engine, insert, inspect
+
+from flask_celery.backends.database import LockBackendDb
+from flask_celery.backends.database.models import KEY_LENGTH, Lock, LockModelBase, bounded_key, rebuild_legacy_lock_table
+from flask_celery.backends.database.sessions import SessionManager
+
+
+def test_database_engine_cached(tmp_path: Path) -> None:
+    """Test engine and session maker are shared by backends using the same URI."""
+    uri = f"sqlite:///{tmp_path / 'locks.sqlite'}"
+    first = LockBackendDb(uri)
+    second = LockBackendDb(uri)
+
+    assert first.acquire("identifier", 60) is True
+    assert second.acquire("identifier", 60) is False
+    assert first.session_manager.create_session(uri) == second.session_manager.create_session(uri)
+    assert uri in SessionManager._prepared  # noqa: SLF001
+    second.release("identifier")
+    assert first.exists("identifier", 60) is False
+
+
+def test_database_engine_options(tmp_path: Path) -> None:
+    """Test engine options are passed to create_engine."""
+    uri = f"sqlite:///{tmp_path / 'options.sqlite'}"
+    lb = LockBackendDb(uri, engine_options={"pool_size": 2, "pool_recycle": 30})
+    engine = lb.session_manager.get_engine(uri)
+
+    assert engine.pool.size() == 2  # type: ignore[attr-defined]
+    assert engine.pool._recycle == 30  # noqa: SLF001
+
+
+def hammer(lb: LockBackendDb, identifier: str, timeout: int, threads: int = 16) -> list[bool]:
+    """Acquire the same lock from many threads at once."""
+    barrier = threading.Barrier(threads)
+    results: list[bool] = []
+
+    def worker() -> None:
+        barrier.wait()
+        results.append(lb.acquire(identifier, timeout))
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return results
+
+
+def test_database_acquire_contention(tmp_path: Path) -> None:
+    """Test only one of many concurrent acquirers gets the lock."""
+    lb = LockBackendDb(f"sqlite:///{tmp_path / 'contention.sqlite'}")
+
+    assert hammer(lb, "identifier", 60).count(True) == 1
+
+
+def test_database_acquire_expired_contention(tmp_path: Path) -> None:
+    """Test only one of many concurrent acquirers takes over an expired lock."""
+    lb = LockBackendDb(f"sqlite:///{tmp_path / 'expired.sqlite'}")
+    assert lb.acquire("identifier", 1) is True
+    time.sleep(1.1)
+
+    assert hammer(lb, "identifier", 1).count(True) == 1
+    assert lb.exists("identifier", 1) is True
+
+
+def test_database_owner_and_expiry(tmp_path: Path) -> None:
+    """Test lock stores its expiry and owner, release and extend respect owner."""
+    lb = LockBackendDb(f"sqlite:///{tmp_path / 'owner.sqlite'}")
+    assert lb.acquire("tasks.add.args.hash", 1, "owner") is True
+    # Expiry stored on acquire wins over timeout of the caller
+    assert lb.exists("tasks.add.args.hash", 3600) is True
+
+    lb.release("tasks.add.args.hash", "other")
+    assert lb.extend("tasks.add.args.hash", 60, "other") is False
+    assert lb.extend("tasks.add.args.hash", 60, "owner") is True
+    time.sleep(1.1)
+    assert lb.exists("tasks.add.args.hash", 1) is True
+
+    session = lb.result_session()
+    with lb.session_cleanup(session):
+        lock = session.get(Lock, "tasks.add.args.hash")
+        assert lock is not None
+        assert (lock.task_name, lock.owner) == ("tasks.add", "owner")
+
+    lb.release("tasks.add.args.hash", "owner")
+    assert lb.exists("tasks.add.args.hash", 60) is False
+
+
+def create_legacy_table(uri: str) -> None:
+    """Create lock table of versions with surrogate id and no expiry, with one recent and one stale lock."""
+    now = datetime.now(UTC)
+    legacy = Table(
+        "celeryd_lock", MetaData(),
+        Column("id", Integer, primary_key=True),
+        Column("task_identifier", String, unique=True, nullable=False),
+        Column("created", DateTime(timezone=True)),
+    )
+    engine = create_engine(uri)
+    with engine.begin() as connection:
+        legacy.create(connection)
+        connection.execute(legacy.insert(), [
+            {"task_identifier": "tasks.add.args.recent", "created": now - timedelta(seconds=10)},
+            {"task_identifier": "tasks.add.args.stale", "created": now - timedelta(days=1)},
+        ])
+    engine.dispose()
+
+
+def test_database_legacy_table_migrated(tmp_path: Path) -> None:
+    """Test table with surrogate id and no expiry is rebuilt, recent locks are carried over."""
+    uri = f"sqlite:///{tmp_path / 'legacy.sqlite'}"
+    create_legacy_table(uri)
+
+    lb = LockBackendDb(uri)
+    assert lb.exists("tasks.add.args.recent", 60) is True
+    assert lb.acquire("tasks.add.args.recent", 60) is False
+    assert lb.acquire("tasks.add.args.stale", 60) is True
+
+    columns = {column["name"] for column in inspect(lb.session_manager.get_engine(uri)).get_columns("celeryd_lock")}
+    assert columns == {"task_identifier", "task_name", "owner", "created", "expires_at"}
+
+
+def test_database_legacy_migration_serialized(tmp_path: Path) -> None:
+    """Test worker which saw legacy table waits for the one migrating it and keeps migrated table."""
+    uri = f"sqlite:///{tmp_path / 'legacy_race.sqlite'}"
+    create_legacy_table(uri)
+    engine = create_engine(uri)
+    migrating = engine.connect()
+    migrating.exec_driver_sql("BEGIN IMMEDIATE")
+
+    lb = LockBackendDb(uri)
+    waiting = threading.Thread(target=lb.exists, args=("tasks.add.args.fresh", 60))
+    waiting.start()
+    time.sleep(0.3)
+    rebuild_legacy_lock_table(migrating)
+    LockModelBase.metadata.create_all(migrating)
+    migrating.execute(insert(Lock).values(lb.lock_values("tasks.add.args.fresh", 60, "owner", datetime.now(UTC))))
+    migrating.commit()
+    migrating.close()
+    engine.dispose()
+    waiting.join()
+
+    assert lb.exists("tasks.add.args.fresh", 60) is True
+    assert lb.exists("tasks.add.args.recent", 60) is True
+
+
+def test_database_long_keys(tmp_path: Path) -> None:
+    """Test keys longer than the key column are stored cut and hashed, they stay distinct."""
+    lb = LockBackendDb(f"sqlite:///{tmp_path / 'long.sqlite'}")
+    long = "tasks.add.args." + "x" * 300
+    pending = long + ".pending"
+    assert bounded_key(long).startswith("tasks.add.args.x")
+    assert len(bounded_key(long)) == KEY_LENGTH
+    assert bounded_key(bounded_key(long)) == bounded_key(long)
+
+    assert lb.acquire(long, 60, "owner") is True
+    assert lb.acquire(long, 60) is False
+    assert lb.get_owner(long, 60) == "owner"
+    assert lb.acquire_many([long, pending], 60) == {long: False, pending: True}
+    assert lb.exists_many([long, pending, long + ".other"], 60) == {long: True, pending: True, long + ".other": False}
+    assert sorted(lock.task_identifier for lock in lb.iter_locks("tasks.add.")) == sorted(map(bounded_key, [long, pending]))
+    lb.release(long, "owner")
+    assert lb.exists(long, 60) is False
+    assert lb.exists(pending, 60) is True
+
+    lb.cache_set(long, b"value", 60)
+    assert lb.cache_get(long) == b"value"
+    assert lb.cache_get(pending) is None
+    assert lb.rate_limit(long, 10, 1) == 0.0
+    assert lb.rate_limit(pending, 10, 1) == 0.0
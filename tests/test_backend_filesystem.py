@@ -1,6 +1,10 @@
 """Test backend."""
 
+import multiprocessing
+import os
 import tempfile
+import time
+from multiprocessing.synchronize import Barrier
 from pathlib import Path
 
 import pytest
@@ -34,6 +38,7 @@ def test_filesystem_acquire_exists_empty_file() -> None:
     """Test Creation of correct lock file when empty one exists."""
     path = get_tempdir()
     lb = LockBackendFilesystem(f"file://{path}")
+    lb.get_lock_path("identifier").parent.mkdir(parents=True, exist_ok=True)
     with lb.get_lock_path("identifier").open("w") as f:
         f.write("")
 
@@ -55,7 +60,7 @@ def test_filesystem_release_file_is_not_a_file() -> None:
     dir_path = lb.get_lock_path("not_a_file")
 
     if not dir_path.is_dir():
-        dir_path.mkdir()
+        dir_path.mkdir(parents=True)
 
     with pytest.raises(IsADirectoryError):
         lb.release("not_a_file")
@@ -65,7 +70,112 @@ def test_filesystem_exists_exists_empty_file() -> None:
     """Test Creation of correct lock file when empty one exists."""
     path = get_tempdir()
     lb = LockBackendFilesystem(f"file://{path}")
+    lb.get_lock_path("identifier").parent.mkdir(parents=True, exist_ok=True)
     with lb.get_lock_path("identifier").open("w") as f:
         f.write("")
 
     assert lb.exists("identifier", 0) is False
+
+
+def contend(path: Path, barrier: Barrier, results: "multiprocessing.Queue[bool]") -> None:
+    """Acquire the same lock as all other processes at once."""
+    lb = LockBackendFilesystem(f"file://{path}")
+    barrier.wait()
+    results.put(lb.acquire("identifier", 60, str(os.getpid())))
+
+
+def run_contention(path: Path, processes: int = 200) -> list[bool]:
+    """Run many acquiring processes, return their results."""
+    context = multiprocessing.get_context("fork")
+    barrier = context.Barrier(processes)
+    results: multiprocessing.Queue[bool] = context.Queue()
+    workers = [context.Process(target=contend, args=(path, barrier, results)) for _ in range(processes)]
+    for worker in workers:
+        worker.start()
+    acquired = [results.get(timeout=60) for _ in workers]
+    for worker in workers:
+        worker.join()
+    return acquired
+
+
+def test_filesystem_acquire_contention(tmp_path: Path) -> None:
+    """Test only one of hundreds of concurrent processes gets the lock."""
+    assert run_contention(tmp_path).count(True) == 1
+
+
+def test_filesystem_acquire_expired_contention(tmp_path: Path) -> None:
+    """Test only one of hundreds of concurrent processes takes over an expired lock."""
+    lb = LockBackendFilesystem(f"file://{tmp_path}")
+    assert lb.acquire("identifier", 60, "owner") is True
+    expired = time.time() - 120
+    os.utime(lb.get_lock_path("identifier"), (expired, expired))
+
+    assert run_contention(tmp_path).count(True) == 1
+    assert lb.exists("identifier", 60) is True
+
+
+def test_filesystem_release_owner(tmp_path: Path) -> None:
+    """Test lock is released and extended only by its owner."""
+    lb = LockBackendFilesystem(f"file://{tmp_path}")
+    assert lb.acquire("identifier", 60, "owner1") is True
+    assert lb.extend("identifier", 60, "owner2") is False
+    lb.release("identifier", "owner2")
+    assert lb.exists("identifier", 60) is True
+    assert lb.extend("identifier", 60, "owner1") is True
+    lb.release("identifier", "owner1")
+    assert lb.exists("identifier", 60) is False
+
+
+def test_filesystem_sharded_layout(tmp_path: Path) -> None:
+    """Test lock files are spread over hash subdirectories with identifier encoded into file name."""
+    lb = LockBackendFilesystem(f"file://{tmp_path}")
+    assert lb.acquire("tasks/add.args.ü", 60, "owner") is True
+
+    lock_path = lb.get_lock_path("tasks/add.args.ü")
+    assert lock_path.is_file()
+    assert len(lock_path.relative_to(tmp_path).parts) == 3
+    assert [lock.task_identifier for lock in lb.iter_locks()] == ["tasks/add.args.ü"]
+
+
+def test_filesystem_long_identifier(tmp_path: Path) -> None:
+    """Test identifier too long for a file name is truncated and made unique by its hash."""
+    lb = LockBackendFilesystem(f"file://{tmp_path}")
+    first, second = "tasks.add.args." + "a" * 300 + "1", "tasks.add.args." + "a" * 300 + "2"
+    assert lb.acquire(first, 60) is True
+    assert lb.acquire(second, 60) is True
+    assert lb.exists(first, 60) is True
+    assert len(lb.get_lock_path(first).name) <= LockBackendFilesystem.NAME_MAX
+
+    assert lb.count_locks("tasks.add.") == 2
+    assert lb.expire_locks("tasks.add.") == 2
+    assert lb.exists(second, 60) is False
+
+
+def test_filesystem_flat_layout_migrated(tmp_path: Path) -> None:
+    """Test lock files of flat layout are moved into subdirectories keeping their timestamp."""
+    expired = time.time() - 120
+    tmp_path.joinpath("held.lock").write_text("owner")
+    tmp_path.joinpath("stale.lock").write_text("")
+    os.utime(tmp_path.joinpath("stale.lock"), (expired, expired))
+
+    lb = LockBackendFilesystem(f"file://{tmp_path}")
+    assert not list(tmp_path.glob("*.lock"))
+    assert lb.acquire("held", 60, "other") is False
+    lb.release("held", "owner")
+    assert lb.exists("held", 60) is False
+    assert lb.acquire("stale", 60) is True
+
+
+def test_filesystem_flat_layout_migration_keeps_new_lock(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test lock created in new layout while flat one is being moved is not overwritten."""
+    tmp_path.joinpath("held.lock").write_text("old")
+    link = os.link
+
+    def acquire_then_link(src: Path, dst: Path) -> None:
+        dst.write_text("new")
+        link(src, dst)
+
+    monkeypatch.setattr(os, "link", acquire_then_link)
+    lb = LockBackendFilesystem(f"file://{tmp_path}")
+    assert not list(tmp_path.glob("*.lock"))
+    assert lb.get_lock_path("held").read_text() == "new"
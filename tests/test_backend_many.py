@@ -0,0 +1,47 @@
+"""Test batch lock operations."""
+
+from typing import TYPE_CHECKING
+
+import pytest
+from celery import Celery as CeleryClass
+from celery import Task
+
+from flask_celery.backends.base import LockBackend
+from flask_celery.lock_manager import LockManager
+
+from .tasks import mul
+
+if TYPE_CHECKING:
+    from flask_celery.types import CelerySerializable
+
+
+@pytest.mark.parametrize("lock_backend", ["database", "filesystem", "redis"], indirect=True)
+@pytest.mark.parametrize("count", [3, 700])
+def test_many(lock_backend: LockBackend, count: int) -> None:
+    """Test acquire, exists and release of many locks."""
+    identifiers = [f"identifier.{i}" for i in range(count)]
+    assert lock_backend.acquire("identifier.0", 60, "owner") is True
+
+    acquired = lock_backend.acquire_many(identifiers, 60, "owner")
+    assert acquired["identifier.0"] is False
+    assert all(acquired[identifier] for identifier in identifiers[1:])
+    assert all(lock_backend.exists_many(identifiers, 60).values())
+
+    lock_backend.release_many(identifiers[:2], "owner")
+    exists = lock_backend.exists_many(identifiers, 60)
+    assert exists["identifier.0"] is False
+    assert exists["identifier.1"] is False
+    assert exists["identifier.2"] is True
+
+    lock_backend.release_many(identifiers)
+    assert not any(lock_backend.exists_many(identifiers, 60).values())
+
+
+def test_is_already_running_many(celery_app: CeleryClass) -> None:
+    """Test checking many task instances at once."""
+    tasks: list[tuple[Task, tuple[CelerySerializable, ...], dict[str, CelerySerializable]]] = [(mul, (i, 2), {}) for i in range(5)]
+    manager = LockManager(celery_app.lock_backend, mul, 20, (1, 2), {}, include_args=True)
+    with manager:
+        running = LockManager.is_already_running_many(celery_app.lock_backend, tasks, 20, include_args=True)
+    assert running == [False, True, False, False, False]
+    assert LockManager.is_already_running_many(celery_app.lock_backend, tasks, 20, include_args=True) == [False] * 5
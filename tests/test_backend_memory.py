@@ -0,0 +1,84 @@
+"""Test memory backend."""
+
+import multiprocessing
+import time
+from multiprocessing.synchronize import Barrier
+
+import pytest
+
+from flask_celery.backends.memory import LockBackendMemory
+from flask_celery.lock_manager import select_lock_backend
+
+
+@pytest.fixture(params=["memory://", "memory://?shared=1&slots=64"])
+def lock_backend(request: pytest.FixtureRequest) -> LockBackendMemory:
+    """Return local and shared memory backend."""
+    return LockBackendMemory(request.param)
+
+
+def test_memory_select() -> None:
+    """Test memory:// is selected."""
+    assert select_lock_backend("memory://") is LockBackendMemory
+
+
+def test_memory_acquire_release(lock_backend: LockBackendMemory) -> None:
+    """Test lock is released only by its owner or without token."""
+    assert lock_backend.acquire("identifier", 10, "owner") is True
+    assert lock_backend.acquire("identifier", 10, "other") is False
+    assert lock_backend.exists("identifier", 10) is True
+
+    lock_backend.release("identifier", "other")
+    assert lock_backend.exists("identifier", 10) is True
+    lock_backend.release("identifier", "owner")
+    assert lock_backend.exists("identifier", 10) is False
+
+    assert lock_backend.acquire("identifier", 10, "other") is True
+    lock_backend.release("identifier")
+    assert lock_backend.exists("identifier", 10) is False
+
+
+def test_memory_expired(lock_backend: LockBackendMemory) -> None:
+    """Test expired lock is taken over and can not be extended by its old owner."""
+    assert lock_backend.acquire("identifier", 1, "owner") is True
+    time.sleep(1.1)
+    assert lock_backend.exists("identifier", 1) is False
+    assert lock_backend.extend("identifier", 1, "owner") is False
+    assert lock_backend.acquire("identifier", 10, "other") is True
+    assert lock_backend.extend("identifier", 10, "owner") is False
+    assert lock_backend.extend("identifier", 10, "other") is True
+
+
+def test_memory_shared_full() -> None:
+    """Test shared table reuses released slots and fails when all slots are held."""
+    lock_backend = LockBackendMemory("memory://?shared=1&slots=4")
+    for i in range(4):
+        assert lock_backend.acquire(f"identifier{i}", 10) is True
+    with pytest.raises(OverflowError):
+        lock_backend.acquire("identifier4", 10)
+    lock_backend.release("identifier0")
+    assert lock_backend.acquire("identifier4", 10) is True
+    assert all(lock_backend.exists(f"identifier{i}", 10) for i in range(1, 5))
+
+
+def contend(lock_backend: LockBackendMemory, barrier: Barrier, results: "multiprocessing.Queue[bool]") -> None:
+    """Acquire the same lock as all other forked processes at once."""
+    barrier.wait()
+    results.put(lock_backend.acquire("contended", 10))
+
+
+def test_memory_shared_contention() -> None:
+    """Test exactly one of many forked processes acquires the lock."""
+    context = multiprocessing.get_context("fork")
+    lock_backend = LockBackendMemory("memory://?shared=1")
+    processes_count = 50
+    barrier = context.Barrier(processes_count)
+    results: multiprocessing.Queue[bool] = context.Queue()
+    processes = [context.Process(target=contend, args=(lock_backend, barrier, results)) for _ in range(processes_count)]
+    for process in processes:
+        process.start()
+    acquired = [results.get(timeout=30) for _ in processes]
+    for process in processes:
+        process.join()
+
+    assert acquired.count(True) == 1
+    assert lock_backend.exists("contended", 10) is True
@@ -0,0 +1,87 @@
+"""Test redis backend."""
+
+import threading
+import time
+
+import pytest
+
+from flask_celery.backends.redis import LockBackendRedis
+
+# Redis lock backend connected to fake redis server
+pytestmark = pytest.mark.parametrize("lock_backend", ["redis"], indirect=True)
+
+
+def test_redis_acquire(lock_backend: LockBackendRedis) -> None:
+    """Test lock is acquired only once and expires."""
+    assert lock_backend.acquire("identifier", 60, "owner1") is True
+    assert lock_backend.acquire("identifier", 60, "owner2") is False
+    assert lock_backend.exists("identifier", 60) is True
+    assert 0 < lock_backend.redis_client.pttl(lock_backend.CELERY_LOCK.format(task_id="identifier")) <= 60000
+
+
+def test_redis_release_owner(lock_backend: LockBackendRedis) -> None:
+    """Test lock is released only by its owner."""
+    assert lock_backend.acquire("identifier", 60, "owner1") is True
+    lock_backend.release("identifier", "owner2")
+    assert lock_backend.exists("identifier", 60) is True
+    lock_backend.release("identifier", "owner1")
+    assert lock_backend.exists("identifier", 60) is False
+
+
+def test_redis_release_without_owner(lock_backend: LockBackendRedis) -> None:
+    """Test lock is released regardless of owner when no token is passed."""
+    assert lock_backend.acquire("identifier", 60, "owner1") is True
+    lock_backend.release("identifier")
+    assert lock_backend.exists("identifier", 60) is False
+
+
+def test_redis_extend(lock_backend: LockBackendRedis) -> None:
+    """Test lock timeout is reset only by its owner."""
+    redis_key = lock_backend.CELERY_LOCK.format(task_id="identifier")
+    assert lock_backend.acquire("identifier", 1, "owner1") is True
+    assert lock_backend.extend("identifier", 60, "owner2") is False
+    assert lock_backend.redis_client.pttl(redis_key) <= 1000
+    assert lock_backend.extend("identifier", 60, "owner1") is True
+    assert lock_backend.redis_client.pttl(redis_key) > 1000
+
+
+def test_redis_wait_for_release(lock_backend: LockBackendRedis) -> None:
+    """Test waiter wakes up on release notification before its timeout."""
+    assert lock_backend.acquire("identifier", 60, "owner1") is True
+    threading.Timer(0.2, lock_backend.release, args=("identifier", "owner1")).start()
+
+    start = time.monotonic()
+    lock_backend.wait_for_release("identifier", 5)
+    assert time.monotonic() - start < 4
+    assert lock_backend.acquire("identifier", 60, "owner2") is True
+
+
+def test_redis_slots(lock_backend: LockBackendRedis) -> None:
+    """Test semaphore sorted set holds at most limit owners, expired owners are dropped."""
+    assert lock_backend.acquire_slot("identifier", 2, 60, "owner1") == "identifier"
+    assert lock_backend.acquire_slot("identifier", 2, 1, "owner2") == "identifier"
+    assert lock_backend.acquire_slot("identifier", 2, 60, "owner3") is None
+    assert lock_backend.extend_slot("identifier", 60, "owner1") is True
+    assert lock_backend.extend_slot("identifier", 60, "owner3") is False
+
+    time.sleep(1.1)
+    assert lock_backend.acquire_slot("identifier", 2, 60, "owner3") == "identifier"
+    lock_backend.release_slot("identifier", "owner1")
+    redis_key = lock_backend.CELERY_SEMAPHORE.format(task_id="identifier")
+    assert lock_backend.redis_client.zrange(redis_key, 0, -1) == [b"owner3"]
+    assert 0 < lock_backend.redis_client.pttl(redis_key) <= 60000
+
+
+def test_redis_rate_limit(lock_backend: LockBackendRedis) -> None:
+    """Test rate limit script allows burst, then returns wait, state expires with theoretical arrival time."""
+    assert [lock_backend.rate_limit("key", 10, 2) for _ in range(2)] == [0.0, 0.0]
+    assert 9 < lock_backend.rate_limit("key", 10, 2) <= 10
+    assert 19000 < lock_backend.redis_client.pttl(lock_backend.CELERY_RATE_LIMIT.format(key="key")) <= 20000
+
+
+def test_redis_cache(lock_backend: LockBackendRedis) -> None:
+    """Test cached value is stored with ttl."""
+    assert lock_backend.cache_get("key") is None
+    lock_backend.cache_set("key", b"value", 60)
+    assert lock_backend.cache_get("key") == b"value"
+    assert 0 < lock_backend.redis_client.pttl(lock_backend.CELERY_CACHE.format(key="key")) <= 60000
@@ -0,0 +1,109 @@
+"""Test enqueue time deduplication."""
+
+import uuid
+
+import pytest
+from celery import Celery
+from celery.app.task import Task
+from celery.exceptions import Retry
+from celery.result import AsyncResult
+
+from flask_celery import RESERVED_HEADER, single_instance
+from flask_celery.lock_manager import LockManager
+
+from .tasks import deduplicated, mul
+
+
+def test_deduplicate_takes_over_reservation(celery_app: Celery) -> None:
+    """Test worker runs with the lock reserved at enqueue and releases it."""
+    result = deduplicated.delay(1)
+
+    assert result is not None
+    assert result.get() is True
+    assert LockManager(celery_app.lock_backend, deduplicated, 300, (1,), {}, include_args=True).is_already_running is False
+
+
+def test_deduplicate_skips_duplicate(celery_app: Celery) -> None:
+    """Test duplicate of running task instance is not published, AsyncResult of the running one is returned."""
+    lock_manager = LockManager(celery_app.lock_backend, deduplicated, 300, (2,), {}, include_args=True)
+    with lock_manager:
+        result = deduplicated.delay(2)
+        assert isinstance(result, AsyncResult)
+        assert result.id == lock_manager.token
+        assert deduplicated.apply_async(args=(3,)).id != lock_manager.token
+
+
+def test_deduplicate_returns_queued_instance(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test duplicate of queued task instance returns AsyncResult of the queued one."""
+    def publish(task: Task, _args: tuple[int, ...], _kwargs: dict[str, int], task_id: str, **_options: object) -> AsyncResult:
+        return task.AsyncResult(task_id)
+
+    monkeypatch.setattr(Task, "apply_async", publish)
+    x = uuid.uuid4().int % 10 ** 9
+    first = deduplicated.delay(x)
+    assert first is not None
+    assert deduplicated.delay(x).id == first.id
+    deduplicated.app.lock_backend.release(deduplicated.run.single_instance.lock_manager(deduplicated, (x,), {}).task_identifier)
+
+
+def test_deduplicate_retry_is_published(celery_app: Celery, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test retry of instance received by worker is published and keeps the reservation, duplicates still collapse."""
+    published: list[tuple[str, dict[str, object]]] = []
+
+    def publish(task: Task, _args: tuple[int, ...], _kwargs: dict[str, int], task_id: str, **options: object) -> AsyncResult:
+        published.append((task_id, options))
+        return task.AsyncResult(task_id)
+
+    @celery_app.task(bind=True, shared=False)
+    @single_instance(include_args=True, deduplicate=True)
+    def retried(cls: Task, _x: int) -> int:
+        raise cls.retry(countdown=5)
+
+    monkeypatch.setattr(Task, "apply_async", publish)
+    x = uuid.uuid4().int % 10 ** 9
+    first = retried.delay(x)
+    assert first is not None
+    # Reserved header is request attribute of task received by worker
+    retried.push_request(
+        id=first.id, args=(x,), kwargs={}, headers=None, called_directly=False, is_eager=False, **{RESERVED_HEADER: True},
+    )
+    try:
+        with pytest.raises(Retry):
+            retried.run(x)
+    finally:
+        retried.pop_request()
+
+    assert [task_id for task_id, _ in published] == [first.id, first.id]
+    assert published[1][1]["headers"][RESERVED_HEADER]  # type: ignore[index]
+    task_identifier = LockManager.make_task_identifier(retried.name, (x,), {}, include_args=True)
+    assert celery_app.lock_backend.get_owner(task_identifier, 300) == first.id
+    assert retried.delay(x).id == first.id
+    assert len(published) == 2
+    celery_app.lock_backend.release(task_identifier)
+
+
+def test_deduplicate_rejects_process_bound_backend(celery_app: Celery, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test backend whose locks can not be taken over by worker (pgadvisory) is rejected."""
+    options = deduplicated.run.single_instance
+    monkeypatch.setattr(celery_app.lock_backend, "cross_process_ownership", False)
+    options.resolved.clear()
+    with pytest.raises(ValueError, match="reserved at enqueue"):
+        deduplicated.delay(5)
+    monkeypatch.undo()
+    options.resolved.clear()
+
+
+def test_deduplicate_releases_reservation_when_publish_fails(celery_app: Celery, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test reservation is released when task could not be published."""
+    def fail(*_args: object, **_kwargs: object) -> None:
+        raise ConnectionError
+
+    monkeypatch.setattr(Task, "apply_async", fail)
+    with pytest.raises(ConnectionError):
+        deduplicated.delay(4)
+    assert LockManager(celery_app.lock_backend, deduplicated, 300, (4,), {}, include_args=True).is_already_running is False
+
+
+def test_not_deduplicated_task_is_published() -> None:
+    """Test tasks without deduplicate are published as before."""
+    assert mul.delay(2, 3).get() == 6
@@ -0,0 +1,168 @@
+"""Test lock manager."""
+
+import logging
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from typing import Any
+
+import pytest
+from celery import Celery as CeleryClass
+
+from flask_celery.backends.base import LockBackend
+from flask_celery.exceptions import OtherInstanceError
+from flask_celery.lock_manager import LockManager
+from flask_celery.types import CelerySerializable
+
+from .tasks import mul
+
+
+def test_task_identifier_canonical() -> None:
+    """Test identifier does not depend on keyword or nested dict order."""
+    first = LockManager.make_task_identifier("task", (1, {"a": 1, "b": [1, 2]}), {"x": 1, "y": 2}, include_args=True)
+    second = LockManager.make_task_identifier("task", (1, {"b": [1, 2], "a": 1}), {"y": 2, "x": 1}, include_args=True)
+    other = LockManager.make_task_identifier("task", (1, {"b": [2, 1], "a": 1}), {"y": 2, "x": 1}, include_args=True)
+
+    assert first == second
+    assert first != other
+    assert first.startswith("task.args.")
+    assert LockManager.make_task_identifier("task", (1,), {}, include_args=False) == "task"
+
+
+def test_task_identifier_types() -> None:
+    """Test arguments equal only after JSON conversion get different identifiers, non JSON arguments are supported."""
+    def identifier(*args: Any) -> str:  # noqa: ANN401
+        return LockManager.make_task_identifier("task", args, {}, include_args=True)
+
+    assert identifier({1: "a"}) != identifier({"1": "a"})
+    assert identifier((1, 2)) != identifier([1, 2])
+    assert identifier([1]) != identifier([True]) != identifier([1.0])
+    # Mixed and tuple keys, as passed by pickle serializer
+    assert identifier({1: "a", "b": 2}) == identifier({"b": 2, 1: "a"})
+    assert identifier({(1, 2): "a"}) != identifier({(2, 1): "a"})
+
+
+def test_task_identifier_long_sequences() -> None:
+    """Test long sequences of scalars encoded at once keep types apart and do not depend on shared items."""
+    def identifier(*args: Any) -> str:  # noqa: ANN401
+        return LockManager.make_task_identifier("task", args, {}, include_args=True)
+
+    shared = "item" * 10
+    assert identifier([shared] * 100) == identifier(["item" * 10 for _ in range(100)])
+    assert identifier(list(range(100))) == identifier(list(range(100)))
+    assert identifier(list(range(100))) != identifier(tuple(range(100))) != identifier([*range(99), 100])
+    assert identifier([1] * 100) != identifier([True] * 100) != identifier([1.0] * 100) != identifier(["1"] * 100)
+    assert identifier({"a": list(range(100))}) == identifier({"a": list(range(100))})
+    assert identifier([[1] * 100, [2]]) != identifier([[1] * 100, (2,)])
+
+
+def test_task_identifier_set_order() -> None:
+    """Test set members are sorted, identifier does not depend on hash seed of the process."""
+    script = (
+        "from flask_celery.lock_manager import LockManager;"
+        "print(LockManager.make_task_identifier('task', ({'alpha', 'beta', 'gamma', 'delta'},), {}, include_args=True))"
+    )
+    identifiers = {
+        subprocess.run(  # noqa: S603
+            [sys.executable, "-c", script], env={**os.environ, "PYTHONHASHSEED": seed}, capture_output=True, check=True, text=True,
+        ).stdout
+        for seed in ("1", "2", "3")
+    }
+    assert len(identifiers) == 1
+    args: tuple[Any, ...] = ({"delta", "gamma", "beta", "alpha"},)
+    assert identifiers.pop().strip() == LockManager.make_task_identifier("task", args, {}, include_args=True)
+
+
+def test_task_identifier_key_func() -> None:
+    """Test only arguments returned by key_func are part of the identifier."""
+    def key_func(user_id: int, *_args: CelerySerializable, **_kwargs: CelerySerializable) -> CelerySerializable:
+        return user_id
+
+    first = LockManager.make_task_identifier("task", (1, "a"), {"force": True}, include_args=False, key_func=key_func)
+    second = LockManager.make_task_identifier("task", (1, "b"), {}, include_args=False, key_func=key_func)
+    other = LockManager.make_task_identifier("task", (2, "a"), {"force": True}, include_args=False, key_func=key_func)
+
+    assert first == second
+    assert first != other
+
+
+def test_task_identifier_cached(celery_app: CeleryClass) -> None:
+    """Test identifier is computed once per manager."""
+    manager = LockManager(celery_app.lock_backend, mul, 20, (1, 2), {}, include_args=True)
+    assert manager.task_identifier is manager.task_identifier
+    assert "task_identifier" in manager.__dict__
+
+
+class DictLockBackend(LockBackend):
+    """Lock backend keeping locks in a dict, to exercise LockManager alone."""
+
+    def __init__(self) -> None:
+        """DictLockBackend constructor."""
+        super().__init__("dict://")
+        self.locks: dict[str, str | None] = {}
+
+    def acquire(self, task_identifier: str, timeout: int, token: str | None = None) -> bool:
+        """Acquire lock."""
+        _ = timeout
+        return self.locks.setdefault(task_identifier, token) == token
+
+    def release(self, task_identifier: str, token: str | None = None) -> None:
+        """Release lock."""
+        _ = token
+        self.locks.pop(task_identifier, None)
+
+
+def test_no_logger_per_task_instance(caplog: pytest.LogCaptureFixture) -> None:
+    """Test running many distinct-argument tasks does not register new loggers."""
+    lock_backend = DictLockBackend()
+    LockManager(lock_backend, mul, 20, (0, 0), {}, include_args=True)
+    logger_count = len(logging.Logger.manager.loggerDict)
+
+    for i in range(100_000):
+        with LockManager(lock_backend, mul, 20, (i, i), {}, include_args=True):
+            pass
+    with caplog.at_level(logging.DEBUG, logger="flask_celery.lock_manager"):
+        for i in range(100):
+            with LockManager(lock_backend, mul, 20, ("debug", i), {}, include_args=True):
+                pass
+
+    assert len(logging.Logger.manager.loggerDict) == logger_count
+    assert not lock_backend.locks
+    assert caplog.records[-1].task_identifier.startswith(f"{mul.name}.args.")  # type: ignore[attr-defined]
+
+
+def test_wait_for_lock() -> None:
+    """Test waiting manager gets the lock once holder releases it."""
+    lock_backend = DictLockBackend()
+    holder = LockManager(lock_backend, mul, 20, (1, 2), {}, include_args=True)
+    holder.__enter__()
+    threading.Timer(0.3, holder.__exit__, args=(None, None, None)).start()
+
+    start = time.monotonic()
+    with LockManager(lock_backend, mul, 20, (1, 2), {}, include_args=True, wait_timeout=5):
+        assert 0.3 <= time.monotonic() - start < 5
+
+
+def test_wait_for_lock_timeout() -> None:
+    """Test waiting manager gives up after wait_timeout."""
+    lock_backend = DictLockBackend()
+    holder = LockManager(lock_backend, mul, 20, (1, 2), {}, include_args=True)
+    holder.__enter__()
+
+    start = time.monotonic()
+    with pytest.raises(OtherInstanceError), LockManager(lock_backend, mul, 20, (1, 2), {}, include_args=True, wait_timeout=0.3):
+        pass
+    assert 0.3 <= time.monotonic() - start < 1
+
+
+def test_default_token_is_task_id() -> None:
+    """Test lock is owned by the id of running task, host and process of task called directly."""
+    assert LockManager(DictLockBackend(), mul, 20, (1, 2), {}, include_args=True).token.startswith(f"{socket.gethostname()}:{os.getpid()}:")
+    mul.push_request(id="task-id")
+    try:
+        assert LockManager(DictLockBackend(), mul, 20, (1, 2), {}, include_args=True).token == mul.request.id
+    finally:
+        mul.pop_request()
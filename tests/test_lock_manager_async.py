@@ -0,0 +1,96 @@
+"""Test asyncio lock manager and backends."""
+
+import asyncio
+from pathlib import Path
+
+import pytest
+from celery import Celery as CeleryClass
+
+from flask_celery.backends.base import AsyncLockBackend, AsyncLockBackendThreaded
+from flask_celery.backends.database import AsyncLockBackendDb, LockBackendDb
+from flask_celery.backends.memory import LockBackendMemory
+from flask_celery.backends.redis import AsyncLockBackendRedis, LockBackendRedis
+from flask_celery.exceptions import OtherInstanceError
+from flask_celery.lock_manager import AsyncLockManager, LockManager
+
+from .tasks import mul
+
+# Asyncio backend of every kind, native ones for redis and aiosqlite
+async_backends = pytest.mark.parametrize("lock_backend", ["memory", "redis", "aiosqlite"], indirect=True)
+
+
+def test_to_async_backend_kind(tmp_path: Path) -> None:
+    """Test native asyncio backend is used when available, sync backend in thread otherwise."""
+    assert isinstance(LockBackendRedis("redis://localhost/0").to_async(), AsyncLockBackendRedis)
+    assert isinstance(LockBackendDb(f"sqlite+aiosqlite:///{tmp_path / 'locks.sqlite'}").to_async(), AsyncLockBackendDb)
+    assert isinstance(LockBackendDb(f"sqlite:///{tmp_path / 'locks.sqlite'}").to_async(), AsyncLockBackendThreaded)
+    assert isinstance(LockBackendMemory("memory://").to_async(), AsyncLockBackendThreaded)
+
+
+@async_backends
+def test_async_backend(async_lock_backend: AsyncLockBackend) -> None:
+    """Test acquire, extend and release with owner."""
+    async def run() -> None:
+        assert await async_lock_backend.acquire("identifier", 60, "owner1") is True
+        assert await async_lock_backend.acquire("identifier", 60, "owner2") is False
+        assert await async_lock_backend.exists("identifier", 60) is True
+        assert await async_lock_backend.extend("identifier", 60, "owner1") is True
+        await async_lock_backend.release("identifier", "owner1")
+        assert await async_lock_backend.exists("identifier", 60) is False
+        assert await async_lock_backend.extend("identifier", 60, "owner1") is False
+
+    asyncio.run(run())
+
+
+@async_backends
+def test_async_lock_manager(async_lock_backend: AsyncLockBackend) -> None:
+    """Test async with holds the lock and identifier matches the sync manager."""
+    async def run() -> None:
+        manager = AsyncLockManager(async_lock_backend, mul, 60, (1, 2), {}, include_args=True)
+        other = AsyncLockManager(async_lock_backend, mul, 60, (1, 2), {}, include_args=True)
+        assert manager.task_identifier == LockManager.make_task_identifier(mul.name, (1, 2), {}, include_args=True)
+
+        async with manager:
+            assert await other.is_already_running() is True
+            with pytest.raises(OtherInstanceError):
+                async with other:
+                    pass
+        assert await other.is_already_running() is False
+
+        async with manager:
+            await other.reset_lock()
+            assert await manager.is_already_running() is False
+
+    asyncio.run(run())
+
+
+@async_backends
+def test_async_lock_manager_wait(async_lock_backend: AsyncLockBackend) -> None:
+    """Test waiting manager gets the lock once it is released, without blocking the loop."""
+    async def run() -> None:
+        holder = AsyncLockManager(async_lock_backend, mul, 60, (), {}, include_args=False)
+        waiter = AsyncLockManager(async_lock_backend, mul, 60, (), {}, include_args=False, wait_timeout=5)
+
+        async def hold() -> None:
+            async with holder:
+                await asyncio.sleep(0.3)
+
+        holding = asyncio.create_task(hold())
+        await asyncio.sleep(0.05)
+        async with waiter:
+            assert holding.done()
+
+    asyncio.run(run())
+
+
+def test_celery_async_lock_backend(celery_app: CeleryClass) -> None:
+    """Test extension provides asyncio backend sharing locks with the sync one."""
+    async_lock_backend = celery_app.async_lock_backend
+    assert async_lock_backend is celery_app.async_lock_backend
+
+    async def run() -> None:
+        async with AsyncLockManager(async_lock_backend, mul, 60, (3, 4), {}, include_args=True):
+            assert LockManager(celery_app.lock_backend, mul, 60, (3, 4), {}, include_args=True).is_already_running is True
+
+    asyncio.run(run())
+    assert LockManager(celery_app.lock_backend, mul, 60, (3, 4), {}, include_args=True).is_already_running is False
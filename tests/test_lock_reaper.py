@@ -0,0 +1,109 @@
+"""Test expired lock reaping."""
+
+import os
+import time
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+import pytest
+from celery.signals import worker_ready, worker_shutdown
+from flask import Flask
+from sqlalchemy import inspect, update
+
+from flask_celery import Celery
+from flask_celery.backends.base import LockBackend
+from flask_celery.backends.database import LockBackendDb
+from flask_celery.backends.database.models import Lock
+from flask_celery.backends.filesystem import LockBackendFilesystem
+from flask_celery.lock_reaper import LockReaper
+
+
+def age_locks(lock_backend: LockBackend, task_identifiers: list[str], seconds: int) -> None:
+    """Move lock timestamps to the past, locks acquired with 60 seconds timeout expire."""
+    if isinstance(lock_backend, LockBackendFilesystem):
+        mtime = time.time() - seconds
+        for task_identifier in task_identifiers:
+            os.utime(lock_backend.get_lock_path(task_identifier), (mtime, mtime))
+        return
+    assert isinstance(lock_backend, LockBackendDb)
+    past = datetime.now(UTC) - timedelta(seconds=seconds)
+    session = lock_backend.result_session()
+    with lock_backend.session_cleanup(session):
+        session.execute(
+            update(Lock).where(Lock.task_identifier.in_(task_identifiers))
+            .values(created=past, expires_at=past + timedelta(seconds=60)),
+        )
+        session.commit()
+
+
+# Lock backend of each kind not expiring locks by itself
+reaped_backends = pytest.mark.parametrize("lock_backend", ["database", "filesystem"], indirect=True)
+
+
+@reaped_backends
+def test_purge_expired(lock_backend: LockBackend) -> None:
+    """Test expired locks are removed in bounded batches, valid ones are kept."""
+    expired = [f"tasks.add.args.{i}" for i in range(7)]
+    lock_backend.acquire_many([*expired, "tasks.add.args.valid"], 60)
+    age_locks(lock_backend, expired, 120)
+
+    assert lock_backend.purge_expired(60, batch_size=5) == 5
+    assert lock_backend.purge_expired(60, batch_size=5) == 2
+    assert lock_backend.purge_expired(60, batch_size=5) == 0
+    assert lock_backend.exists("tasks.add.args.valid", 60) is True
+    assert not any(lock_backend.exists_many(expired, 3600).values())
+
+
+def test_expires_at_index(tmp_path: Path) -> None:
+    """Test expires_at index is added to table created before it existed."""
+    lock_backend = LockBackendDb(f"sqlite:///{tmp_path / 'index.sqlite'}")
+    engine = lock_backend.session_manager.get_engine(lock_backend.task_lock_backend_uri)
+    Lock.__table__.create(engine)  # type: ignore[attr-defined]
+    for index in Lock.__table__.indexes:  # type: ignore[attr-defined]
+        index.drop(engine)
+
+    assert lock_backend.acquire("identifier", 60) is True
+    assert ["expires_at"] in [index["column_names"] for index in inspect(engine).get_indexes(Lock.__tablename__)]
+
+
+@reaped_backends
+def test_reaper(lock_backend: LockBackend) -> None:
+    """Test reaper thread sweeps all batches."""
+    expired = [f"tasks.add.args.{i}" for i in range(5)]
+    lock_backend.acquire_many(expired, 60)
+    age_locks(lock_backend, expired, 120)
+
+    reaper = LockReaper(lock_backend, 60, batch_size=2, interval=0.05, pause=0)
+    reaper.start()
+    try:
+        deadline = time.monotonic() + 5
+        while any(lock_backend.exists_many(expired, 3600).values()) and time.monotonic() < deadline:
+            time.sleep(0.05)
+    finally:
+        reaper.stop(5)
+    assert not any(lock_backend.exists_many(expired, 3600).values())
+
+
+def test_reaper_started_by_worker(tmp_path: Path) -> None:
+    """Test reaper runs in worker when CELERY_TASK_LOCK_REAPER_MAX_AGE is set."""
+    apps = [Flask(__name__) for _ in range(2)]
+    for app in apps:
+        app.config.update(
+            CELERY_BROKER_URL="memory://",
+            CELERY_TASK_LOCK_BACKEND=f"file://{tmp_path}",
+            CELERY_TASK_LOCK_REAPER_MAX_AGE=600,
+        )
+    previous, celery = Celery(apps[0]), Celery(apps[1])
+    assert celery.lock_reaper is not None
+    assert celery.lock_reaper.max_age == 600
+
+    worker_ready.send(sender=None)
+    try:
+        assert celery.lock_reaper.thread is not None
+        assert celery.lock_reaper.thread.is_alive()
+        # Reaper of app initialized before is not started by its own receiver
+        assert previous.lock_reaper is not None
+        assert previous.lock_reaper.thread is None
+    finally:
+        worker_shutdown.send(sender=None)
+    assert celery.lock_reaper.thread is None
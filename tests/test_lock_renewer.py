@@ -0,0 +1,32 @@
+"""Test lock lease renewal."""
+
+import time
+from pathlib import Path
+
+from celery import Celery as CeleryClass
+
+from flask_celery.backends.database import LockBackendDb
+from flask_celery.lock_renewer import lock_renewer
+
+from .tasks import leased
+
+
+def test_lease_renewed(celery_app: CeleryClass) -> None:
+    """Test leased lock outlives its lease while task runs and is released afterwards."""
+    assert leased.apply_async(args=(2.5,)).get() is True
+    assert celery_app.lock_backend.exists(leased.name, 1) is False
+    assert not lock_renewer.leases
+
+
+def test_lease_expires_when_not_renewed(tmp_path: Path) -> None:
+    """Test lease of a lock no longer renewed (crashed task) expires."""
+    lb = LockBackendDb(f"sqlite:///{tmp_path / 'lease.sqlite'}")
+    assert lb.acquire("identifier", 1, "owner") is True
+    lock_renewer.register(lb, "identifier", "owner", 1)
+    time.sleep(1.5)
+    assert lb.exists("identifier", 1) is True
+
+    lock_renewer.unregister("owner", "identifier")
+    time.sleep(1.5)
+    assert lb.exists("identifier", 1) is False
+    assert lb.acquire("identifier", 1, "other") is True
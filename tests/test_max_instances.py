@@ -0,0 +1,61 @@
+"""Test counting semaphore locks allowing N concurrent instances."""
+
+import time
+
+import pytest
+from celery import Celery
+
+from flask_celery import single_instance
+from flask_celery.exceptions import OtherInstanceError
+from flask_celery.lock_manager import LockManager
+
+from .tasks import limited
+
+
+def test_slots(celery_app: Celery) -> None:
+    """Test only limit slots can be held at once, released slot can be acquired again."""
+    lock_backend = celery_app.lock_backend
+    slots = [lock_backend.acquire_slot("tasks.slots", 3, 60, f"token{i}") for i in range(3)]
+
+    assert None not in slots
+    assert lock_backend.acquire_slot("tasks.slots", 3, 60, "token3") is None
+    assert lock_backend.extend_slot(slots[0], 60, "token0") is True
+
+    lock_backend.release_slot(slots[1], "token1")
+    assert lock_backend.acquire_slot("tasks.slots", 3, 60, "token3") is not None
+    for i, slot in enumerate(slots):
+        lock_backend.release_slot(slot, f"token{i}")
+    lock_backend.release_slot(slots[1], "token3")
+
+
+def test_expired_slot_is_reclaimed(celery_app: Celery) -> None:
+    """Test slot of crashed holder is acquired again once it expired."""
+    lock_backend = celery_app.lock_backend
+    slot = lock_backend.acquire_slot("tasks.expired_slot", 1, 1, "crashed")
+    assert slot is not None
+    assert lock_backend.acquire_slot("tasks.expired_slot", 1, 1, "token") is None
+
+    time.sleep(2)
+    slot = lock_backend.acquire_slot("tasks.expired_slot", 1, 1, "token")
+    assert slot is not None
+    lock_backend.release_slot(slot, "token")
+
+
+def test_max_instances(celery_app: Celery) -> None:
+    """Test task runs while fewer than max_instances instances hold the semaphore."""
+    first = LockManager(celery_app.lock_backend, limited, 300, (), {}, include_args=False, max_instances=2)
+    second = LockManager(celery_app.lock_backend, limited, 300, (), {}, include_args=False, max_instances=2)
+
+    with first:
+        assert limited.delay(1).get() == 1
+        with second, pytest.raises(OtherInstanceError, match="2 instances"):
+            limited.delay(2).get()
+    assert limited.delay(3).get() == 3
+
+
+def test_invalid_max_instances() -> None:
+    """Test max_instances below one and combined with deduplicate are rejected."""
+    with pytest.raises(ValueError, match="at least 1"):
+        single_instance(max_instances=0)
+    with pytest.raises(ValueError, match="deduplicate"):
+        single_instance(max_instances=2, deduplicate=True)
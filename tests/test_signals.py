@@ -0,0 +1,117 @@
+"""Test lock signals and metrics."""
+
+import time
+from collections.abc import Callable, Iterator
+
+import pytest
+from celery import Celery
+
+from flask_celery.backends.base import LockBackend
+from flask_celery.exceptions import OtherInstanceError
+from flask_celery.lock_manager import LockManager
+from flask_celery.metrics import PrometheusLockMetrics, StatsdLockMetrics
+from flask_celery.signals import lock_acquired, lock_contended, lock_expired_takeover, lock_released
+
+from .tasks import mul
+
+
+@pytest.fixture
+def events() -> Iterator[list[tuple[str, dict[str, object]]]]:
+    """Record all lock signals."""
+    recorded: list[tuple[str, dict[str, object]]] = []
+
+    def receiver(name: str) -> Callable[..., None]:
+        def receive(_sender: object, **kwargs: object) -> None:
+            recorded.append((name, kwargs))
+        return receive
+
+    receivers = {signal: receiver(signal.name) for signal in (lock_acquired, lock_contended, lock_released, lock_expired_takeover)}
+    for signal, receive in receivers.items():
+        signal.connect(receive)
+    yield recorded
+    for signal, receive in receivers.items():
+        signal.disconnect(receive)
+
+
+def test_signals_task_run(celery_app: Celery, events: list[tuple[str, dict[str, object]]]) -> None:
+    """Test acquired and released are sent around task run, contended when another instance holds the lock."""
+    assert mul.apply_async(args=(2, 3)).get() == 6
+    assert [name for name, _ in events] == ["lock-acquired", "lock-released"]
+    assert events[0][1]["task_name"] == mul.name
+    assert events[1][1]["held"] >= 0  # type: ignore[operator]
+
+    events.clear()
+    with LockManager(celery_app.lock_backend, mul, 20, (2, 3), {}, include_args=True), pytest.raises(OtherInstanceError):
+        mul.apply_async(args=(2, 3)).get()
+    assert [name for name, _ in events] == ["lock-acquired", "lock-contended", "lock-released"]
+
+
+# Lock backend of every kind reporting expired takeover
+@pytest.mark.parametrize("lock_backend", ["memory", "database", "redis"], indirect=True)
+def test_signal_expired_takeover(lock_backend: LockBackend, events: list[tuple[str, dict[str, object]]]) -> None:
+    """Test backend reports lock taken over after it expired, not a free one."""
+    assert lock_backend.acquire("task.args.hash", 1) is True
+    lock_backend.release("task.args.hash")
+    assert lock_backend.acquire("task.args.hash", 1) is True
+    assert events == []
+
+    time.sleep(1.1)
+    assert lock_backend.acquire("task.args.hash", 1) is True
+    assert events == [("lock-expired-takeover", {"task_identifier": "task.args.hash"})]
+
+
+@pytest.mark.parametrize("lock_backend", ["database", "redis"], indirect=True)
+def test_signal_expired_takeover_many(lock_backend: LockBackend, events: list[tuple[str, dict[str, object]]]) -> None:
+    """Test backend reports locks taken over by acquire_many, not free ones."""
+    assert lock_backend.acquire_many(["task.args.hash"], 1) == {"task.args.hash": True}
+    time.sleep(1.1)
+    assert lock_backend.acquire_many(["task.args.hash", "task.args.new"], 1) == {"task.args.hash": True, "task.args.new": True}
+    assert events == [("lock-expired-takeover", {"task_identifier": "task.args.hash"})]
+
+
+def test_prometheus_metrics(celery_app: Celery) -> None:
+    """Test counters and histograms per task name."""
+    metrics = PrometheusLockMetrics().connect()
+    try:
+        mul.apply_async(args=(4, 5)).get()
+        with LockManager(celery_app.lock_backend, mul, 20, (4, 5), {}, include_args=True), pytest.raises(OtherInstanceError):
+            mul.apply_async(args=(4, 5)).get()
+    finally:
+        metrics.disconnect()
+    mul.apply_async(args=(4, 5)).get()
+
+    rendered = metrics.render()
+    assert f'flask_celery_lock_acquired_total{{task="{mul.name}"}} 2' in rendered
+    assert f'flask_celery_lock_contended_total{{task="{mul.name}"}} 1' in rendered
+    assert f'flask_celery_lock_held_seconds_bucket{{task="{mul.name}",le="+Inf"}} 2' in rendered
+    assert f'flask_celery_lock_acquire_seconds_count{{task="{mul.name}"}} 2' in rendered
+
+
+class RecordingStatsdClient:
+    """StatsD client recording sent stats."""
+
+    def __init__(self) -> None:
+        """RecordingStatsdClient constructor."""
+        self.sent: list[tuple[str, str, float]] = []
+
+    def incr(self, stat: str, count: int = 1) -> None:
+        """Record counter."""
+        self.sent.append(("incr", stat, count))
+
+    def timing(self, stat: str, delta: float) -> None:
+        """Record timing."""
+        self.sent.append(("timing", stat, delta))
+
+
+def test_statsd_metrics() -> None:
+    """Test events are forwarded to StatsD client."""
+    client = RecordingStatsdClient()
+    metrics = StatsdLockMetrics(client).connect()
+    try:
+        mul.apply_async(args=(6, 7)).get()
+    finally:
+        metrics.disconnect()
+
+    stats = [(kind, stat) for kind, stat, _ in client.sent]
+    assert ("incr", f"flask_celery.lock.acquired.{mul.name}") in stats
+    assert ("timing", f"flask_celery.lock.held.{mul.name}") in stats
@@ -93,3 +93,50 @@ def test_expired(celery_app: Celery) -> None:
     time.sleep(5)
     assert task.apply_async(args=(4, 4)).get() == 8
     celery_app.conf.update({"task_time_limit": None})
+
+
+def test_resolved_once(celery_app: Celery) -> None:
+    """Test timeout is resolved on first run and again after config update."""
+    options = add.run.single_instance
+    add.apply_async(args=(4, 4)).get()
+    resolved = options.for_task(add)
+    assert options.for_task(add) is resolved
+    assert resolved.timeout == 300
+
+    celery_app.conf.update({"task_time_limit": 150})
+    try:
+        assert options.for_task(add) is not resolved
+        assert options.for_task(add).timeout == 150
+    finally:
+        celery_app.conf.update({"task_time_limit": None})
+
+
+def test_fractional_time_limit(celery_app: Celery) -> None:
+    """Test fractional time limit is rounded up, lock timeout never becomes 0 (no expiry)."""
+    options = add.run.single_instance
+    celery_app.conf.update({"task_time_limit": 0.5})
+    try:
+        assert options.get_timeout(add) == 1
+    finally:
+        celery_app.conf.update({"task_time_limit": None})
+
+
+def test_time_limit_assignment(celery_app: Celery) -> None:
+    """Test time limits assigned after first run, which notifies no observer, are picked up."""
+    options = add.run.single_instance
+    add.apply_async(args=(4, 4)).get()
+    assert options.for_task(add).timeout == 300
+
+    celery_app.conf.task_time_limit = 150
+    try:
+        assert options.for_task(add).timeout == 150
+        celery_app.conf["task_soft_time_limit"] = 140
+        assert options.for_task(add).timeout == 140
+        add.soft_time_limit = 120
+        assert options.for_task(add).timeout == 120
+        assert add.apply_async(args=(4, 4)).get() == 8
+    finally:
+        add.soft_time_limit = None
+        celery_app.conf.task_time_limit = None
+        celery_app.conf["task_soft_time_limit"] = None
+    assert options.for_task(add).timeout == 300